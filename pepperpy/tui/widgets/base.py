@@ -52,7 +52,7 @@ class PepperWidget(Widget):
 
         """
         self.events.append((event_type, data))
-        await self.post_message(self.PepperEvent(event_type, data))
+        self.post_message(self.PepperEvent(event_type, data))
 
     def clear_events(self) -> None:
         """Clear all events."""
@@ -71,4 +71,4 @@ class PepperWidget(Widget):
 
     async def _on_mount(self, event: Mount) -> None:
         """Handle widget mount event."""
-        await self.post_message(self.PepperEvent("mounted", {}))
+        self.post_message(self.PepperEvent("mounted", {}))
@@ -0,0 +1,47 @@
+"""Table widget with columnar storage."""
+
+from __future__ import annotations
+
+from .aggregate import TableAggregates
+from .buffer import BufferColumn, Utf8Column
+from .column import AggregateKind, Column, ColumnType
+from .export import ExportFormat, ExportTableCommand
+from .file_source import FileSource
+from .filter import And, Contains, Eq, Or, Predicate, Range, Regex, TableFilter
+from .formatters import CellFormatter, format_number, format_timestamp
+from .selection import RowSelection
+from .source import AggregateSource, PagedRows, SQLiteSource, TableDataSource
+from .sqlite_table import SQLiteTable
+from .store import ColumnStore
+from .widget import PepperTable
+
+__all__ = [
+    "AggregateKind",
+    "AggregateSource",
+    "And",
+    "BufferColumn",
+    "CellFormatter",
+    "Column",
+    "ColumnStore",
+    "ColumnType",
+    "Contains",
+    "Eq",
+    "ExportFormat",
+    "ExportTableCommand",
+    "FileSource",
+    "Or",
+    "PagedRows",
+    "PepperTable",
+    "Predicate",
+    "Range",
+    "Regex",
+    "RowSelection",
+    "SQLiteSource",
+    "SQLiteTable",
+    "TableAggregates",
+    "TableDataSource",
+    "TableFilter",
+    "Utf8Column",
+    "format_number",
+    "format_timestamp",
+]
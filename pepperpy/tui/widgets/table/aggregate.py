@@ -0,0 +1,406 @@
+"""Incremental column aggregates for table widgets.
+
+Aggregates are declared with ``Column(aggregate=...)`` and kept for the
+whole table and, optionally, for each value of a group-by column. They are
+updated from the rows that change instead of being recomputed by a scan:
+sums and counts are adjusted in place, and min, max and p95 read a sorted
+list of the column values that is updated by binary search.
+"""
+
+from __future__ import annotations
+
+import math
+from bisect import bisect_left, insort
+from typing import TYPE_CHECKING, TypeGuard
+
+from .formatters import format_value
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping, Sequence
+
+    from .column import AggregateKind, Column
+    from .store import CellValue, ColumnStore
+
+ORDERED_KINDS = frozenset(("min", "max", "p95"))
+
+
+def is_number(value: CellValue) -> TypeGuard[int | float]:
+    """Check whether a value takes part in numeric aggregates.
+
+    Args:
+        value: Cell value
+
+    Returns:
+        bool: Whether the value is an int or a float other than NaN
+
+    """
+    return (
+        isinstance(value, int | float)
+        and not isinstance(value, bool)
+        and not (isinstance(value, float) and math.isnan(value))
+    )
+
+
+class Accumulator:
+    """Running aggregate state of one column within one group.
+
+    Attributes:
+        count (int): Number of non-null values
+        numbers (int): Number of numeric values
+        total (float): Sum of the numeric values
+        ordered (Optional[List[float]]): Sorted numeric values, kept only
+            for min, max and p95
+
+    """
+
+    __slots__ = ("count", "numbers", "ordered", "total")
+
+    def __init__(self, ordered: bool = False) -> None:
+        """Initialize an empty accumulator.
+
+        Args:
+            ordered: Whether to keep the sorted values
+
+        """
+        self.count = 0
+        self.numbers = 0
+        self.total: float = 0
+        self.ordered: list[float] | None = [] if ordered else None
+
+    def extend(self, values: Iterable[CellValue]) -> None:
+        """Add many values, sorting them once.
+
+        Args:
+            values: Cell values
+
+        """
+        numbers: list[float] = []
+        for value in values:
+            if value is not None:
+                self.count += 1
+                if is_number(value):
+                    numbers.append(value)
+        self.numbers += len(numbers)
+        self.total += sum(numbers)
+        if self.ordered is not None:
+            self.ordered.extend(numbers)
+            self.ordered.sort()
+
+    def add(self, value: CellValue) -> None:
+        """Add a value.
+
+        Args:
+            value: Cell value
+
+        """
+        if value is None:
+            return
+        self.count += 1
+        if is_number(value):
+            self.numbers += 1
+            self.total += value
+            if self.ordered is not None:
+                insort(self.ordered, value)
+
+    def remove(self, value: CellValue) -> None:
+        """Remove a value that was added before.
+
+        Args:
+            value: Cell value
+
+        """
+        if value is None:
+            return
+        self.count -= 1
+        if is_number(value):
+            self.numbers -= 1
+            self.total -= value
+            if self.ordered is not None:
+                index = bisect_left(self.ordered, value)
+                if index < len(self.ordered) and self.ordered[index] == value:
+                    del self.ordered[index]
+
+    def result(self, kind: AggregateKind) -> CellValue:
+        """Get the value of an aggregate.
+
+        Args:
+            kind: Aggregate kind
+
+        Returns:
+            Any: Aggregate value, ``None`` when there are no numbers
+
+        """
+        if kind == "count":
+            return self.count
+        if kind == "sum":
+            return self.total
+        if not self.numbers:
+            return None
+        if kind == "mean":
+            return self.total / self.numbers
+        ordered = self.ordered or []
+        if kind == "min":
+            return ordered[0]
+        if kind == "max":
+            return ordered[-1]
+        # Nearest-rank percentile.
+        return ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+
+
+class TableAggregates:
+    """Aggregates of a column store, in total and per group.
+
+    Example:
+        >>> aggregates = TableAggregates(store, columns, group_key="region")
+        >>> aggregates.value("latency")
+        >>> aggregates.group_value("latency", "eu")
+
+    Attributes:
+        store (ColumnStore): Column store
+        kinds (Dict[str, str]): Aggregate kind by column key
+        group_key (Optional[str]): Column whose values define the groups
+        total (Dict[str, Accumulator]): Accumulators over every row
+        groups (Dict[Any, Dict[str, Accumulator]]): Accumulators by group
+
+    """
+
+    def __init__(
+        self,
+        store: ColumnStore,
+        columns: Sequence[Column],
+        group_key: str | None = None,
+    ) -> None:
+        """Initialize the aggregates and compute them from the store.
+
+        Args:
+            store: Column store
+            columns: Table columns; those with an ``aggregate`` are tracked
+            group_key: Column whose values define the groups
+
+        Raises:
+            KeyError: If the group key is not a table column.
+
+        """
+        if group_key is not None:
+            store.column(group_key)
+        self.store = store
+        self.kinds: dict[str, AggregateKind] = {
+            col.key: col.aggregate for col in columns if col.aggregate is not None
+        }
+        self.group_key = group_key
+        self.total: dict[str, Accumulator] = {}
+        self.groups: dict[CellValue, dict[str, Accumulator]] = {}
+        self._sizes: dict[CellValue, int] = {}
+        self.rebuild()
+
+    @property
+    def active(self) -> bool:
+        """Check whether any column is aggregated."""
+        return bool(self.kinds)
+
+    def _accumulators(self) -> dict[str, Accumulator]:
+        """Create empty accumulators for the aggregated columns."""
+        return {
+            key: Accumulator(ordered=kind in ORDERED_KINDS)
+            for key, kind in self.kinds.items()
+        }
+
+    def rebuild(self) -> None:
+        """Recompute every aggregate with a single scan of the live rows."""
+        self.total = self._accumulators()
+        self.groups = {}
+        self._sizes = {}
+        live = self.store.live_rows()
+        for key, accumulator in self.total.items():
+            column = self.store.column(key)
+            accumulator.extend(column[row] for row in live)
+        if self.group_key is None:
+            return
+
+        members: dict[CellValue, list[int]] = {}
+        groups = self.store.column(self.group_key)
+        for row in live:
+            members.setdefault(groups[row], []).append(row)
+        for group, rows in members.items():
+            self._sizes[group] = len(rows)
+            accumulators = self.groups[group] = self._accumulators()
+            for key, accumulator in accumulators.items():
+                column = self.store.column(key)
+                accumulator.extend(column[row] for row in rows)
+
+    def _group(self, group: CellValue) -> dict[str, Accumulator]:
+        """Get the accumulators of a group for a new row."""
+        accumulators = self.groups.get(group)
+        if accumulators is None:
+            accumulators = self.groups[group] = self._accumulators()
+        self._sizes[group] = self._sizes.get(group, 0) + 1
+        return accumulators
+
+    def rows_added(self, rows: Iterable[int]) -> None:
+        """Add new rows to the aggregates.
+
+        Args:
+            rows: Indexes of the added rows
+
+        """
+        if not self.kinds:
+            return
+        for row in rows:
+            targets = [self.total]
+            if self.group_key is not None:
+                targets.append(self._group(self.store.value(row, self.group_key)))
+            for key in self.kinds:
+                value = self.store.value(row, key)
+                for accumulators in targets:
+                    accumulators[key].add(value)
+
+    def rows_removed(self, rows: Iterable[int]) -> None:
+        """Remove deleted rows from the aggregates.
+
+        The rows must still be readable, as they are once tombstoned.
+
+        Args:
+            rows: Indexes of the removed rows
+
+        """
+        if not self.kinds:
+            return
+        for row in rows:
+            values = {key: self.store.column(key)[row] for key in self.kinds}
+            self._remove(row, values)
+
+    def _remove(self, row: int, values: Mapping[str, CellValue]) -> None:
+        """Remove the given values of a row from its total and group."""
+        for key in self.kinds:
+            self.total[key].remove(values[key])
+        if self.group_key is None:
+            return
+        group = values.get(self.group_key, self.store.column(self.group_key)[row])
+        accumulators = self.groups.get(group)
+        if accumulators is None:
+            return
+        for key in self.kinds:
+            accumulators[key].remove(values[key])
+        self._sizes[group] -= 1
+        if not self._sizes[group]:
+            del self.groups[group]
+            del self._sizes[group]
+
+    def row_updated(self, row: int, previous: Mapping[str, CellValue]) -> None:
+        """Apply an update of a row to the aggregates.
+
+        Args:
+            row: Row index
+            previous: Values before the update of the changed columns
+
+        """
+        if not self.kinds or not (
+            previous.keys() & (self.kinds.keys() | {self.group_key})
+        ):
+            return
+        column = self.store.column
+        old = {key: previous.get(key, column(key)[row]) for key in self.kinds}
+        if self.group_key is not None:
+            old[self.group_key] = previous.get(
+                self.group_key, column(self.group_key)[row]
+            )
+        self._remove(row, old)
+        self.rows_added((row,))
+
+    def value(self, key: str) -> CellValue:
+        """Get the aggregate of a column over the whole table.
+
+        Args:
+            key: Column key
+
+        Returns:
+            Any: Aggregate value
+
+        Raises:
+            KeyError: If the column has no aggregate.
+
+        """
+        return self.total[key].result(self.kinds[key])
+
+    def group_value(self, key: str, group: CellValue) -> CellValue:
+        """Get the aggregate of a column within a group.
+
+        Args:
+            key: Column key
+            group: Value of the group-by column
+
+        Returns:
+            Any: Aggregate value
+
+        Raises:
+            KeyError: If the column has no aggregate or the group is empty.
+
+        """
+        return self.groups[group][key].result(self.kinds[key])
+
+    def footer(self, columns: Sequence[Column]) -> list[str]:
+        """Format the footer cells: one line per group, then the total.
+
+        Args:
+            columns: Table columns in display order
+
+        Returns:
+            List[str]: Footer text per column, lines separated by newlines
+
+        """
+        return format_footer(
+            columns,
+            self.kinds,
+            self.group_key,
+            {key: self.value(key) for key in self.kinds},
+            {
+                group: {key: self.group_value(key, group) for key in self.kinds}
+                for group in self.groups
+            },
+        )
+
+
+def format_footer(
+    columns: Sequence[Column],
+    kinds: Mapping[str, AggregateKind],
+    group_key: str | None,
+    total: Mapping[str, CellValue],
+    groups: Mapping[CellValue, Mapping[str, CellValue]],
+) -> list[str]:
+    """Format footer cells from aggregate values.
+
+    Args:
+        columns: Table columns in display order
+        kinds: Aggregate kind by column key
+        group_key: Column whose values define the groups
+        total: Aggregate value by column key over every row
+        groups: Aggregate values by group
+
+    Returns:
+        List[str]: Footer text per column, one line per group and then the
+            total, separated by newlines
+
+    """
+    label_key = group_key
+    if label_key is None:
+        label_key = next((col.key for col in columns if col.key not in kinds), None)
+    ordered = sorted(groups, key=lambda group: (group is None, str(group)))
+    lines = [(group, groups[group]) for group in ordered]
+    lines.append(("Total", total))
+
+    cells = []
+    for col in columns:
+        kind = kinds.get(col.key)
+        formatter = col.formatter or format_value
+        texts = []
+        for label, values in lines:
+            if col.key == label_key:
+                texts.append(format_value(label))
+            elif kind is None:
+                texts.append("")
+            else:
+                result = values.get(col.key)
+                text = str(result) if kind == "count" else formatter(result)
+                texts.append(f"{kind} {text}")
+        cells.append("\n".join(texts))
+    return cells
@@ -0,0 +1,348 @@
+"""Zero-copy column adapters for NumPy arrays and columnar buffers.
+
+Data that already lives in typed memory can be shown without converting it
+to a list of row dicts. ``BufferColumn`` wraps a NumPy array, such as a field
+of a structured array, or any 1-D buffer such as a ``memoryview``;
+``Utf8Column`` reads strings from Arrow-style offset and data buffers. Both
+convert a value to a Python object only when it is read, so rendering only
+touches the cells on screen. Nulls are given as an Arrow-style validity
+bitmap.
+
+The wrapped buffers are read-only for the table: the column store replaces
+a wrapped column by a copy of its own the first time a row is updated or
+appended, and the buffers must not change while they are shown.
+"""
+
+from __future__ import annotations
+
+import math
+from array import array
+from itertools import chain
+from typing import TYPE_CHECKING, Any, ClassVar
+
+from .store import INT_MAX, ColumnArray, _rank
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+if TYPE_CHECKING:
+    from collections.abc import Buffer, Callable, Iterator, Mapping, Sequence
+
+    from .column import ColumnType
+    from .store import CellValue
+
+# Storage types of the native ``memoryview`` formats.
+BUFFER_TYPES: dict[str, ColumnType] = {
+    **dict.fromkeys("bhilqBHI", "int"),
+    **dict.fromkeys("fd", "float"),
+    "?": "bool",
+}
+
+# Storage types of NumPy dtype kinds; other kinds are read as objects.
+NUMPY_TYPES: dict[str, ColumnType] = {
+    "i": "int",
+    "u": "int",
+    "f": "float",
+    "b": "bool",
+    "U": "str",
+}
+
+# Values converted to Python objects at once when iterating a NumPy array.
+ITER_BATCH = 65_536
+
+
+class _ReadOnlyColumn(ColumnArray):
+    """Column over memory it does not own, with an optional validity bitmap.
+
+    Attributes:
+        validity (Optional[memoryview]): Bit ``i`` is set when row ``i``
+            holds a value, least significant bit first
+
+    """
+
+    writable: ClassVar[bool] = False
+
+    def __init__(self, length: int, validity: Buffer | None) -> None:
+        """Initialize the validity bitmap.
+
+        Args:
+            length: Number of rows
+            validity: Buffer of the validity bitmap, ``None`` when no row is
+                null
+
+        Raises:
+            ValueError: If the bitmap is shorter than the column.
+
+        """
+        self.validity = None if validity is None else memoryview(validity).cast("B")
+        if self.validity is not None and len(self.validity) * 8 < length:
+            error_msg = f"Validity bitmap too short for {length} rows"
+            raise ValueError(error_msg)
+
+    def is_null(self, index: int) -> bool:
+        """Check whether a row is null in the validity bitmap.
+
+        Args:
+            index: Row index
+
+        Returns:
+            bool: Whether the row holds no value
+
+        """
+        validity = self.validity
+        return validity is not None and not validity[index >> 3] >> (index & 7) & 1
+
+    def null_mask(self) -> Sequence[int] | None:
+        """Get a flag per row that is 1 where the value is ``None``.
+
+        Returns:
+            Optional[Sequence[int]]: Null flags, ``None`` when no row is null
+
+        """
+        if self.validity is None and self.dtype != "object":
+            return None
+        return super().null_mask()
+
+    def extend(self, values: Sequence[CellValue]) -> None:
+        """Reject appends, the store copies the column before changing it.
+
+        Raises:
+            TypeError: Always.
+
+        """
+        error_msg = "Read-only columns cannot be changed"
+        raise TypeError(error_msg)
+
+    def set(self, index: int, value: CellValue) -> None:
+        """Reject updates, the store copies the column before changing it.
+
+        Raises:
+            TypeError: Always.
+
+        """
+        error_msg = "Read-only columns cannot be changed"
+        raise TypeError(error_msg)
+
+    def snapshot(self) -> ColumnArray:
+        """Share the column, which the table never changes in place."""
+        return self
+
+    @property
+    def nbytes(self) -> int:
+        """Get the size of the validity bitmap in bytes."""
+        return 0 if self.validity is None else self.validity.nbytes
+
+
+class BufferColumn(_ReadOnlyColumn):
+    """Read-only column over a NumPy array or a typed 1-D buffer.
+
+    Example:
+        >>> BufferColumn(samples["latency"])
+        >>> BufferColumn(memoryview(array("d", values)), validity=bitmap)
+
+    Attributes:
+        values (Any): Wrapped NumPy array or ``memoryview``
+        dtype (str): Storage type matching the element type
+
+    """
+
+    def __init__(self, values: Buffer, validity: Buffer | None = None) -> None:
+        """Wrap a buffer without copying it.
+
+        NumPy masked arrays take their validity from the mask.
+
+        Args:
+            values: 1-D NumPy array, or object exporting a 1-D buffer in a
+                native integer, float or bool format
+            validity: Buffer of the validity bitmap
+
+        Raises:
+            ValueError: If the buffer is not 1-D or its format is unsupported.
+
+        """
+        self._get: Callable[[int], CellValue]
+        if np is not None and isinstance(values, np.ndarray):
+            if isinstance(values, np.ma.MaskedArray):
+                if validity is None and values.mask is not np.ma.nomask:
+                    mask = np.ma.getmaskarray(values)
+                    validity = np.packbits(~mask, bitorder="little")
+                values = values.data
+            kind = values.dtype.kind
+            # Unsigned 64-bit values may not fit the signed sort keys.
+            dtype = "object" if values.dtype == np.uint64 else NUMPY_TYPES.get(kind)
+            self._get = values.item
+        else:
+            values = memoryview(values)
+            dtype = BUFFER_TYPES.get(values.format.lstrip("@"))
+            if dtype is None:
+                error_msg = f"Unsupported buffer format '{values.format}'"
+                raise ValueError(error_msg)
+            self._get = values.__getitem__
+        if values.ndim != 1:
+            error_msg = f"Expected a 1-D buffer, got {values.ndim} dimensions"
+            raise ValueError(error_msg)
+        super().__init__(len(values), validity)
+        self.values = values
+        self.dtype: ColumnType = dtype or "object"
+
+    def __len__(self) -> int:
+        """Get the number of rows."""
+        return len(self.values)
+
+    def __getitem__(self, index: int) -> CellValue:
+        """Convert the value of a row to a Python object."""
+        if self.validity is not None and self.is_null(index):
+            return None
+        return self._get(index)
+
+    def __iter__(self) -> Iterator[CellValue]:
+        """Iterate over the values as Python objects."""
+        if self.validity is not None:
+            return super().__iter__()
+        if isinstance(self.values, memoryview):
+            return iter(self.values)
+        return chain.from_iterable(
+            self.values[start : start + ITER_BATCH].tolist()
+            for start in range(0, len(self.values), ITER_BATCH)
+        )
+
+    def sort_keys(self, *, blocks: bool = False) -> Sequence[int] | Sequence[float]:
+        """Get typed sort keys, one per row, with ``None`` and NaN last.
+
+        Args:
+            blocks: Whether to sort in blocks, so that a worker thread
+                computing the keys does not hold the GIL for long
+
+        Returns:
+            Sequence: The wrapped buffer itself for numbers without gaps
+
+        """
+        if self.dtype not in {"int", "float", "bool"}:
+            if self.dtype == "str":
+                return _rank(list(self), blocks=blocks)
+            return super().sort_keys(blocks=blocks)
+        float_keys = self.dtype == "float"
+        if self.validity is None and not (float_keys and self._has_nan()):
+            return self.values
+        last: float = float("inf") if float_keys else INT_MAX
+        if self.dtype == "bool":
+            last = 2
+        # Numeric buffers only hold numbers, of the type of the typecode.
+        keys: list[Any] = [
+            last if value is None or value != value else value for value in self
+        ]
+        return array("d", keys) if float_keys else array("q", keys)
+
+    def _has_nan(self) -> bool:
+        """Check whether a float buffer holds NaN."""
+        if np is None or isinstance(self.values, memoryview):
+            # NaN propagates through the C-level sum.
+            return math.isnan(sum(self.values))
+        return bool(np.isnan(self.values).any())
+
+    @property
+    def nbytes(self) -> int:
+        """Get the size of the wrapped buffers in bytes."""
+        return self.values.nbytes + super().nbytes
+
+
+class Utf8Column(_ReadOnlyColumn):
+    """Read-only string column over Arrow-style offset and data buffers.
+
+    The value of row ``i`` is the UTF-8 text between ``offsets[i]`` and
+    ``offsets[i + 1]`` in the data buffer, so there is one more offset than
+    there are rows.
+
+    Example:
+        >>> Utf8Column(array("i", [0, 2, 5]), b"eugcp")
+
+    Attributes:
+        offsets (memoryview): Start of each value in the data buffer
+        data (memoryview): Concatenated UTF-8 text
+
+    """
+
+    dtype: ClassVar[ColumnType] = "str"
+
+    def __init__(
+        self,
+        offsets: Buffer,
+        data: Buffer,
+        validity: Buffer | None = None,
+    ) -> None:
+        """Wrap the buffers without copying them.
+
+        Args:
+            offsets: Buffer of 32 or 64-bit integer offsets
+            data: Buffer of UTF-8 bytes
+            validity: Buffer of the validity bitmap
+
+        Raises:
+            ValueError: If the offsets are not integers or empty.
+
+        """
+        self.offsets = memoryview(offsets)
+        if (
+            BUFFER_TYPES.get(self.offsets.format.lstrip("@")) != "int"
+            or not self.offsets
+        ):
+            error_msg = "Offsets must be a non-empty buffer of integers"
+            raise ValueError(error_msg)
+        self.data = memoryview(data).cast("B")
+        super().__init__(len(self.offsets) - 1, validity)
+
+    def __len__(self) -> int:
+        """Get the number of rows."""
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> CellValue:
+        """Decode the text of a row."""
+        if self.validity is not None and self.is_null(index):
+            return None
+        return str(self.data[self.offsets[index] : self.offsets[index + 1]], "utf-8")
+
+    def sort_keys(self, *, blocks: bool = False) -> Sequence[int] | Sequence[float]:
+        """Get typed sort keys, one per row, with ``None`` sorting last.
+
+        Args:
+            blocks: Whether to sort in blocks, so that a worker thread
+                computing the keys does not hold the GIL for long
+
+        Returns:
+            Sequence: Dense rank of each value among the distinct values
+
+        """
+        return _rank(list(self), blocks=blocks)
+
+    @property
+    def nbytes(self) -> int:
+        """Get the size of the wrapped buffers in bytes."""
+        return self.offsets.nbytes + self.data.nbytes + super().nbytes
+
+
+def column_arrays(data: Mapping[str, object] | object) -> dict[str, ColumnArray]:
+    """Wrap the columns of a NumPy structured array or of a mapping.
+
+    Args:
+        data: Structured array, whose fields become columns, or mapping of
+            column keys to column arrays, NumPy arrays or 1-D buffers
+
+    Returns:
+        Dict[str, ColumnArray]: Read-only columns sharing the given memory
+
+    Raises:
+        ValueError: If a buffer is unsupported or an array is not
+            structured.
+
+    """
+    if np is not None and isinstance(data, np.ndarray):
+        if data.dtype.names is None:
+            error_msg = "Expected a structured array or a mapping of columns"
+            raise ValueError(error_msg)
+        data = {name: data[name] for name in data.dtype.names}
+    return {
+        key: values if isinstance(values, ColumnArray) else BufferColumn(values)
+        for key, values in data.items()
+    }
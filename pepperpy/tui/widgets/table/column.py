@@ -0,0 +1,45 @@
+"""Column configuration for table widgets."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Literal
+
+if TYPE_CHECKING:
+    from .formatters import CellFormatter
+
+ColumnType = Literal["auto", "int", "float", "bool", "str", "object"]
+AggregateKind = Literal["sum", "mean", "min", "max", "count", "p95"]
+
+
+@dataclass
+class Column:
+    """Table column configuration.
+
+    Attributes:
+        key (str): Data key
+        label (str): Column label
+        width (Optional[int]): Column width
+        align (str): Text alignment
+        style (str): Cell style
+        dtype (str): Storage type, inferred from the data when "auto"
+        formatter (Optional[CellFormatter]): Converts values to cell text,
+            ``str`` with ``None`` shown empty by default
+        aggregate (Optional[str]): Aggregate shown in the table footer
+        frozen (bool): Whether the column stays pinned at the left while a
+            virtual table scrolls horizontally
+        primary_key (bool): Whether the column identifies rows; its values
+            must be unique and not ``None``
+
+    """
+
+    key: str
+    label: str
+    width: int | None = None
+    align: Literal["left", "center", "right"] = "left"
+    style: str = ""
+    dtype: ColumnType = "auto"
+    formatter: CellFormatter | None = None
+    aggregate: AggregateKind | None = None
+    frozen: bool = False
+    primary_key: bool = False
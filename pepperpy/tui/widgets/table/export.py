@@ -0,0 +1,448 @@
+"""Streaming export of table views to files.
+
+The rows of a view are read in chunks on the event loop and serialized and
+written on a worker thread, so only one chunk is held in memory at a time
+and the interface stays responsive. The file is written next to its target
+under a ``.part`` suffix and renamed when complete; a cancelled or failed
+export removes it and leaves any existing file untouched.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import json
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal, TypeGuard, get_args
+
+import structlog
+
+from .formatters import format_value
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Mapping, Sequence
+    from typing import IO
+
+    from ..progress import Progress
+    from .column import Column, ColumnType
+    from .store import CellValue
+    from .widget import PepperTable
+
+logger = structlog.get_logger(__name__)
+
+ExportFormat = Literal["csv", "jsonl", "parquet"]
+
+# Names of the supported export formats.
+EXPORT_FORMATS: tuple[ExportFormat, ...] = get_args(ExportFormat)
+
+# Column values of one chunk of rows, by column key.
+Chunk = dict[str, list["CellValue"]]
+
+# Rows read and written per step.
+EXPORT_CHUNK = 10_000
+
+# Arrow types of the stored column types; other columns are written as text.
+ARROW_TYPES: dict[ColumnType, str] = {
+    "int": "int64",
+    "float": "float64",
+    "bool": "bool_",
+    "str": "string",
+}
+
+
+def is_export_format(value: object) -> TypeGuard[ExportFormat]:
+    """Check whether a value names a supported export format.
+
+    Args:
+        value: Value to check
+
+    Returns:
+        bool: Whether the value is "csv", "jsonl" or "parquet"
+
+    """
+    return value in EXPORT_FORMATS
+
+
+def guess_format(path: Path) -> ExportFormat:
+    """Guess the export format from a file suffix.
+
+    Args:
+        path: Target file path
+
+    Returns:
+        str: "parquet", "jsonl" or "csv", the default
+
+    """
+    suffix = path.suffix.lower()
+    if suffix in {".jsonl", ".ndjson"}:
+        return "jsonl"
+    if suffix in {".parquet", ".pq"}:
+        return "parquet"
+    return "csv"
+
+
+class ExportWriter(ABC):
+    """Base class for the file writers used by ``export_view``.
+
+    Writers run on a worker thread; each method is called from one thread
+    at a time.
+
+    Attributes:
+        path (Path): Target file path
+        keys (List[str]): Column keys in output order
+
+    """
+
+    def __init__(self, path: Path, keys: Sequence[str]) -> None:
+        """Initialize the writer.
+
+        Args:
+            path: Target file path
+            keys: Column keys in output order
+
+        """
+        self.path = path
+        self.keys = list(keys)
+        self.partial = path.with_name(path.name + ".part")
+
+    @abstractmethod
+    def write(self, chunk: Chunk) -> None:
+        """Write a chunk of rows.
+
+        Args:
+            chunk: Column values by key, all of the same length
+
+        """
+
+    @abstractmethod
+    def _close(self) -> None:
+        """Flush and close the partial file."""
+
+    def close(self) -> None:
+        """Finish the file and move it to the target path."""
+        self._close()
+        self.partial.replace(self.path)
+
+    def abort(self) -> None:
+        """Close and remove the partial file."""
+        try:
+            self._close()
+        finally:
+            self.partial.unlink(missing_ok=True)
+
+
+class _TextWriter(ExportWriter):
+    """Writer of a line-oriented text file."""
+
+    def __init__(self, path: Path, keys: Sequence[str]) -> None:
+        """Open the partial file for writing."""
+        super().__init__(path, keys)
+        self._file: IO[str] = self.partial.open("w", encoding="utf-8", newline="")
+
+    def _close(self) -> None:
+        """Close the partial file."""
+        self._file.close()
+
+
+class CsvWriter(_TextWriter):
+    """CSV writer with a header line of column keys."""
+
+    def __init__(self, path: Path, keys: Sequence[str]) -> None:
+        """Open the partial file and write the header."""
+        super().__init__(path, keys)
+        self._csv = csv.writer(self._file)
+        self._csv.writerow(self.keys)
+
+    def write(self, chunk: Chunk) -> None:
+        """Write a chunk of rows as CSV records."""
+        self._csv.writerows(zip(*(chunk[key] for key in self.keys), strict=True))
+
+
+class JsonlWriter(_TextWriter):
+    """JSON Lines writer; values JSON cannot encode are written with ``str``."""
+
+    def write(self, chunk: Chunk) -> None:
+        """Write a chunk of rows as JSON objects, one per line."""
+        keys = self.keys
+        dumps = json.JSONEncoder(ensure_ascii=False, default=str).encode
+        self._file.writelines(
+            dumps(dict(zip(keys, values, strict=True))) + "\n"
+            for values in zip(*(chunk[key] for key in keys), strict=True)
+        )
+
+
+class ParquetWriter(ExportWriter):
+    """Parquet writer storing each chunk as a row group; requires pyarrow."""
+
+    def __init__(
+        self,
+        path: Path,
+        keys: Sequence[str],
+        dtypes: Mapping[str, ColumnType] | None = None,
+    ) -> None:
+        """Initialize the writer.
+
+        Args:
+            path: Target file path
+            keys: Column keys in output order
+            dtypes: Storage type by column key; other columns are written as
+                strings
+
+        Raises:
+            ImportError: If pyarrow is not installed.
+
+        """
+        if pa is None or pq is None:
+            error_msg = "Parquet export requires pyarrow"
+            raise ImportError(error_msg)
+        super().__init__(path, keys)
+        types = {
+            key: ARROW_TYPES[dtype]
+            for key, dtype in (dtypes or {}).items()
+            if dtype in ARROW_TYPES
+        }
+        self._strings = {key for key in self.keys if key not in types}
+        self.schema = pa.schema(
+            [(key, getattr(pa, types.get(key, "string"))()) for key in self.keys]
+        )
+        self._writer = pq.ParquetWriter(self.partial, self.schema)
+
+    def write(self, chunk: Chunk) -> None:
+        """Write a chunk of rows as a row group."""
+        arrays = {
+            key: (
+                [format_value(value) if value is not None else None for value in values]
+                if key in self._strings
+                else values
+            )
+            for key, values in chunk.items()
+        }
+        self._writer.write_table(pa.table(arrays, schema=self.schema))
+
+    def _close(self) -> None:
+        """Write the file footer and close the file."""
+        self._writer.close()
+
+
+def open_writer(
+    path: Path,
+    file_format: ExportFormat,
+    keys: Sequence[str],
+    dtypes: Mapping[str, ColumnType] | None = None,
+) -> ExportWriter:
+    """Create the writer for an export format.
+
+    Args:
+        path: Target file path
+        file_format: "csv", "jsonl" or "parquet"
+        keys: Column keys in output order
+        dtypes: Storage type by column key, used for Parquet
+
+    Returns:
+        ExportWriter: Writer of the partial file
+
+    Raises:
+        ValueError: If the format is unknown.
+        ImportError: If the format needs a library that is not installed.
+
+    """
+    if file_format == "csv":
+        return CsvWriter(path, keys)
+    if file_format == "jsonl":
+        return JsonlWriter(path, keys)
+    if file_format == "parquet":
+        return ParquetWriter(path, keys, dtypes)
+    error_msg = f"Unknown export format '{file_format}'"
+    raise ValueError(error_msg)
+
+
+def _format_chunk(chunk: Chunk, columns: Sequence[Column]) -> Chunk:
+    """Convert a chunk of values to the cell text shown in the table."""
+    return {
+        col.key: list(map(col.formatter or format_value, chunk[col.key]))
+        for col in columns
+    }
+
+
+async def export_view(
+    path: str | Path,
+    columns: Sequence[Column],
+    total: int,
+    read_chunk: Callable[[int, int], Awaitable[Chunk]],
+    *,
+    file_format: ExportFormat | None = None,
+    dtypes: Mapping[str, ColumnType] | None = None,
+    formatted: bool = False,
+    chunk_size: int = EXPORT_CHUNK,
+    progress: Progress | None = None,
+) -> int:
+    """Stream rows to a file in chunks.
+
+    Each chunk is read on the event loop, then formatted and written on a
+    worker thread while the loop keeps running. Cancelling the calling task
+    waits for the chunk being written, then removes the partial file.
+
+    Example:
+        >>> task = asyncio.create_task(table.export("view.csv"))
+        >>> task.cancel()
+
+    Args:
+        path: Target file path
+        columns: Exported columns in output order
+        total: Number of rows to export
+        read_chunk: Reads the column values of the rows between two positions
+        file_format: "csv", "jsonl" or "parquet", guessed from the suffix if
+            omitted
+        dtypes: Storage type by column key, used for Parquet
+        formatted: Whether to write cell text instead of stored values
+        chunk_size: Rows read and written per step
+        progress: Progress widget updated after each chunk
+
+    Returns:
+        int: Number of rows written
+
+    Raises:
+        ValueError: If the format is unknown.
+        ImportError: If the format needs a library that is not installed.
+
+    """
+    target = Path(path)
+    file_format = file_format or guess_format(target)
+    chunk_size = max(1, chunk_size)
+    keys = [col.key for col in columns]
+    writer = await asyncio.to_thread(
+        open_writer, target, file_format, keys, None if formatted else dtypes
+    )
+
+    def write(chunk: Chunk) -> None:
+        writer.write(_format_chunk(chunk, columns) if formatted else chunk)
+
+    if progress is not None:
+        progress.total = max(1, total)
+        await progress.update_progress(0, f"Exporting {total:,} rows")
+    written = 0
+    pending: asyncio.Future[None] | None = None
+    try:
+        for start in range(0, total, chunk_size):
+            chunk = await read_chunk(start, min(start + chunk_size, total))
+            pending = asyncio.ensure_future(asyncio.to_thread(write, chunk))
+            await asyncio.shield(pending)
+            pending = None
+            written += len(chunk[keys[0]]) if keys else 0
+            if progress is not None:
+                await progress.update_progress(
+                    written, f"Exported {written:,} of {total:,} rows"
+                )
+    except BaseException:
+        if pending is not None:
+            # The worker cannot be interrupted; let it release the file.
+            await asyncio.wait({pending})
+        await asyncio.to_thread(writer.abort)
+        if progress is not None:
+            await progress.update_progress(written, "Export cancelled")
+        logger.info("Table export stopped", path=str(target), written=written)
+        raise
+    await asyncio.to_thread(writer.close)
+    if progress is not None:
+        await progress.update_progress(total, f"Exported {written:,} rows")
+    return written
+
+
+class ExportTableCommand:
+    """Command exporting the current view of a table.
+
+    Only one export runs at a time; starting another or calling ``cancel``
+    stops the running one.
+
+    Example:
+        >>> command = ExportTableCommand(table, progress=progress_bar)
+        >>> app.command_manager.register_command(command)
+        >>> await app.command_manager.execute_command("export_table", "view.csv")
+
+    Attributes:
+        table (PepperTable): Exported table
+        progress (Optional[Progress]): Progress widget updated by the export
+        formatted (bool): Whether to write cell text instead of stored values
+
+    """
+
+    name = "export_table"
+    description = "Export the table view to a CSV, JSONL or Parquet file"
+    category = "Data"
+    shortcut: str | None = None
+
+    def __init__(
+        self,
+        table: PepperTable,
+        progress: Progress | None = None,
+        *,
+        formatted: bool = False,
+    ) -> None:
+        """Initialize the command.
+
+        Args:
+            table: Exported table
+            progress: Progress widget updated by the export
+            formatted: Whether to write cell text instead of stored values
+
+        """
+        self.table = table
+        self.progress = progress
+        self.formatted = formatted
+        self.task: asyncio.Task[int] | None = None
+
+    async def execute(self, *args: object, **kwargs: object) -> None:
+        """Export the view to the path given as the first argument.
+
+        Args:
+            *args: Target file path
+            **kwargs: ``path`` and ``file_format`` may be given by name
+
+        Raises:
+            ValueError: If no path is given, or the format is unknown.
+
+        """
+        path = args[0] if args else kwargs.get("path")
+        if not isinstance(path, str | Path):
+            error_msg = "The export command needs a file path"
+            raise ValueError(error_msg)
+        name = kwargs.get("file_format")
+        file_format: ExportFormat | None = None
+        if is_export_format(name):
+            file_format = name
+        elif name is not None:
+            error_msg = f"Unknown export format '{name}'"
+            raise ValueError(error_msg)
+        self.cancel()
+        task = self.task = asyncio.create_task(
+            self.table.export(
+                path,
+                file_format=file_format,
+                formatted=self.formatted,
+                progress=self.progress,
+            )
+        )
+        try:
+            await asyncio.wait({task})
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        finally:
+            if self.task is task:
+                self.task = None
+        if not task.cancelled():
+            task.result()
+
+    def cancel(self) -> None:
+        """Cancel the running export, if any."""
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
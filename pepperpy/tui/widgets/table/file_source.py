@@ -0,0 +1,428 @@
+"""Memory-mapped CSV and JSONL data source for table widgets.
+
+The file is memory-mapped and indexed by line offsets on a background
+thread, so the first rows can be shown while the rest of the file is still
+being indexed. Rows are parsed only when they are displayed; sorting and
+filtering parse just the columns they read, into a ``ColumnStore``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import json
+import mmap
+import threading
+from array import array
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal
+
+import structlog
+
+from .column import Column
+from .filter import TableFilter
+from .sort import SortIndex
+from .store import ColumnStore
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+    from .filter import Predicate
+    from .sort import SortSpec
+    from .store import CellValue, Row
+
+logger = structlog.get_logger(__name__)
+
+FileFormat = Literal["csv", "jsonl"]
+
+# Bytes scanned for line breaks per indexing step.
+CHUNK_SIZE = 16 * 2**20
+
+# Rows parsed per step when a column is loaded for sorting or filtering.
+PARSE_BATCH = 65_536
+
+# First characters of field text that may hold a number.
+NUMBER_START = frozenset("+-.0123456789")
+
+
+def parse_scalar(text: str) -> CellValue:
+    """Convert CSV field text to an int, float or string.
+
+    Args:
+        text: Field text
+
+    Returns:
+        Any: Parsed value, ``None`` for an empty field
+
+    """
+    if not text:
+        return None
+    if text[0] not in NUMBER_START:
+        return text
+    digits = text[1:] if text[0] in "+-" else text
+    if digits.isascii() and digits.isdigit():
+        return int(text)
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+class FileSource:
+    """``TableDataSource`` reading a CSV or JSONL file in place.
+
+    Lines are located through an offset index built on a background thread.
+    Until indexing finishes, ``count`` reports the rows indexed so far and
+    ``fetch`` waits only for the rows it returns; sorted or filtered results
+    wait for the whole file. Records must not contain line breaks.
+
+    Example:
+        >>> source = FileSource("export.csv", on_progress=report)
+        >>> await table.load_source(source)
+
+    Attributes:
+        path (Path): File path
+        file_format (str): "csv" or "jsonl"
+        columns (List[Column]): Columns read from the file
+        on_progress (Optional[Callable[[int, float], None]]): Called on the
+            event loop with the rows indexed so far and the fraction done
+
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        columns: Sequence[Column] | None = None,
+        *,
+        file_format: FileFormat | None = None,
+        delimiter: str = ",",
+        on_progress: Callable[[int, float], None] | None = None,
+    ) -> None:
+        """Initialize the source; the file is opened on first use.
+
+        Args:
+            path: File path
+            columns: Columns read from the file, all CSV header fields or
+                the keys of the first JSON record when omitted
+            file_format: "csv" or "jsonl", guessed from the suffix if omitted
+            delimiter: CSV field delimiter
+            on_progress: Called with the rows indexed so far and the fraction
+                of the file indexed
+
+        """
+        self.path = Path(path)
+        self.file_format: FileFormat = file_format or (
+            "jsonl" if self.path.suffix.lower() in {".jsonl", ".ndjson"} else "csv"
+        )
+        self.delimiter = delimiter
+        self.on_progress = on_progress
+        self.columns = list(columns) if columns is not None else []
+        self.indexed = False
+        self._mm: mmap.mmap | bytes = b""
+        self._size = 0
+        self._fields: list[str] = []
+        self._starts = array("q")
+        self._thread: threading.Thread | None = None
+        self._closed = False
+        self._tick: asyncio.Event | None = None
+        self._frame: tuple[ColumnStore, SortIndex, TableFilter] | None = None
+        self._views: dict[tuple[SortSpec, Predicate | None], Sequence[int]] = {}
+        self._lock = asyncio.Lock()
+
+    @property
+    def row_count(self) -> int:
+        """Get the number of rows indexed so far."""
+        return len(self._starts)
+
+    async def count(self, predicate: Predicate | None = None) -> int:
+        """Count rows; without a filter, only the rows indexed so far."""
+        await self._open()
+        if predicate is None:
+            return self.row_count
+        return len(await self._view((), predicate))
+
+    async def fetch(
+        self,
+        offset: int,
+        limit: int,
+        sort: SortSpec = (),
+        predicate: Predicate | None = None,
+    ) -> list[Row]:
+        """Fetch and parse a range of rows."""
+        await self._open()
+        if sort or predicate is not None:
+            positions = (await self._view(sort, predicate))[offset : offset + limit]
+        else:
+            while self.row_count < offset + limit and not self.indexed:
+                await self._wait_progress()
+            positions = range(offset, min(offset + limit, self.row_count))
+        if isinstance(positions, range):
+            return self._parse_lines(positions.start, positions.stop)
+        return [
+            row
+            for position in positions
+            for row in self._parse_lines(position, position + 1)
+        ]
+
+    def close(self) -> None:
+        """Stop indexing and release the file."""
+        self._closed = True
+        if self._thread is None or not self._thread.is_alive():
+            self._release()
+
+    async def _open(self) -> None:
+        """Map the file and start indexing it, once."""
+        if self._tick is not None:
+            return
+        self._tick = asyncio.Event()
+        with self.path.open("rb") as file:
+            self._size = self.path.stat().st_size
+            if self._size:
+                self._mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        data_start = 0
+        if self.file_format == "csv":
+            data_start = self._line_end(0)
+            header = bytes(self._mm[:data_start]).decode("utf-8-sig").rstrip("\r\n")
+            self._fields = next(csv.reader([header], delimiter=self.delimiter), [])
+        if not self.columns:
+            self.columns = [Column(key, key) for key in self._keys(data_start)]
+
+        loop = asyncio.get_running_loop()
+        self._thread = threading.Thread(
+            target=self._build_index,
+            args=(loop, data_start),
+            name=f"index-{self.path.name}",
+            daemon=True,
+        )
+        self._thread.start()
+        # Return once the first chunk is indexed, so the first page is ready.
+        await self._wait_progress()
+
+    def _keys(self, data_start: int) -> list[str]:
+        """Get the keys of the record fields."""
+        if self.file_format == "csv":
+            return list(self._fields)
+        if data_start >= self._size:
+            return []
+        line = bytes(self._mm[data_start : self._line_end(data_start)])
+        record = json.loads(line) if line.strip() else {}
+        return list(record) if isinstance(record, dict) else []
+
+    def _line_end(self, start: int) -> int:
+        """Get the offset following the line break after a position."""
+        end = self._mm.find(b"\n", start)
+        return self._size if end < 0 else end + 1
+
+    def _build_index(self, loop: asyncio.AbstractEventLoop, start: int) -> None:
+        """Record the offset of every line; runs on the indexing thread."""
+        try:
+            position = start
+            if position < self._size:
+                self._starts.append(position)
+            while position < self._size and not self._closed:
+                end = min(position + CHUNK_SIZE, self._size)
+                starts = self._scan(position, end)
+                if starts and starts[-1] >= self._size:
+                    starts = starts[:-1]
+                self._starts.extend(starts)
+                position = end
+                loop.call_soon_threadsafe(self._progress, position / self._size)
+        except Exception:  # noqa: BLE001 - reported, the partial index stays usable
+            logger.exception("Failed to index table file", path=str(self.path))
+        finally:
+            loop.call_soon_threadsafe(self._finish)
+            if self._closed:
+                self._release()
+
+    def _scan(self, start: int, end: int) -> array[int]:
+        """Find the offsets of the lines starting within a byte range."""
+        if np is not None:
+            chunk = np.frombuffer(
+                self._mm, dtype=np.uint8, count=end - start, offset=start
+            )
+            return array(
+                "q", (np.flatnonzero(chunk == ord("\n")) + start + 1).tobytes()
+            )
+        starts = array("q")
+        find = self._mm.find
+        position = find(b"\n", start, end)
+        while position >= 0:
+            starts.append(position + 1)
+            position = find(b"\n", position + 1, end)
+        return starts
+
+    def _progress(self, fraction: float) -> None:
+        """Wake up waiting fetches and report indexing progress."""
+        self._notify()
+        if self.on_progress is not None:
+            self.on_progress(self.row_count, fraction)
+
+    def _finish(self) -> None:
+        """Mark indexing as finished."""
+        self.indexed = True
+        self._notify()
+        if self.on_progress is not None:
+            self.on_progress(self.row_count, 1.0)
+
+    def _notify(self) -> None:
+        """Wake up every task waiting for indexing progress."""
+        if self._tick is not None:
+            tick, self._tick = self._tick, asyncio.Event()
+            tick.set()
+
+    async def _wait_progress(self) -> None:
+        """Wait until more of the file is indexed."""
+        if not self.indexed and self._tick is not None:
+            await self._tick.wait()
+
+    def _release(self) -> None:
+        """Close the memory map."""
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._mm = b""
+
+    def _parse_lines(
+        self,
+        start: int,
+        end: int,
+        keys: Sequence[str] | None = None,
+    ) -> list[Row]:
+        """Parse a block of consecutive rows.
+
+        Args:
+            start: Position of the first row
+            end: Position after the last row
+            keys: Keys to keep, all columns when omitted
+
+        Returns:
+            List[Row]: Parsed values by column key
+
+        """
+        columns = self._parse_block(start, end, keys)
+        return [
+            dict(zip(columns, values, strict=True))
+            for values in zip(*columns.values(), strict=True)
+        ]
+
+    def _parse_block(
+        self,
+        start: int,
+        end: int,
+        keys: Sequence[str] | None = None,
+    ) -> dict[str, list[CellValue]]:
+        """Parse a block of consecutive rows column by column.
+
+        Args:
+            start: Position of the first row
+            end: Position after the last row
+            keys: Keys to keep, all columns when omitted
+
+        Returns:
+            Dict[str, List[Any]]: Parsed values by column key
+
+        """
+        keys = keys if keys is not None else [col.key for col in self.columns]
+        if start >= end:
+            return {key: [] for key in keys}
+        stop = self._starts[end] if end < len(self._starts) else self._size
+        text = bytes(self._mm[self._starts[start] : stop]).decode("utf-8")
+        lines = [line.rstrip("\r") for line in text.split("\n")[: end - start]]
+
+        if self.file_format == "jsonl":
+            records = []
+            for line in lines:
+                try:
+                    record = json.loads(line) if line.strip() else {}
+                except ValueError:
+                    record = {}
+                records.append(record if isinstance(record, dict) else {})
+            return {key: [record.get(key) for record in records] for key in keys}
+
+        if '"' in text:
+            fields_by_row = list(csv.reader(lines, delimiter=self.delimiter))
+        else:
+            # Without quotes every delimiter separates fields.
+            fields_by_row = [line.split(self.delimiter) for line in lines]
+        fields = {name: index for index, name in enumerate(self._fields)}
+        columns: dict[str, list[CellValue]] = {}
+        for key in keys:
+            index = fields.get(key, -1)
+            if index < 0:
+                columns[key] = [None] * len(fields_by_row)
+                continue
+            texts = [
+                values[index] if index < len(values) else "" for values in fields_by_row
+            ]
+            columns[key] = list(map(parse_scalar, texts))
+        return columns
+
+    async def _view(
+        self,
+        sort: SortSpec,
+        predicate: Predicate | None,
+    ) -> Sequence[int]:
+        """Get row positions in sort order, filtered, once indexing ends."""
+        async with self._lock:
+            view = self._views.get((sort, predicate))
+            if view is not None:
+                return view
+            while not self.indexed:
+                await self._wait_progress()
+
+            keys = {key for key, _ in sort}
+            if predicate is not None:
+                keys |= predicate.columns()
+            store, sort_index, engine = await self._load_frame(keys)
+            engine.apply(predicate)
+            view = engine.view(sort, reverse=False)
+            self._views[(sort, predicate)] = view
+            return view
+
+    async def _load_frame(
+        self,
+        keys: set[str],
+    ) -> tuple[ColumnStore, SortIndex, TableFilter]:
+        """Parse the given columns of every row into a column store.
+
+        The store is kept and only rebuilt when new columns are needed;
+        columns it already holds are copied instead of parsed again.
+        """
+        previous = self._frame[0] if self._frame is not None else None
+        loaded = set(previous.arrays) if previous is not None else set()
+        if self._frame is not None and keys <= loaded:
+            return self._frame
+        keys |= loaded
+        columns = [col for col in self.columns if col.key in keys]
+        columns += [Column(key, key) for key in keys - {col.key for col in columns}]
+        store = await asyncio.to_thread(self._parse_columns, columns, previous)
+        sort_index = SortIndex(store)
+        self._frame = (store, sort_index, TableFilter(store, sort_index))
+        self._views.clear()
+        return self._frame
+
+    def _parse_columns(
+        self,
+        columns: list[Column],
+        previous: ColumnStore | None,
+    ) -> ColumnStore:
+        """Parse columns of every row; runs on a worker thread."""
+        copied = {
+            col.key: list(previous.column(col.key))
+            for col in columns
+            if previous is not None and col.key in previous.arrays
+        }
+        keys = [col.key for col in columns if col.key not in copied]
+        store = ColumnStore(columns)
+        for start in range(0, self.row_count, PARSE_BATCH):
+            end = min(start + PARSE_BATCH, self.row_count)
+            # A filter that tests no column needs rows but no values.
+            values = self._parse_block(start, end, keys) if keys else {}
+            values.update((key, column[start:end]) for key, column in copied.items())
+            store.append_columns(values, end - start)
+        return store
@@ -0,0 +1,939 @@
+"""Filtering engine for table widgets.
+
+Filters are predicate expressions over column values, such as
+``Eq("region", "eu") & Range("latency", high=50)``. They are evaluated by a
+``TableFilter`` into a byte mask over the store, which is then composed with
+the cached sort order. Optional per-column indexes speed up evaluation: hash
+indexes answer equality and sorted indexes answer ranges.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from functools import cached_property
+from itertools import compress
+from typing import TYPE_CHECKING, Any, Literal, cast
+
+from .store import DictColumn
+
+if TYPE_CHECKING:
+    from collections.abc import (
+        Callable,
+        Iterable,
+        Mapping,
+        MutableSequence,
+        Sequence,
+    )
+
+    from .column import ColumnType
+    from .sort import SortIndex, SortSpec
+    from .store import CellValue, ColumnStore
+
+
+IndexKind = Literal["hash", "sorted"]
+
+# Changed rows up to which a sorted index is patched in place; patching moves
+# the tail of its arrays per row, rebuilding walks every row in Python.
+SORTED_PATCH_LIMIT = 512
+
+
+class Predicate(ABC):
+    """Base class for filter predicates.
+
+    Predicates combine with ``&`` (AND) and ``|`` (OR).
+    """
+
+    @abstractmethod
+    def columns(self) -> frozenset[str]:
+        """Get the keys of the columns the predicate reads.
+
+        Returns:
+            FrozenSet[str]: Column keys
+
+        """
+
+    @abstractmethod
+    def matches(self, store: ColumnStore, row: int) -> bool:
+        """Test a single row without going through the indexes.
+
+        Args:
+            store: Column store
+            row: Row index
+
+        Returns:
+            bool: Whether the row matches
+
+        """
+
+    @abstractmethod
+    def select(
+        self,
+        engine: TableFilter,
+        rows: Sequence[int] | None,
+    ) -> Sequence[int]:
+        """Select the matching rows.
+
+        Args:
+            engine: Filter engine giving access to the store and indexes
+            rows: Ascending candidate row indexes, all rows when ``None``
+
+        Returns:
+            Sequence[int]: Ascending indexes of the matching rows
+
+        """
+
+    def narrows(self, other: Predicate) -> bool:
+        """Check whether every row matching this predicate matches another.
+
+        When it does, the new predicate only needs to be evaluated over the
+        rows selected by the other one.
+
+        Args:
+            other: Previously applied predicate
+
+        Returns:
+            bool: Whether this predicate is at least as strict
+
+        """
+        if self == other:
+            return True
+        if isinstance(other, Or):
+            return any(self.narrows(term) for term in other.terms)
+        if isinstance(other, And):
+            return all(self.narrows(term) for term in other.terms)
+        return self._narrows(other)
+
+    def _narrows(self, other: Predicate) -> bool:
+        """Check narrowing against a predicate that is not AND/OR."""
+        return False
+
+    def __and__(self, other: Predicate) -> And:
+        """Combine predicates with AND."""
+        return And(self, other)
+
+    def __or__(self, other: Predicate) -> Or:
+        """Combine predicates with OR."""
+        return Or(self, other)
+
+
+@dataclass(frozen=True)
+class ColumnPredicate(Predicate):
+    """Predicate testing the values of a single column.
+
+    Attributes:
+        key (str): Column key
+
+    """
+
+    key: str
+
+    def columns(self) -> frozenset[str]:
+        """Get the keys of the columns the predicate reads."""
+        return frozenset((self.key,))
+
+    def matches(self, store: ColumnStore, row: int) -> bool:
+        """Test the value of the column in a single row."""
+        return self.test(store.value(row, self.key))
+
+    @abstractmethod
+    def test(self, value: CellValue) -> bool:
+        """Test a single value.
+
+        Args:
+            value: Cell value
+
+        Returns:
+            bool: Whether the value matches
+
+        """
+
+    def select(
+        self,
+        engine: TableFilter,
+        rows: Sequence[int] | None,
+    ) -> Sequence[int]:
+        """Select the matching rows by scanning the column."""
+        return engine.scan(self.key, self.test, rows)
+
+
+@dataclass(frozen=True)
+class Eq(ColumnPredicate):
+    """Match values equal to a given value.
+
+    Attributes:
+        value (Any): Value to match
+
+    """
+
+    value: CellValue
+
+    def test(self, value: CellValue) -> bool:
+        """Test a single value."""
+        return value is None if self.value is None else value == self.value
+
+    def select(
+        self,
+        engine: TableFilter,
+        rows: Sequence[int] | None,
+    ) -> Sequence[int]:
+        """Select the matching rows, using a hash index if there is one."""
+        index = engine.hash_index(self.key)
+        if index is None:
+            return super().select(engine, rows)
+        return intersect(rows, index.lookup(self.value))
+
+
+@dataclass(frozen=True)
+class Range(ColumnPredicate):
+    """Match values inside an inclusive range.
+
+    Attributes:
+        low (Any): Lower bound, unbounded when ``None``
+        high (Any): Upper bound, unbounded when ``None``
+
+    """
+
+    low: CellValue = None
+    high: CellValue = None
+
+    def test(self, value: CellValue) -> bool:
+        """Test a single value."""
+        if not _indexed(value):
+            return False
+        # Bounds of another type than the value raise TypeError.
+        low, high = cast("Any", self.low), cast("Any", self.high)
+        try:
+            return (low is None or low <= value) and (high is None or value <= high)
+        except TypeError:
+            return False
+
+    def select(
+        self,
+        engine: TableFilter,
+        rows: Sequence[int] | None,
+    ) -> Sequence[int]:
+        """Select the matching rows, using a sorted index if there is one."""
+        index = engine.sorted_index(self.key)
+        selected = None if index is None else index.between(self.low, self.high)
+        if selected is None:
+            return super().select(engine, rows)
+        return intersect(rows, selected)
+
+    def _narrows(self, other: Predicate) -> bool:
+        """Check whether the range lies inside another range."""
+        if not isinstance(other, Range) or other.key != self.key:
+            return False
+        low, high = cast("Any", self.low), cast("Any", self.high)
+        try:
+            return (other.low is None or (low is not None and other.low <= low)) and (
+                other.high is None or (high is not None and high <= other.high)
+            )
+        except TypeError:
+            return False
+
+
+@dataclass(frozen=True)
+class Contains(ColumnPredicate):
+    """Match values whose text contains a substring.
+
+    Attributes:
+        text (str): Substring to look for
+        case_sensitive (bool): Whether letter case must match
+
+    """
+
+    text: str
+    case_sensitive: bool = False
+
+    @cached_property
+    def needle(self) -> str:
+        """Get the substring in the form it is compared in."""
+        return self.text if self.case_sensitive else self.text.casefold()
+
+    def test(self, value: CellValue) -> bool:
+        """Test a single value."""
+        if value is None:
+            return False
+        text = str(value)
+        return self.needle in (text if self.case_sensitive else text.casefold())
+
+    def _narrows(self, other: Predicate) -> bool:
+        """Check whether the substring extends another substring filter."""
+        return (
+            isinstance(other, Contains)
+            and other.key == self.key
+            and other.case_sensitive == self.case_sensitive
+            and other.needle in self.needle
+        )
+
+
+@dataclass(frozen=True)
+class Regex(ColumnPredicate):
+    """Match values whose text matches a regular expression.
+
+    Attributes:
+        pattern (str): Regular expression, searched anywhere in the text
+        flags (int): ``re`` module flags
+
+    """
+
+    pattern: str
+    flags: int = 0
+
+    @cached_property
+    def compiled(self) -> re.Pattern[str]:
+        """Get the compiled expression.
+
+        Raises:
+            re.error: If the pattern is not a valid regular expression.
+
+        """
+        return re.compile(self.pattern, self.flags)
+
+    def test(self, value: CellValue) -> bool:
+        """Test a single value."""
+        return value is not None and self.compiled.search(str(value)) is not None
+
+
+@dataclass(frozen=True, init=False)
+class And(Predicate):
+    """Match rows matching every term.
+
+    Terms are evaluated in order, each over the rows the previous ones
+    selected, so cheap or indexed terms should come first.
+
+    Attributes:
+        terms (Tuple[Predicate, ...]): Combined predicates
+
+    """
+
+    terms: tuple[Predicate, ...]
+
+    def __init__(self, *terms: Predicate) -> None:
+        """Initialize the predicate.
+
+        Args:
+            *terms: Predicates to combine
+
+        """
+        flat: list[Predicate] = []
+        for term in terms:
+            flat.extend(term.terms if isinstance(term, And) else (term,))
+        object.__setattr__(self, "terms", tuple(flat))
+
+    def columns(self) -> frozenset[str]:
+        """Get the keys of the columns the predicate reads."""
+        return frozenset().union(*(term.columns() for term in self.terms))
+
+    def matches(self, store: ColumnStore, row: int) -> bool:
+        """Test whether a single row matches every term."""
+        return all(term.matches(store, row) for term in self.terms)
+
+    def select(
+        self,
+        engine: TableFilter,
+        rows: Sequence[int] | None,
+    ) -> Sequence[int]:
+        """Select the rows matching every term."""
+        for term in self.terms:
+            rows = term.select(engine, rows)
+            if not rows:
+                break
+        return engine.all_rows() if rows is None else rows
+
+    def _narrows(self, other: Predicate) -> bool:
+        """Check whether any term is at least as strict as the other filter."""
+        return any(term.narrows(other) for term in self.terms)
+
+
+@dataclass(frozen=True, init=False)
+class Or(Predicate):
+    """Match rows matching at least one term.
+
+    Attributes:
+        terms (Tuple[Predicate, ...]): Combined predicates
+
+    """
+
+    terms: tuple[Predicate, ...]
+
+    def __init__(self, *terms: Predicate) -> None:
+        """Initialize the predicate.
+
+        Args:
+            *terms: Predicates to combine
+
+        """
+        flat: list[Predicate] = []
+        for term in terms:
+            flat.extend(term.terms if isinstance(term, Or) else (term,))
+        object.__setattr__(self, "terms", tuple(flat))
+
+    def columns(self) -> frozenset[str]:
+        """Get the keys of the columns the predicate reads."""
+        return frozenset().union(*(term.columns() for term in self.terms))
+
+    def matches(self, store: ColumnStore, row: int) -> bool:
+        """Test whether a single row matches any term."""
+        return any(term.matches(store, row) for term in self.terms)
+
+    def select(
+        self,
+        engine: TableFilter,
+        rows: Sequence[int] | None,
+    ) -> Sequence[int]:
+        """Select the rows matching any term."""
+        selected: set[int] = set()
+        for term in self.terms:
+            selected.update(term.select(engine, rows))
+        return array("q", sorted(selected))
+
+    def narrows(self, other: Predicate) -> bool:
+        """Check whether every term is at least as strict as the other filter."""
+        return self == other or all(term.narrows(other) for term in self.terms)
+
+
+def _indexed(value: CellValue) -> bool:
+    """Check whether a value is placed in sorted indexes, unlike None and NaN."""
+    return value is not None and not (isinstance(value, float) and math.isnan(value))
+
+
+def intersect(
+    rows: Sequence[int] | None,
+    selected: Sequence[int],
+) -> Sequence[int]:
+    """Intersect two ascending row index sequences.
+
+    Args:
+        rows: Candidate rows, all rows when ``None``
+        selected: Rows selected by an index
+
+    Returns:
+        Sequence[int]: Ascending indexes present in both
+
+    """
+    if rows is None:
+        return selected
+    if len(rows) <= len(selected):
+        keep = set(selected)
+        return array("q", [row for row in rows if row in keep])
+    keep = set(rows)
+    return array("q", [row for row in selected if row in keep])
+
+
+class HashIndex:
+    """Equality index mapping each value to the rows holding it."""
+
+    def __init__(self, store: ColumnStore, key: str) -> None:
+        """Initialize the index; postings are built on first lookup.
+
+        Args:
+            store: Column store
+            key: Column key
+
+        """
+        self.store = store
+        self.key = key
+        self._postings: dict[CellValue, set[int]] | None = None
+        self._sorted: dict[CellValue, array[int]] = {}
+
+    def _build(self) -> dict[CellValue, set[int]]:
+        """Build the postings from the column values."""
+        postings: dict[CellValue, set[int]] = {}
+        for row, value in enumerate(self.store.column(self.key)):
+            postings.setdefault(value, set()).add(row)
+        return postings
+
+    def lookup(self, value: CellValue) -> Sequence[int]:
+        """Get the rows holding a value.
+
+        Args:
+            value: Cell value
+
+        Returns:
+            Sequence[int]: Ascending row indexes
+
+        """
+        if self._postings is None:
+            self._postings = self._build()
+        rows = self._sorted.get(value)
+        if rows is None:
+            rows = array("q", sorted(self._postings.get(value, ())))
+            self._sorted[value] = rows
+        return rows
+
+    def rows_appended(self, rows: Iterable[int]) -> None:
+        """Add appended rows to the postings."""
+        if self._postings is None:
+            return
+        column = self.store.column(self.key)
+        for row in rows:
+            value = column[row]
+            self._postings.setdefault(value, set()).add(row)
+            self._sorted.pop(value, None)
+
+    def row_updated(self, row: int, previous: CellValue) -> None:
+        """Move an updated row to the posting of its new value."""
+        if self._postings is None:
+            return
+        value = self.store.value(row, self.key)
+        self._postings.get(previous, set()).discard(row)
+        self._postings.setdefault(value, set()).add(row)
+        self._sorted.pop(previous, None)
+        self._sorted.pop(value, None)
+
+
+class SortedIndex:
+    """Range index over the values of a column in ascending order.
+
+    Rows with equal values are kept in ascending row order, so that appended,
+    updated and deleted rows are found and placed by bisection and small
+    changes patch the index instead of rebuilding it.
+    """
+
+    def __init__(self, store: ColumnStore, sort_index: SortIndex, key: str) -> None:
+        """Initialize the index; it is built on first lookup.
+
+        Args:
+            store: Column store
+            sort_index: Sort index providing the ascending permutation
+            key: Column key
+
+        """
+        self.store = store
+        self.sort_index = sort_index
+        self.key = key
+        self._rows: array[int] | None = None
+        # Values of one column compare with each other, whatever their type.
+        self._values: MutableSequence[Any] = []
+        self._dtype: ColumnType | None = None
+
+    def _build(self) -> tuple[array[int], MutableSequence[Any]]:
+        """Collect the non-null values in ascending order."""
+        column = self.store.column(self.key)
+        typecode = {"int": "q", "float": "d"}.get(column.dtype)
+        values: MutableSequence[Any] = [] if typecode is None else array(typecode)
+        rows = array("q")
+        for row in self.sort_index.order(((self.key, False),)):
+            value = column[row]
+            if _indexed(value):
+                rows.append(row)
+                values.append(value)
+        self._rows = rows
+        self._values = values
+        self._dtype = column.dtype
+        return rows, values
+
+    def between(self, low: CellValue, high: CellValue) -> Sequence[int] | None:
+        """Get the rows with values inside an inclusive range.
+
+        Args:
+            low: Lower bound, unbounded when ``None``
+            high: Upper bound, unbounded when ``None``
+
+        Returns:
+            Optional[Sequence[int]]: Ascending row indexes, ``None`` if the
+                bounds cannot be compared with the column values
+
+        """
+        rows, values = self._rows, self._values
+        if rows is None:
+            rows, values = self._build()
+        try:
+            start = 0 if low is None else bisect_left(values, low)
+            end = len(values) if high is None else bisect_right(values, high)
+        except TypeError:
+            return None
+        return array("q", sorted(rows[start:end]))
+
+    def _patch(
+        self,
+        count: int,
+        removed: Iterable[tuple[int, CellValue]],
+        added: Iterable[int],
+    ) -> None:
+        """Remove and insert rows, or drop the index when a rebuild is cheaper.
+
+        Args:
+            count: Number of changed rows
+            removed: Rows to remove, with the value they are indexed under
+            added: Rows to insert under their current value
+
+        """
+        rows, values = self._rows, self._values
+        if rows is None:
+            return
+        column = self.store.column(self.key)
+        # Widening the column changes the type of its values.
+        if count > SORTED_PATCH_LIMIT or column.dtype != self._dtype:
+            self.invalidate()
+            return
+        try:
+            for row, value in removed:
+                if _indexed(value):
+                    start = bisect_left(values, value)
+                    end = bisect_right(values, value, start)
+                    position = bisect_left(rows, row, start, end)
+                    if position < end and rows[position] == row:
+                        del rows[position]
+                        del values[position]
+            for row in added:
+                value = column[row]
+                if _indexed(value):
+                    start = bisect_left(values, value)
+                    end = bisect_right(values, value, start)
+                    position = bisect_left(rows, row, start, end)
+                    values.insert(position, value)
+                    rows.insert(position, row)
+        except TypeError:
+            # A value that does not compare with the others is left to a
+            # rebuild, after which range lookups fall back to scanning.
+            self.invalidate()
+
+    def rows_appended(self, rows: Sequence[int]) -> None:
+        """Insert appended rows."""
+        self._patch(len(rows), (), rows)
+
+    def rows_updated(self, previous: Mapping[int, CellValue]) -> None:
+        """Move updated rows from their previous value to their new one.
+
+        Args:
+            previous: Value of the column before the update, by row
+
+        """
+        self._patch(len(previous), previous.items(), previous)
+
+    def rows_deleted(self, rows: Sequence[int]) -> None:
+        """Remove deleted rows, whose values stay in the store."""
+        column = self.store.column(self.key)
+        self._patch(len(rows), ((row, column[row]) for row in rows), ())
+
+    def invalidate(self) -> None:
+        """Drop the index so that it is rebuilt on the next lookup."""
+        self._rows = None
+        self._values = []
+        self._dtype = None
+
+
+class TableFilter:
+    """Filter state of a table: active predicate, result mask and indexes.
+
+    Example:
+        >>> engine = TableFilter(store, sort_index)
+        >>> engine.create_index("region", "hash")
+        >>> engine.apply(Eq("region", "eu") & Contains("host", "db"))
+
+    Attributes:
+        predicate (Optional[Predicate]): Active filter
+        count (int): Number of rows matching the filter
+
+    """
+
+    def __init__(self, store: ColumnStore, sort_index: SortIndex) -> None:
+        """Initialize the filter engine.
+
+        Args:
+            store: Column store
+            sort_index: Sort index the filtered view is composed with
+
+        """
+        self.store = store
+        self.sort_index = sort_index
+        self.predicate: Predicate | None = None
+        self.count = 0
+        self._indexes: dict[str, HashIndex | SortedIndex] = {}
+        self._mask: bytearray | None = None
+        self._rows: Sequence[int] | None = None
+        self._views: dict[tuple[SortSpec, bool], Sequence[int]] = {}
+
+    def rebind(self, store: ColumnStore, sort_index: SortIndex) -> TableFilter:
+        """Create an engine over new data with the same filter and indexes.
+
+        Args:
+            store: New column store
+            sort_index: New sort index
+
+        Returns:
+            TableFilter: Engine with the predicate re-applied
+
+        """
+        engine = TableFilter(store, sort_index)
+        for key, index in self._indexes.items():
+            engine.create_index(
+                key, "hash" if isinstance(index, HashIndex) else "sorted"
+            )
+        engine.apply(self.predicate)
+        return engine
+
+    @property
+    def active(self) -> bool:
+        """Check whether a filter is applied."""
+        return self.predicate is not None
+
+    def create_index(self, key: str, kind: IndexKind = "hash") -> None:
+        """Create an index on a column; it is built on first use.
+
+        Args:
+            key: Column key
+            kind: "hash" for equality or "sorted" for ranges
+
+        Raises:
+            KeyError: If the key is not a table column.
+            ValueError: If the index kind is unknown.
+
+        """
+        self.store.column(key)
+        if kind == "hash":
+            self._indexes[key] = HashIndex(self.store, key)
+        elif kind == "sorted":
+            self._indexes[key] = SortedIndex(self.store, self.sort_index, key)
+        else:
+            error_msg = f"Unknown index kind '{kind}'"
+            raise ValueError(error_msg)
+
+    def drop_index(self, key: str) -> None:
+        """Drop the index of a column, if any.
+
+        Args:
+            key: Column key
+
+        """
+        self._indexes.pop(key, None)
+
+    def hash_index(self, key: str) -> HashIndex | None:
+        """Get the hash index of a column, if any."""
+        index = self._indexes.get(key)
+        return index if isinstance(index, HashIndex) else None
+
+    def sorted_index(self, key: str) -> SortedIndex | None:
+        """Get the sorted index of a column, if any."""
+        index = self._indexes.get(key)
+        return index if isinstance(index, SortedIndex) else None
+
+    def all_rows(self) -> Sequence[int]:
+        """Get every live row index in ascending order."""
+        return self.store.live_rows()
+
+    def apply(self, predicate: Predicate | None) -> int:
+        """Apply a filter.
+
+        If the new predicate narrows the active one, only the rows matched
+        so far are evaluated again.
+
+        Args:
+            predicate: Filter to apply, ``None`` to clear it
+
+        Returns:
+            int: Number of matching rows
+
+        """
+        previous = self.predicate
+        candidates = self.matched_rows()
+        self.predicate = predicate
+        self._views.clear()
+        if predicate is None:
+            self._mask = None
+            self._rows = None
+            self.count = self.store.row_count
+            return self.count
+
+        if previous is None or not predicate.narrows(previous):
+            candidates = None
+        selected = predicate.select(self, candidates)
+        mask = bytearray(len(self.store))
+        deleted = self.store.deleted
+        for row in selected:
+            if deleted is None or not deleted[row]:
+                mask[row] = 1
+        self._mask = mask
+        self._rows = None
+        self.count = mask.count(1)
+        return self.count
+
+    def matched_rows(self) -> Sequence[int] | None:
+        """Get the rows matching the active filter.
+
+        Returns:
+            Optional[Sequence[int]]: Ascending row indexes, ``None`` when no
+                filter is applied
+
+        """
+        if self._mask is None:
+            return None
+        if self._rows is None:
+            self._rows = array("q", compress(range(len(self._mask)), self._mask))
+        return self._rows
+
+    def scan(
+        self,
+        key: str,
+        test: Callable[[CellValue], bool],
+        rows: Sequence[int] | None,
+    ) -> Sequence[int]:
+        """Select rows by testing every candidate value.
+
+        Dictionary-encoded columns test each distinct value once and then
+        only map row codes to the results.
+
+        Args:
+            key: Column key
+            test: Value test
+            rows: Ascending candidate rows, all rows when ``None``
+
+        Returns:
+            Sequence[int]: Ascending indexes of the matching rows
+
+        """
+        column = self.store.column(key)
+        if isinstance(column, DictColumn):
+            # Code -1 (None) picks the trailing entry.
+            hits = bytes([test(value) for value in (*column.dictionary, None)])
+            codes = column.codes
+            if rows is None:
+                flags = map(hits.__getitem__, codes)
+                return array("q", compress(range(len(codes)), flags))
+            return array("q", [row for row in rows if hits[codes[row]]])
+        if rows is None:
+            return array("q", compress(range(len(column)), map(test, column)))
+        return array("q", [row for row in rows if test(column[row])])
+
+    def view(self, spec: SortSpec, reverse: bool) -> Sequence[int]:
+        """Get the matching rows in sort order.
+
+        Small results are sorted directly with the cached sort keys; large
+        ones are taken from the cached full permutation in a single pass.
+
+        Args:
+            spec: ``(key, descending)`` pairs in priority order
+            reverse: Whether to flip the direction of every key
+
+        Returns:
+            Sequence[int]: Row indexes in display order
+
+        """
+        rows = self.matched_rows()
+        if rows is None:
+            return self.sort_index.order(spec, reverse=reverse)
+        if not spec:
+            return rows
+        view = self._views.get((spec, reverse))
+        if view is None:
+            if 8 * len(rows) < self.store.row_count:
+                view = self.sort_index.sort_rows(spec, rows, reverse=reverse)
+            else:
+                assert self._mask is not None
+                order = self.sort_index.order(spec, reverse=reverse)
+                view = array("q", compress(order, map(self._mask.__getitem__, order)))
+            self._views[(spec, reverse)] = view
+        return view
+
+    def _select_changed(
+        self,
+        predicate: Predicate,
+        rows: Sequence[int],
+    ) -> Sequence[int]:
+        """Select the matching rows among appended or updated rows.
+
+        Small batches are tested row by row, so that a range over an indexed
+        column does not look up every row of the range for a handful of rows.
+
+        Args:
+            predicate: Active filter
+            rows: Ascending indexes of the changed rows
+
+        Returns:
+            Sequence[int]: Ascending indexes of the matching rows
+
+        """
+        if 8 * len(rows) < self.store.row_count:
+            store = self.store
+            return [row for row in rows if predicate.matches(store, row)]
+        return predicate.select(self, rows)
+
+    def rows_appended(self, rows: range) -> None:
+        """Evaluate the filter over appended rows only.
+
+        Args:
+            rows: Indexes of the appended rows
+
+        """
+        for index in self._indexes.values():
+            index.rows_appended(rows)
+        self._views.clear()
+        if self._mask is None or self.predicate is None:
+            return
+        self._mask.extend(bytes(len(rows)))
+        for row in self._select_changed(self.predicate, rows):
+            self._mask[row] = 1
+            self.count += 1
+        self._rows = None
+
+    def rows_updated(self, previous: Mapping[int, Mapping[str, CellValue]]) -> bool:
+        """Re-evaluate the filter for updated rows only.
+
+        Args:
+            previous: Values before the update, by row and column key
+
+        Returns:
+            bool: Whether a row entered or left the filtered view
+
+        """
+        columns = set().union(*previous.values())
+        for key in columns:
+            index = self._indexes.get(key)
+            if index is None:
+                continue
+            changed = {
+                row: values[key] for row, values in previous.items() if key in values
+            }
+            if isinstance(index, HashIndex):
+                for row, value in changed.items():
+                    index.row_updated(row, value)
+            else:
+                index.rows_updated(changed)
+
+        spec_keys = {key for spec, _ in self._views for key, _ in spec}
+        if self._mask is None or self.predicate is None:
+            return False
+        if columns & spec_keys:
+            self._views.clear()
+        if not columns & self.predicate.columns():
+            return False
+
+        rows = sorted(previous)
+        selected = set(self._select_changed(self.predicate, rows))
+        changed = False
+        for row in rows:
+            match = row in selected
+            if bool(self._mask[row]) != match:
+                self._mask[row] = match
+                self.count += 1 if match else -1
+                changed = True
+        if changed:
+            self._rows = None
+            self._views.clear()
+        return changed
+
+    def rows_deleted(self, rows: Sequence[int]) -> None:
+        """Drop deleted rows from the filter result.
+
+        Args:
+            rows: Indexes of the deleted rows
+
+        """
+        self._views.clear()
+        for index in self._indexes.values():
+            if isinstance(index, SortedIndex):
+                index.rows_deleted(rows)
+        if self._mask is None:
+            return
+        for row in rows:
+            if self._mask[row]:
+                self._mask[row] = 0
+                self.count -= 1
+        self._rows = None
@@ -0,0 +1,97 @@
+"""Cell formatters for table columns.
+
+A formatter turns a stored cell value into the text shown in the table. It
+is set per column with ``Column(formatter=...)``; formatted rows are cached
+by the table, so a formatter only runs again for rows whose data changed.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import UTC, date, datetime
+
+from .store import CellValue
+
+CellFormatter = Callable[[CellValue], str]
+
+
+def format_value(value: CellValue) -> str:
+    """Format a value with ``str``, showing ``None`` as an empty cell.
+
+    Args:
+        value: Cell value
+
+    Returns:
+        str: Cell text
+
+    """
+    return "" if value is None else str(value)
+
+
+def format_number(
+    precision: int = 2,
+    unit: str = "",
+    *,
+    thousands: bool = False,
+) -> CellFormatter:
+    """Create a formatter for numbers with fixed precision.
+
+    Example:
+        >>> format_number(1, " ms")(12.345)
+        '12.3 ms'
+
+    Args:
+        precision: Digits after the decimal point
+        unit: Suffix appended to the number
+        thousands: Whether to group thousands with commas
+
+    Returns:
+        CellFormatter: Formatter; values that are not numbers use ``str``
+
+    """
+    spec = f"{',' if thousands else ''}.{precision}f"
+
+    def formatter(value: CellValue) -> str:
+        if value is None:
+            return ""
+        if isinstance(value, bool) or not isinstance(value, int | float):
+            return str(value)
+        return f"{format(value, spec)}{unit}"
+
+    return formatter
+
+
+def format_timestamp(
+    fmt: str = "%Y-%m-%d %H:%M:%S",
+    *,
+    utc: bool = False,
+) -> CellFormatter:
+    """Create a formatter for dates, datetimes and epoch seconds.
+
+    Example:
+        >>> format_timestamp("%H:%M", utc=True)(0)
+        '00:00'
+
+    Args:
+        fmt: ``strftime`` format
+        utc: Whether epoch seconds are shown in UTC instead of local time
+
+    Returns:
+        CellFormatter: Formatter; other values use ``str``
+
+    """
+
+    def formatter(value: CellValue) -> str:
+        if value is None:
+            return ""
+        if isinstance(value, date):
+            return value.strftime(fmt)
+        if isinstance(value, bool) or not isinstance(value, int | float):
+            return str(value)
+        try:
+            moment = datetime.fromtimestamp(value, UTC if utc else None)
+        except (OverflowError, OSError, ValueError):
+            return str(value)
+        return moment.strftime(fmt)
+
+    return formatter
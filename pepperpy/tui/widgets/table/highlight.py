@@ -0,0 +1,210 @@
+"""Change highlighting for live table cells.
+
+Cells whose value changes are highlighted and the highlight fades out over
+a fixed duration. Highlights are kept in change order, so expiring them only
+visits the cells whose time is up, and every highlight is driven by one
+clock owned by the table instead of a timer per cell. The fade is quantized
+into a few steps so that the clock only needs to tick once per step.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from rich.color import Color, blend_rgb
+from rich.style import Style
+from rich.text import Text
+
+from .aggregate import is_number
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping, Sequence
+
+    from .column import Column
+    from .store import CellValue, ColumnStore
+
+# Highlight colors of numbers that rose or fell, and of other changes.
+HIGHLIGHT_UP = "#50fa7b"
+HIGHLIGHT_DOWN = "#ff5555"
+HIGHLIGHT_CHANGED = "#ffb86c"
+
+# Color the highlight fades into, the table background.
+HIGHLIGHT_BACKGROUND = "#44475a"
+
+# Distinct fade levels between a change and the end of its highlight.
+HIGHLIGHT_STEPS = 8
+
+
+@lru_cache(maxsize=64)
+def highlight_style(color: str, step: int) -> Style:
+    """Get the cell style of a highlight at a fade step.
+
+    Args:
+        color: Highlight color
+        step: Fade step, 0 for a fresh change
+
+    Returns:
+        Style: Background blended from the color into the table background
+
+    """
+    start = Color.parse(color).get_truecolor()
+    end = Color.parse(HIGHLIGHT_BACKGROUND).get_truecolor()
+    blended = blend_rgb(start, end, step / HIGHLIGHT_STEPS)
+    return Style(bgcolor=Color.from_triplet(blended))
+
+
+def change_color(old: CellValue, new: CellValue) -> str:
+    """Get the highlight color of a value change.
+
+    Args:
+        old: Previous value
+        new: Current value
+
+    Returns:
+        str: Color for a rise, a fall or any other change
+
+    """
+    if is_number(old) and is_number(new) and old != new:
+        return HIGHLIGHT_UP if new > old else HIGHLIGHT_DOWN
+    return HIGHLIGHT_CHANGED
+
+
+class ChangeHighlights:
+    """Highlighted cells and the time of their last change.
+
+    Example:
+        >>> highlights = ChangeHighlights(duration=1.0)
+        >>> highlights.changed(row, {"latency": 12}, store, now)
+        >>> highlights.expire(now + 1.0)
+        [(row, 'latency')]
+
+    Attributes:
+        duration (float): Seconds a highlight lasts, 0 to disable
+        cells (OrderedDict): Change time and color by ``(row, key)``, oldest
+            change first
+        rows (Dict[int, int]): Number of highlighted cells by row
+
+    """
+
+    def __init__(self, duration: float = 0.0) -> None:
+        """Initialize without highlights.
+
+        Args:
+            duration: Seconds a highlight lasts, 0 to disable
+
+        """
+        self.duration = max(0.0, duration)
+        self.cells: OrderedDict[tuple[int, str], tuple[float, str]] = OrderedDict()
+        self.rows: dict[int, int] = {}
+
+    @property
+    def interval(self) -> float:
+        """Get the seconds between two fade steps."""
+        return self.duration / HIGHLIGHT_STEPS
+
+    def __bool__(self) -> bool:
+        """Check whether any cell is highlighted."""
+        return bool(self.cells)
+
+    def changed(
+        self,
+        row: int,
+        previous: Mapping[str, CellValue],
+        store: ColumnStore,
+        now: float,
+    ) -> None:
+        """Highlight the cells of a row whose value changed.
+
+        Args:
+            row: Row index
+            previous: Values before the change by column key
+            store: Column store holding the current values
+            now: Time of the change
+
+        """
+        if not self.duration:
+            return
+        for key, old in previous.items():
+            cell = (row, key)
+            if cell in self.cells:
+                self.cells.move_to_end(cell)
+            else:
+                self.rows[row] = self.rows.get(row, 0) + 1
+            self.cells[cell] = (now, change_color(old, store.value(row, key)))
+
+    def _remove(self, cell: tuple[int, str]) -> None:
+        """Drop the highlight of a cell."""
+        del self.cells[cell]
+        row = cell[0]
+        self.rows[row] -= 1
+        if not self.rows[row]:
+            del self.rows[row]
+
+    def expire(self, now: float) -> list[tuple[int, str]]:
+        """Drop the highlights that ended.
+
+        Args:
+            now: Current time
+
+        Returns:
+            List[Tuple[int, str]]: ``(row, key)`` of the cells whose
+            highlight ended
+
+        """
+        ended = []
+        deadline = now - self.duration
+        while self.cells:
+            cell, (changed, _color) = next(iter(self.cells.items()))
+            if changed > deadline:
+                break
+            self._remove(cell)
+            ended.append(cell)
+        return ended
+
+    def discard_rows(self, rows: Iterable[int]) -> None:
+        """Drop the highlights of deleted rows.
+
+        Args:
+            rows: Row indexes
+
+        """
+        rows = {row for row in rows if row in self.rows}
+        for cell in [cell for cell in self.cells if cell[0] in rows]:
+            self._remove(cell)
+
+    def clear(self) -> None:
+        """Drop every highlight."""
+        self.cells.clear()
+        self.rows.clear()
+
+    def apply(
+        self,
+        row: int,
+        columns: Sequence[Column],
+        cells: Sequence[str],
+        now: float,
+    ) -> list[str | Text]:
+        """Style the highlighted cells of a row for rendering.
+
+        Args:
+            row: Row index
+            columns: Rendered columns
+            cells: Cell text in column order
+            now: Current time
+
+        Returns:
+            List: Cell text, as styled ``Text`` for highlighted cells
+
+        """
+        styled: list[str | Text] = []
+        for col, text in zip(columns, cells, strict=True):
+            change = self.cells.get((row, col.key))
+            if change is None:
+                styled.append(text)
+                continue
+            changed, color = change
+            step = min(HIGHLIGHT_STEPS - 1, int((now - changed) / self.interval))
+            styled.append(Text(text, style=highlight_style(color, max(0, step))))
+        return styled
@@ -0,0 +1,563 @@
+"""Cached sort permutations for table widgets.
+
+Sorting uses typed keys precomputed once per column (see
+``ColumnArray.sort_keys``). Null values sort last in either direction: a
+column holding nulls is sorted by its null flags first, which are never
+negated for a descending sort. When NumPy is installed the permutation is
+computed with a vectorized stable argsort over those key buffers, otherwise
+with successive stable ``list.sort`` passes. Large sorts can be prepared on
+a worker thread from a snapshot of the sorted columns.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from collections.abc import Sequence
+from itertools import chain
+from typing import TYPE_CHECKING, Any, overload
+
+from .store import sorted_in_blocks
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+    from .store import ColumnArray, ColumnStore
+
+SortSpec = tuple[tuple[str, bool], ...]
+
+SortKeys = list[tuple[Sequence[int] | Sequence[float], bool]]
+
+# Above one appended row in this many sorted rows, cached permutations are
+# dropped and sorted again instead of having each appended row merged in.
+MERGE_RATIO = 256
+
+
+def parse_sort_keys(keys: str | Sequence[str]) -> SortSpec:
+    """Parse sort keys, where a leading "-" means descending.
+
+    Example:
+        >>> parse_sort_keys(["region", "-latency"])
+        (('region', False), ('latency', True))
+
+    Args:
+        keys: Column key or list of column keys
+
+    Returns:
+        SortSpec: ``(key, descending)`` pairs in priority order
+
+    """
+    if isinstance(keys, str):
+        keys = [keys]
+    return tuple(
+        (key[1:], True) if key.startswith("-") else (key, False) for key in keys
+    )
+
+
+class ReversedIndex(Sequence[int]):
+    """Read-only reversed view over a permutation, without copying it.
+
+    Rows at the end of the permutation can be kept in place, so that rows
+    without a value stay last when an ascending order is reversed.
+
+    """
+
+    def __init__(self, order: Sequence[int], tail: int = 0) -> None:
+        """Initialize the view.
+
+        Args:
+            order: Permutation to reverse
+            tail: Number of rows at the end that are not reversed
+
+        """
+        self._order = order
+        self._head = len(order) - tail
+
+    def __len__(self) -> int:
+        """Get the number of rows in the view."""
+        return len(self._order)
+
+    @overload
+    def __getitem__(self, index: int) -> int: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[int]: ...
+
+    def __getitem__(self, index: int | slice) -> int | Sequence[int]:
+        """Get one row index or a slice of row indexes."""
+        size = len(self._order)
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(size))]
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            error_msg = "Row position out of range"
+            raise IndexError(error_msg)
+        head = self._head
+        return self._order[head - 1 - index if index < head else index]
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over the row indexes in reversed order."""
+        order, head = self._order, self._head
+        return chain(
+            map(order.__getitem__, range(head - 1, -1, -1)),
+            map(order.__getitem__, range(head, len(order))),
+        )
+
+
+class SortIndex:
+    """Cache of sort permutations over a column store.
+
+    Permutations are cached per sort specification. A sort by one column in
+    descending order is a reversed view over the ascending permutation,
+    with the null rows kept last, so flipping the direction of a single
+    column sort never re-sorts. Sorts by several columns are cached per
+    direction, as reversing them would also move the nulls of every column
+    but the first.
+
+    Example:
+        >>> index = SortIndex(store)
+        >>> index.order(parse_sort_keys(["region", "-latency"]))[:10]
+
+    Attributes:
+        max_cached (int): Number of permutations kept
+        generation (int): Counter bumped whenever the store changes in a way
+            that invalidates permutations
+
+    """
+
+    def __init__(self, store: ColumnStore, max_cached: int = 4) -> None:
+        """Initialize the sort index.
+
+        Args:
+            store: Column store to sort
+            max_cached: Number of permutations kept
+
+        """
+        self.store = store
+        self.max_cached = max(1, max_cached)
+        self._orders: OrderedDict[SortSpec, Sequence[int]] = OrderedDict()
+        self._keys: dict[str, Sequence[int] | Sequence[float]] = {}
+        # Null flags by column key, with the row count they were taken at.
+        self._nulls: dict[str, tuple[int, Sequence[int] | None]] = {}
+        self.generation = 0
+
+    def _canonical(self, spec: SortSpec, reverse: bool) -> tuple[SortSpec, bool]:
+        """Drop unknown columns, apply the reversal and find the cached form.
+
+        Returns:
+            Tuple: Specification to sort by, and whether its permutation is
+                read through a reversed view
+
+        """
+        spec = tuple(
+            (key, desc != reverse) for key, desc in spec if key in self.store.arrays
+        )
+        if len(spec) == 1 and spec[0][1]:
+            return ((spec[0][0], False),), True
+        return spec, False
+
+    def order(self, spec: SortSpec, *, reverse: bool = False) -> Sequence[int]:
+        """Get row indexes sorted by one or more columns.
+
+        Args:
+            spec: ``(key, descending)`` pairs in priority order
+            reverse: Whether to flip the direction of every key
+
+        Returns:
+            Sequence[int]: Row indexes in sort order
+
+        """
+        spec, reverse = self._canonical(spec, reverse)
+        if not spec:
+            return self.store.live_rows()
+        if not self._is_ready(spec):
+            self._cache(spec, self._sort(spec))
+        self._orders.move_to_end(spec)
+        order = self._orders[spec]
+        return self._reversed(spec, order) if reverse else order
+
+    def is_cached(self, spec: SortSpec, *, reverse: bool = False) -> bool:
+        """Check whether the permutation of a sort is ready.
+
+        Args:
+            spec: ``(key, descending)`` pairs in priority order
+            reverse: Whether to flip the direction of every key
+
+        Returns:
+            bool: Whether ``order`` can return without sorting
+
+        """
+        spec, _ = self._canonical(spec, reverse)
+        return self._is_ready(spec)
+
+    def _is_ready(self, spec: SortSpec) -> bool:
+        """Check whether the permutation of a canonical sort is cached."""
+        if not spec:
+            return True
+        order = self._orders.get(spec)
+        return order is not None and len(order) == self.store.row_count
+
+    async def prepare(self, spec: SortSpec, *, reverse: bool = False) -> None:
+        """Compute the permutation of a sort on a worker thread.
+
+        The sorted columns are copied on the calling thread and sorted on a
+        worker, after which ``order`` returns the permutation without
+        sorting. If the store changes while the worker runs, the result is
+        dropped and the sort starts over from a new copy. Cancelling the
+        caller drops the result of the running worker.
+
+        Args:
+            spec: ``(key, descending)`` pairs in priority order
+            reverse: Whether to flip the direction of every key
+
+        """
+        spec, _ = self._canonical(spec, reverse)
+        while not self._is_ready(spec):
+            generation = self.generation
+            columns = {key: self.store.column(key).snapshot() for key, _ in spec}
+            live = copy.copy(self.store.live_rows())
+            keys, nulls, order = await asyncio.to_thread(
+                _sort_snapshot, spec, columns, live
+            )
+            if generation == self.generation:
+                self._keys.update(keys)
+                self._nulls.update(nulls)
+                self._cache(spec, order)
+
+    def _cache(self, spec: SortSpec, order: Sequence[int]) -> None:
+        """Keep a permutation, evicting the least recently used ones."""
+        self._orders[spec] = order
+        self._orders.move_to_end(spec)
+        while len(self._orders) > self.max_cached:
+            self._orders.popitem(last=False)
+        self._drop_unused_keys()
+
+    def sort_keys(self, key: str) -> Sequence[int] | Sequence[float]:
+        """Get the cached sort keys of a column.
+
+        Args:
+            key: Column key
+
+        Returns:
+            Sequence: One numeric key per row
+
+        """
+        keys = self._keys.get(key)
+        if keys is None or len(keys) != len(self.store):
+            keys = self._keys[key] = self.store.column(key).sort_keys()
+        return keys
+
+    def null_flags(self, key: str) -> Sequence[int] | None:
+        """Get the cached null flags of a column.
+
+        Args:
+            key: Column key
+
+        Returns:
+            Optional[Sequence[int]]: 1 for each null row, ``None`` when no
+                row is null
+
+        """
+        count, flags = self._nulls.get(key, (-1, None))
+        if count != len(self.store):
+            flags = self.store.column(key).null_mask()
+            self._nulls[key] = (len(self.store), flags)
+        return flags
+
+    def _key_buffers(self, spec: SortSpec) -> SortKeys:
+        """Get the key buffers of a sort, with null flags where needed."""
+        return _with_null_flags(
+            spec,
+            {key: self.sort_keys(key) for key, _ in spec},
+            {key: self.null_flags(key) for key, _ in spec},
+        )
+
+    def _reversed(self, spec: SortSpec, order: Sequence[int]) -> ReversedIndex:
+        """Reverse an ascending single column order, keeping nulls last."""
+        nulls = self.null_flags(spec[0][0])
+        if nulls is None:
+            return ReversedIndex(order)
+        # The null rows are at the end of the order.
+        first_null = bisect_left(order, 1, key=nulls.__getitem__)
+        return ReversedIndex(order, len(order) - first_null)
+
+    def sort_rows(
+        self,
+        spec: SortSpec,
+        rows: Sequence[int],
+        *,
+        reverse: bool = False,
+    ) -> Sequence[int]:
+        """Sort a subset of rows with the cached sort keys.
+
+        This is cheaper than taking the subset out of the full permutation
+        when the subset is small, such as the result of a narrow filter.
+
+        Args:
+            spec: ``(key, descending)`` pairs in priority order
+            rows: Row indexes to sort
+            reverse: Whether to flip the direction of every key
+
+        Returns:
+            Sequence[int]: The given row indexes in sort order
+
+        """
+        # Same canonical form as ``order`` so that ties come out alike.
+        spec, reverse = self._canonical(spec, reverse)
+        if not spec:
+            return array("q", rows)
+        order = _permutation(self._key_buffers(spec), rows)
+        return self._reversed(spec, order) if reverse else order
+
+    def invalidate(self, keys: Iterable[str] | None = None) -> None:
+        """Drop cached permutations and sort keys.
+
+        Args:
+            keys: Columns whose values changed, all columns when omitted
+
+        """
+        self.generation += 1
+        if keys is None:
+            self._orders.clear()
+            self._keys.clear()
+            self._nulls.clear()
+            return
+        changed = set(keys)
+        for spec in list(self._orders):
+            if changed.intersection(key for key, _ in spec):
+                del self._orders[spec]
+        for key in changed:
+            self._keys.pop(key, None)
+            self._nulls.pop(key, None)
+
+    def rows_appended(self, rows: range) -> None:
+        """Merge appended rows into the cached permutations.
+
+        Only the appended rows are sorted, and each is then placed with a
+        binary search, so a small append costs a copy of each permutation
+        rather than a new sort. When many rows are appended at once, the
+        permutations are dropped instead, as sorting again is cheaper then.
+        Either way the sort keys of text columns are ranked again.
+
+        Args:
+            rows: Indexes of the appended rows
+
+        """
+        self.generation += 1
+        for spec, order in list(self._orders.items()):
+            if len(rows) * MERGE_RATIO > len(order):
+                del self._orders[spec]
+                continue
+            keys = self._key_buffers(spec)
+            added = _permutation(keys, list(rows))
+            row_key = _row_key(keys)
+            # Appended rows go after equal rows, as in a stable sort.
+            positions = [
+                bisect_right(order, row_key(row), key=row_key) for row in added
+            ]
+            if np is not None and isinstance(order, np.ndarray):
+                self._orders[spec] = np.insert(order, positions, added)
+                continue
+            merged = array("q")
+            start = 0
+            for position, row in zip(positions, added, strict=True):
+                merged.extend(order[start:position])
+                merged.append(row)
+                start = position
+            merged.extend(order[start:])
+            self._orders[spec] = merged
+        self._drop_unused_keys()
+
+    def discard(self, rows: Iterable[int]) -> None:
+        """Remove deleted rows from the cached permutations.
+
+        Deleting rows does not change the relative order of the others, so
+        the permutations are filtered in linear time instead of re-sorted.
+
+        Args:
+            rows: Row indexes that were deleted
+
+        """
+        removed = set(rows)
+        if not removed:
+            return
+        self.generation += 1
+        for spec, order in self._orders.items():
+            if np is not None and isinstance(order, np.ndarray):
+                self._orders[spec] = order[~np.isin(order, list(removed))]
+            else:
+                self._orders[spec] = array(
+                    "q", [row for row in order if row not in removed]
+                )
+
+    def _drop_unused_keys(self) -> None:
+        """Drop sort keys of columns no cached permutation uses."""
+        used = {key for spec in self._orders for key, _ in spec}
+        for key in set(self._keys) - used:
+            del self._keys[key]
+        for key in set(self._nulls) - used:
+            del self._nulls[key]
+
+    def _sort(self, spec: SortSpec) -> Sequence[int]:
+        """Sort the store by a canonical specification.
+
+        Args:
+            spec: ``(key, descending)`` pairs in priority order
+
+        Returns:
+            Sequence[int]: Permutation of row indexes
+
+        """
+        return _permutation(self._key_buffers(spec), self.store.live_rows())
+
+
+def _with_null_flags(
+    spec: SortSpec,
+    keys: dict[str, Sequence[int] | Sequence[float]],
+    nulls: dict[str, Sequence[int] | None],
+) -> SortKeys:
+    """Put the null flags of each sorted column ahead of its sort keys.
+
+    The flags always sort ascending, so that null rows come last whichever
+    the direction of their column.
+
+    Args:
+        spec: ``(key, descending)`` pairs in priority order
+        keys: Sort keys by column key
+        nulls: Null flags by column key
+
+    Returns:
+        SortKeys: Key buffers and their direction, most significant first
+
+    """
+    buffers: SortKeys = []
+    for key, desc in spec:
+        flags = nulls[key]
+        if flags is not None:
+            buffers.append((flags, False))
+        buffers.append((keys[key], desc))
+    return buffers
+
+
+def _permutation(
+    keys: SortKeys,
+    live: Sequence[int],
+    *,
+    blocks: bool = False,
+) -> Sequence[int]:
+    """Sort rows by precomputed sort keys.
+
+    Args:
+        keys: Sort key buffers and their direction, most significant first
+        live: Indexes of the rows to sort
+        blocks: Whether to sort in blocks when NumPy is not installed, so
+            that a worker thread does not hold the GIL for long
+
+    Returns:
+        Sequence[int]: Permutation of row indexes
+
+    """
+    if np is not None:
+        # NumPy releases the GIL while sorting the key buffers.
+        return _argsort(keys, live)
+    if blocks:
+        return array("q", sorted_in_blocks(live, key=_row_key(keys)))
+
+    # Stable sorts applied from the least to the most significant key.
+    order = list(live)
+    for values, desc in reversed(keys):
+        order.sort(key=values.__getitem__, reverse=desc)
+    return array("q", order)
+
+
+def _row_key(keys: SortKeys) -> Callable[[Any], tuple[int | float, ...]]:
+    """Get a function giving the sort key of a single row.
+
+    Args:
+        keys: Sort key buffers and their direction, most significant first
+
+    Returns:
+        Callable: Function mapping a row index to a tuple of keys
+
+    """
+
+    def row_key(row: Any) -> tuple[int | float, ...]:
+        return tuple(-values[row] if desc else values[row] for values, desc in keys)
+
+    return row_key
+
+
+def _sort_snapshot(
+    spec: SortSpec,
+    columns: dict[str, ColumnArray],
+    live: Sequence[int],
+) -> tuple[
+    dict[str, Sequence[int] | Sequence[float]],
+    dict[str, tuple[int, Sequence[int] | None]],
+    Sequence[int],
+]:
+    """Sort copied columns; runs on a worker thread.
+
+    Args:
+        spec: Canonical ``(key, descending)`` pairs in priority order
+        columns: Copies of the sorted columns
+        live: Indexes of the rows to sort
+
+    Returns:
+        Tuple: Sort keys and null flags with their row count by column key,
+            and the permutation of row indexes
+
+    """
+    keys = {key: column.sort_keys(blocks=True) for key, column in columns.items()}
+    nulls = {key: column.null_mask() for key, column in columns.items()}
+    order = _permutation(_with_null_flags(spec, keys, nulls), live, blocks=True)
+    counted = {key: (len(columns[key]), flags) for key, flags in nulls.items()}
+    return keys, counted, order
+
+
+def _argsort(
+    keys: SortKeys,
+    live: Sequence[int],
+) -> Sequence[int]:
+    """Compute a stable permutation with NumPy.
+
+    Args:
+        keys: Sort key buffers and their direction, most significant first
+        live: Indexes of the rows to sort
+
+    Returns:
+        Sequence[int]: Permutation of row indexes
+
+    """
+    rows = None if isinstance(live, range) else _as_numpy(live)
+    columns = []
+    for values, desc in keys:
+        column = _as_numpy(values)
+        if rows is not None:
+            column = column[rows]
+        if desc:
+            # Bitwise not reverses integer order without the overflow of
+            # negating the smallest value.
+            column = -column if column.dtype.kind == "f" else ~column.astype(np.int64)
+        columns.append(column)
+    if len(columns) == 1:
+        order = np.argsort(columns[0], kind="stable")
+    else:
+        order = np.lexsort(columns[::-1])
+    return order if rows is None else rows[order]
+
+
+def _as_numpy(values: Sequence[int] | Sequence[float]) -> np.ndarray:
+    """Wrap a key buffer as a NumPy array, without copying when possible."""
+    if isinstance(values, array | bytearray):
+        return np.asarray(memoryview(values))
+    return np.asarray(values)
@@ -0,0 +1,460 @@
+"""Paged data sources for table widgets.
+
+Datasets that do not fit in memory are read through a ``TableDataSource``.
+The table only asks for the pages covering its scroll window; ``PagedRows``
+keeps the most recently used pages, prefetches the next one in the scroll
+direction and cancels fetches for pages that scrolled out of view.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Protocol, runtime_checkable
+
+import structlog
+
+from .filter import And, Contains, Eq, Or, Range, Regex
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping, Sequence
+
+    from .column import AggregateKind
+    from .filter import Predicate
+    from .sort import SortSpec
+    from .store import CellValue, Row
+
+logger = structlog.get_logger(__name__)
+
+# Inline letters of the ``re`` flags that can be written into a pattern.
+INLINE_FLAGS = {
+    re.IGNORECASE: "i",
+    re.MULTILINE: "m",
+    re.DOTALL: "s",
+    re.VERBOSE: "x",
+    re.ASCII: "a",
+}
+
+
+@runtime_checkable
+class TableDataSource(Protocol):
+    """Protocol for table data fetched on demand.
+
+    Rows are addressed by their position in the sorted and filtered result,
+    so a source must return the same rows for the same arguments.
+    """
+
+    async def count(self, predicate: Predicate | None = None) -> int:
+        """Count the rows matching a filter.
+
+        Args:
+            predicate: Row filter, ``None`` for all rows
+
+        Returns:
+            int: Number of rows
+
+        """
+        ...
+
+    async def fetch(
+        self,
+        offset: int,
+        limit: int,
+        sort: SortSpec = (),
+        predicate: Predicate | None = None,
+    ) -> list[Row]:
+        """Fetch a range of rows.
+
+        Args:
+            offset: Position of the first row
+            limit: Maximum number of rows
+            sort: ``(key, descending)`` pairs in priority order
+            predicate: Row filter, ``None`` for all rows
+
+        Returns:
+            List[Row]: Rows in sort order
+
+        """
+        ...
+
+
+@runtime_checkable
+class AggregateSource(Protocol):
+    """Protocol for data sources that compute footer aggregates themselves."""
+
+    async def aggregate(
+        self,
+        kinds: Mapping[str, AggregateKind],
+        predicate: Predicate | None = None,
+        group_key: str | None = None,
+    ) -> tuple[Row, dict[CellValue, Row]]:
+        """Compute column aggregates over the rows matching a filter.
+
+        Args:
+            kinds: Aggregate kind by column key
+            predicate: Row filter, ``None`` for all rows
+            group_key: Column whose values define the groups
+
+        Returns:
+            Tuple: Aggregate values by column key over every matching row,
+                and the same per value of the group column
+
+        """
+        ...
+
+
+class PagedRows:
+    """LRU cache of pages fetched from a ``TableDataSource``.
+
+    Example:
+        >>> pages = PagedRows(source, on_page=lambda page: table.refresh())
+        >>> await pages.reset()
+        >>> pages.request(0, 40)
+        >>> pages.row(0)  # None until the first page arrives
+
+    Attributes:
+        source (TableDataSource): Data source
+        page_size (int): Rows per fetched page
+        max_pages (int): Pages kept in memory
+        sort (SortSpec): Sort pushed down to the source
+        predicate (Optional[Predicate]): Filter pushed down to the source
+        total (int): Number of rows in the current result
+
+    """
+
+    def __init__(
+        self,
+        source: TableDataSource,
+        page_size: int = 100,
+        max_pages: int = 32,
+        on_page: Callable[[int], None] | None = None,
+    ) -> None:
+        """Initialize the page cache.
+
+        Args:
+            source: Data source
+            page_size: Rows per fetched page
+            max_pages: Pages kept in memory
+            on_page: Called with the page number when a page arrives
+
+        """
+        self.source = source
+        self.page_size = max(1, page_size)
+        self.max_pages = max(2, max_pages)
+        self.on_page = on_page
+        self.sort: SortSpec = ()
+        self.predicate: Predicate | None = None
+        self.total = 0
+        self._pages: OrderedDict[int, list[Row]] = OrderedDict()
+        self._pending: dict[int, asyncio.Task[None]] = {}
+        self._generation = 0
+
+    async def reset(
+        self,
+        sort: SortSpec = (),
+        predicate: Predicate | None = None,
+    ) -> int:
+        """Drop cached pages and count the rows of a new result.
+
+        Args:
+            sort: ``(key, descending)`` pairs in priority order
+            predicate: Row filter, ``None`` for all rows
+
+        Returns:
+            int: Number of rows in the new result
+
+        """
+        self.close()
+        self._generation += 1
+        self.sort = sort
+        self.predicate = predicate
+        self.total = await self.source.count(predicate)
+        return self.total
+
+    async def recount(self) -> int:
+        """Count the rows again, keeping the cached pages.
+
+        This is meant for sources that grow, such as a file that is still
+        being indexed. A cached page that was not full is dropped so that it
+        is fetched again with the new rows.
+
+        Returns:
+            int: Number of rows in the current result
+
+        """
+        self.total = await self.source.count(self.predicate)
+        for number in [
+            n for n, page in self._pages.items() if len(page) < self.page_size
+        ]:
+            del self._pages[number]
+        return self.total
+
+    def row(self, position: int) -> Row | None:
+        """Get a row if its page is cached.
+
+        Args:
+            position: Row position in the result
+
+        Returns:
+            Optional[Row]: Row, ``None`` while its page is not loaded
+
+        """
+        number, offset = divmod(position, self.page_size)
+        page = self._pages.get(number)
+        if page is None or offset >= len(page):
+            return None
+        self._pages.move_to_end(number)
+        return page[offset]
+
+    def request(self, start: int, end: int, direction: int = 1) -> None:
+        """Fetch the pages covering a row range.
+
+        The page after the range, or before it when scrolling up, is
+        prefetched. Fetches for any other page are cancelled.
+
+        Args:
+            start: First row position (inclusive)
+            end: Last row position (exclusive)
+            direction: Scroll direction, negative when scrolling up
+
+        """
+        end = min(end, self.total)
+        if start >= end:
+            wanted: list[int] = []
+        else:
+            first = start // self.page_size
+            last = (end - 1) // self.page_size
+            wanted = list(range(first, last + 1))
+            ahead = first - 1 if direction < 0 else last + 1
+            if 0 <= ahead * self.page_size < self.total:
+                wanted.append(ahead)
+        wanted = wanted[: self.max_pages]
+
+        for number in set(self._pending) - set(wanted):
+            self._pending.pop(number).cancel()
+        for number in wanted:
+            if number in self._pages:
+                self._pages.move_to_end(number)
+            elif number not in self._pending:
+                self._pending[number] = asyncio.create_task(
+                    self._load(number, self._generation)
+                )
+
+    async def _load(self, number: int, generation: int) -> None:
+        """Fetch a page and store it unless the result changed meanwhile."""
+        try:
+            rows = await self.source.fetch(
+                number * self.page_size, self.page_size, self.sort, self.predicate
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception:  # noqa: BLE001 - the page is simply fetched again
+            logger.exception("Failed to fetch table page", page=number)
+            return
+        finally:
+            if self._pending.get(number) is asyncio.current_task():
+                del self._pending[number]
+        if generation != self._generation:
+            return
+        self._pages[number] = rows
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+        if self.on_page is not None:
+            self.on_page(number)
+
+    def close(self) -> None:
+        """Cancel pending fetches and drop cached pages."""
+        for task in self._pending.values():
+            task.cancel()
+        self._pending.clear()
+        self._pages.clear()
+
+
+def quote_identifier(name: str) -> str:
+    """Quote an SQL identifier.
+
+    Args:
+        name: Table or column name
+
+    Returns:
+        str: Identifier safe to embed in a statement
+
+    """
+    return '"' + name.replace('"', '""') + '"'
+
+
+def predicate_to_sql(predicate: Predicate) -> tuple[str, list[CellValue]]:
+    """Translate a filter predicate into an SQL condition.
+
+    ``Contains`` and ``Regex`` rely on the ``casefold`` and ``regexp``
+    functions registered by ``SQLiteSource``, which match text the same
+    way as the in-memory filter.
+
+    Args:
+        predicate: Row filter
+
+    Returns:
+        Tuple[str, List[Any]]: Condition and its parameters
+
+    Raises:
+        ValueError: If the predicate type or its regular expression flags
+            cannot be translated.
+
+    """
+    if isinstance(predicate, And | Or):
+        parts = [predicate_to_sql(term) for term in predicate.terms]
+        if not parts:
+            return ("1" if isinstance(predicate, And) else "0"), []
+        joiner = " AND " if isinstance(predicate, And) else " OR "
+        clause = joiner.join(f"({part})" for part, _ in parts)
+        return clause, [value for _, params in parts for value in params]
+
+    column = quote_identifier(getattr(predicate, "key", ""))
+    if isinstance(predicate, Eq):
+        if predicate.value is None:
+            return f"{column} IS NULL", []
+        return f"{column} = ?", [predicate.value]
+    if isinstance(predicate, Range):
+        bounds = [f"{column} IS NOT NULL"]
+        params: list[CellValue] = []
+        if predicate.low is not None:
+            bounds.append(f"{column} >= ?")
+            params.append(predicate.low)
+        if predicate.high is not None:
+            bounds.append(f"{column} <= ?")
+            params.append(predicate.high)
+        return " AND ".join(bounds), params
+    if isinstance(predicate, Contains):
+        if predicate.case_sensitive:
+            return f"instr({column}, ?) > 0", [predicate.text]
+        return f"instr(casefold({column}), ?) > 0", [predicate.needle]
+    if isinstance(predicate, Regex):
+        # Text patterns are Unicode whether or not the flag is given.
+        flags = predicate.flags & ~re.UNICODE
+        inline = ""
+        for flag, letter in INLINE_FLAGS.items():
+            if flags & flag:
+                inline += letter
+                flags &= ~flag
+        if flags:
+            error_msg = f"Cannot translate regular expression flags {flags} to SQL"
+            raise ValueError(error_msg)
+        pattern = f"(?{inline}){predicate.pattern}" if inline else predicate.pattern
+        return f"{column} REGEXP ?", [pattern]
+
+    error_msg = f"Cannot translate {type(predicate).__name__} to SQL"
+    raise ValueError(error_msg)
+
+
+def _regexp(pattern: str, value: CellValue) -> bool:
+    """Implement the SQLite ``REGEXP`` operator."""
+    return value is not None and re.search(pattern, str(value)) is not None
+
+
+def _casefold(value: CellValue) -> str | None:
+    """Fold the case of a value as the in-memory ``Contains`` filter does.
+
+    SQLite's own ``lower`` only folds ASCII letters.
+    """
+    return None if value is None else str(value).casefold()
+
+
+class SQLiteSource:
+    """Reference ``TableDataSource`` over a SQLite table.
+
+    Sorting, filtering and paging run in SQL on a worker thread, so only the
+    fetched pages are held in Python.
+
+    Example:
+        >>> source = SQLiteSource("metrics.db", "samples")
+        >>> await table.load_source(source)
+
+    Attributes:
+        table (str): Table name
+        columns (Optional[List[str]]): Columns fetched, all when ``None``
+
+    """
+
+    def __init__(
+        self,
+        database: str | Path | sqlite3.Connection,
+        table: str,
+        columns: Sequence[str] | None = None,
+    ) -> None:
+        """Initialize the source.
+
+        Args:
+            database: Database path, or an open connection created with
+                ``check_same_thread=False``
+            table: Table name
+            columns: Columns fetched, all when omitted
+
+        """
+        if isinstance(database, sqlite3.Connection):
+            self.connection = database
+        else:
+            self.connection = sqlite3.connect(Path(database), check_same_thread=False)
+        self.connection.create_function("regexp", 2, _regexp, deterministic=True)
+        self.connection.create_function("casefold", 1, _casefold, deterministic=True)
+        self.table = table
+        self.columns = list(columns) if columns is not None else None
+        self._lock = threading.Lock()
+
+    async def count(self, predicate: Predicate | None = None) -> int:
+        """Count the rows matching a filter."""
+        where, params = self._where(predicate)
+        query = f"SELECT COUNT(*) FROM {quote_identifier(self.table)}{where}"
+        rows = await asyncio.to_thread(self._execute, query, params)
+        return int(rows[0][0])
+
+    async def fetch(
+        self,
+        offset: int,
+        limit: int,
+        sort: SortSpec = (),
+        predicate: Predicate | None = None,
+    ) -> list[Row]:
+        """Fetch a range of rows in sort order."""
+        names = ", ".join(map(quote_identifier, self.columns)) if self.columns else "*"
+        where, params = self._where(predicate)
+        # NULLs sort last in either direction, as in the in-memory sort.
+        order = ", ".join(
+            f"{quote_identifier(key)} IS NULL, "
+            f"{quote_identifier(key)} {'DESC' if desc else 'ASC'}"
+            for key, desc in sort
+        )
+        query = (
+            f"SELECT {names} FROM {quote_identifier(self.table)}{where}"
+            f"{f' ORDER BY {order}' if order else ''} LIMIT ? OFFSET ?"
+        )
+        return await asyncio.to_thread(
+            self._fetch_rows, query, [*params, limit, offset]
+        )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.connection.close()
+
+    @staticmethod
+    def _where(predicate: Predicate | None) -> tuple[str, list[CellValue]]:
+        """Build the WHERE clause for a filter."""
+        if predicate is None:
+            return "", []
+        clause, params = predicate_to_sql(predicate)
+        return f" WHERE {clause}", params
+
+    def _execute(self, query: str, params: Sequence[CellValue]) -> list[tuple]:
+        """Run a query on the worker thread."""
+        with self._lock:
+            return self.connection.execute(query, params).fetchall()
+
+    def _fetch_rows(self, query: str, params: Sequence[CellValue]) -> list[Row]:
+        """Run a query on the worker thread and return rows as mappings."""
+        with self._lock:
+            cursor = self.connection.execute(query, params)
+            names = [description[0] for description in cursor.description]
+            return [dict(zip(names, values, strict=True)) for values in cursor]
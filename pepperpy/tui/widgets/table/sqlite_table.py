@@ -0,0 +1,292 @@
+"""SQLite-backed table data with query pushdown.
+
+``SQLiteTable`` creates a SQLite table whose schema is derived from the
+table columns and loads rows into it. Sorting, filtering, paging and footer
+aggregates then run as SQL on a worker thread, and indexes serving the sorts
+and filters in use are created the first time they are needed. The widget
+only holds the pages on screen.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+from itertools import islice
+from typing import TYPE_CHECKING
+
+import structlog
+
+from .filter import And, Eq, Or, Range
+from .source import SQLiteSource, quote_identifier
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping, Sequence
+    from pathlib import Path
+
+    from .column import AggregateKind, Column, ColumnType
+    from .filter import Predicate
+    from .sort import SortSpec
+    from .store import CellValue, Row
+
+logger = structlog.get_logger(__name__)
+
+# SQL column types of the stored column types; others take values as given.
+SQL_TYPES: dict[ColumnType, str] = {
+    "int": "INTEGER",
+    "float": "REAL",
+    "bool": "INTEGER",
+    "str": "TEXT",
+}
+
+# Rows inserted per statement batch.
+INSERT_BATCH = 10_000
+
+# SQL of the aggregates computed by a single grouped query.
+SIMPLE_AGGREGATES: dict[AggregateKind, str] = {
+    "sum": "COALESCE(SUM({number}), 0)",
+    "mean": "AVG({number})",
+    "min": "MIN({number})",
+    "max": "MAX({number})",
+    "count": "COUNT({column})",
+}
+
+
+def _number(column: str) -> str:
+    """Get an SQL expression keeping only the numeric values of a column."""
+    return f"CASE WHEN typeof({column}) IN ('integer', 'real') THEN {column} END"
+
+
+def _indexed_keys(predicate: Predicate | None) -> list[str]:
+    """Get the columns of the filter terms that an index can serve."""
+    if isinstance(predicate, And | Or):
+        return [key for term in predicate.terms for key in _indexed_keys(term)]
+    if isinstance(predicate, Eq | Range):
+        return [predicate.key]
+    return []
+
+
+class SQLiteTable(SQLiteSource):
+    """SQLite table created from table columns, with query pushdown.
+
+    Example:
+        >>> source = SQLiteTable(columns, "metrics.db")
+        >>> await source.insert_rows(rows)
+        >>> await table.load_source(source)
+
+    Attributes:
+        table (str): Table name
+        table_columns (List[Column]): Columns defining the schema
+        indexes (Set[str]): Names of the indexes created by this table
+
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[Column],
+        database: str | Path | sqlite3.Connection = ":memory:",
+        table: str = "rows",
+    ) -> None:
+        """Initialize the source and create the table if it does not exist.
+
+        Args:
+            columns: Table columns; the key is the SQL column name and the
+                ``dtype`` its type
+            database: Database path, ":memory:", or an open connection
+                created with ``check_same_thread=False``
+            table: Table name
+
+        """
+        if database == ":memory:":
+            database = sqlite3.connect(":memory:", check_same_thread=False)
+        super().__init__(database, table, [col.key for col in columns])
+        self.table_columns = list(columns)
+        self.indexes: set[str] = set()
+        self._bools = [col.key for col in columns if col.dtype == "bool"]
+        schema = ", ".join(
+            f"{quote_identifier(col.key)} {SQL_TYPES.get(col.dtype, '')}".rstrip()
+            for col in columns
+        )
+        with self._lock, self.connection:
+            self.connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {quote_identifier(table)} ({schema})"
+            )
+
+    async def insert_rows(
+        self,
+        rows: Iterable[Row],
+        batch_size: int = INSERT_BATCH,
+    ) -> int:
+        """Insert rows on a worker thread.
+
+        Keys that are not table columns are dropped and missing keys are
+        stored as NULL.
+
+        Args:
+            rows: Data rows
+            batch_size: Rows inserted per statement batch
+
+        Returns:
+            int: Number of rows inserted
+
+        """
+        return await asyncio.to_thread(self._insert, rows, max(1, batch_size))
+
+    def _insert(self, rows: Iterable[Row], batch_size: int) -> int:
+        """Insert rows in batches, committing once at the end."""
+        keys = [col.key for col in self.table_columns]
+        query = (
+            f"INSERT INTO {quote_identifier(self.table)} "
+            f"VALUES ({', '.join('?' * len(keys))})"
+        )
+        values = ([row.get(key) for key in keys] for row in rows)
+        count = 0
+        with self._lock, self.connection:
+            while batch := list(islice(values, batch_size)):
+                self.connection.executemany(query, batch)
+                count += len(batch)
+        return count
+
+    async def create_index(self, key: str) -> None:
+        """Index a column to speed up filters on it.
+
+        Args:
+            key: Column key
+
+        """
+        await asyncio.to_thread(
+            self._create_index, f"{self.table}_{key}", [quote_identifier(key)]
+        )
+
+    async def count(self, predicate: Predicate | None = None) -> int:
+        """Count the rows matching a filter, indexing the filtered columns."""
+        await self._ensure_indexes((), predicate)
+        return await super().count(predicate)
+
+    async def fetch(
+        self,
+        offset: int,
+        limit: int,
+        sort: SortSpec = (),
+        predicate: Predicate | None = None,
+    ) -> list[Row]:
+        """Fetch a range of rows, indexing the sorted and filtered columns."""
+        await self._ensure_indexes(sort, predicate)
+        rows = await super().fetch(offset, limit, sort, predicate)
+        for row in rows:
+            for key in self._bools:
+                if row.get(key) is not None:
+                    row[key] = bool(row[key])
+        return rows
+
+    async def aggregate(
+        self,
+        kinds: Mapping[str, AggregateKind],
+        predicate: Predicate | None = None,
+        group_key: str | None = None,
+    ) -> tuple[Row, dict[CellValue, Row]]:
+        """Compute column aggregates in SQL.
+
+        Sums, means, minimums and maximums only take numeric values, and the
+        p95 is the nearest-rank percentile, as for in-memory tables.
+
+        Args:
+            kinds: Aggregate kind by column key
+            predicate: Row filter, ``None`` for all rows
+            group_key: Column whose values define the groups
+
+        Returns:
+            Tuple: Aggregate values by column key over every matching row,
+                and the same per value of the group column
+
+        """
+        await self._ensure_indexes((), predicate)
+        if group_key is not None:
+            await self.create_index(group_key)
+        where, params = self._where(predicate)
+        total = await asyncio.to_thread(self._aggregate, kinds, where, params, None)
+        groups = (
+            await asyncio.to_thread(self._aggregate, kinds, where, params, group_key)
+            if group_key is not None
+            else {}
+        )
+        return total.get(None, dict.fromkeys(kinds)), groups
+
+    def _aggregate(
+        self,
+        kinds: Mapping[str, AggregateKind],
+        where: str,
+        params: Sequence[CellValue],
+        group_key: str | None,
+    ) -> dict[CellValue, Row]:
+        """Run the aggregate queries, per group when a group key is given."""
+        table = quote_identifier(self.table)
+        group = quote_identifier(group_key) if group_key is not None else "NULL"
+        terms = [group]
+        for key, kind in kinds.items():
+            column = quote_identifier(key)
+            template = SIMPLE_AGGREGATES.get(kind, "NULL")
+            terms.append(template.format(column=column, number=_number(column)))
+        query = f"SELECT {', '.join(terms)} FROM {table}{where}"
+        if group_key is not None:
+            query += f" GROUP BY {group}"
+
+        results: dict[CellValue, Row] = {}
+        for values in self._execute(query, params):
+            results[values[0]] = dict(zip(kinds, values[1:], strict=True))
+        for key, kind in kinds.items():
+            if kind != "p95":
+                continue
+            number = _number(quote_identifier(key))
+            # Nearest rank: the ceil(0.95 * n)-th smallest number, n >= 1.
+            query = (
+                f"SELECT label, value FROM (SELECT {group} AS label, "
+                f"{number} AS value, ROW_NUMBER() OVER (PARTITION BY {group} "
+                f"ORDER BY {number} IS NULL, {number}) AS position, "
+                f"COUNT({number}) OVER (PARTITION BY {group}) AS numbers "
+                f"FROM {table}{where}) WHERE value IS NOT NULL "
+                "AND position = MAX(1, (95 * numbers + 99) / 100)"
+            )
+            for label, value in self._execute(query, params):
+                results.setdefault(label, dict.fromkeys(kinds))[key] = value
+        return results
+
+    async def _ensure_indexes(
+        self,
+        sort: SortSpec,
+        predicate: Predicate | None,
+    ) -> None:
+        """Create the indexes serving a sort and the columns of a filter."""
+        wanted: list[tuple[str, list[str]]] = []
+        if sort:
+            # NULLs sort last in either direction, so each direction of a
+            # sort needs its own index.
+            name = "_".join(f"{key}_desc" if desc else key for key, desc in sort)
+            terms = []
+            for key, desc in sort:
+                direction = " DESC" if desc else ""
+                column = quote_identifier(key)
+                terms += [f"{column} IS NULL", f"{column}{direction}"]
+            wanted.append((f"{self.table}_sort_{name}", terms))
+        for key in _indexed_keys(predicate):
+            wanted.append((f"{self.table}_{key}", [quote_identifier(key)]))
+        missing = [(name, terms) for name, terms in wanted if name not in self.indexes]
+        for name, terms in missing:
+            await asyncio.to_thread(self._create_index, name, terms)
+
+    def _create_index(self, name: str, terms: Sequence[str]) -> None:
+        """Create an index unless it exists; runs on the worker thread.
+
+        Args:
+            name: Index name
+            terms: Indexed columns or expressions, already quoted
+
+        """
+        with self._lock, self.connection:
+            if name in self.indexes:
+                return
+            self.connection.execute(
+                f"CREATE INDEX IF NOT EXISTS {quote_identifier(name)} ON "
+                f"{quote_identifier(self.table)} ({', '.join(terms)})"
+            )
+        self.indexes.add(name)
+        logger.debug("Created table index", index=name)
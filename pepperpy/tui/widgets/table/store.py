@@ -0,0 +1,1321 @@
+"""Columnar storage engine for table widgets.
+
+Rows are kept as one typed array per column instead of one ``dict`` per row:
+integers and floats live in ``array`` buffers with a lazily allocated null
+mask, booleans in a ``bytearray`` and strings either as a plain list or, for
+low-cardinality columns, as dictionary-encoded integer codes.
+"""
+
+from __future__ import annotations
+
+import copy
+import heapq
+import math
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Any, ClassVar, cast, overload
+
+import structlog
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator, Mapping
+
+    from .column import Column, ColumnType
+
+
+logger = structlog.get_logger(__name__)
+
+CellValue = str | int | float | bool | None
+Row = dict[str, CellValue]
+
+INT_MIN = -(2**63)
+INT_MAX = 2**63 - 1
+DICTIONARY_LIMIT = 65_536
+
+# Maps the bytes of a boolean column to null flags, 2 marking ``None``.
+_BOOL_NULLS = bytes(code == 2 for code in range(256))
+
+# Values sorted at once by ``sorted_in_blocks``.
+SORT_BLOCK = 65_536
+
+# Above one deleted row in this many live rows, the live row array is
+# filtered in one pass instead of having each deleted row removed.
+LIVE_PATCH_RATIO = 64
+
+
+def value_type(value: CellValue) -> ColumnType:
+    """Get the storage type that can hold a single value.
+
+    Args:
+        value: Cell value
+
+    Returns:
+        ColumnType: Storage type, "auto" for ``None``
+
+    """
+    if value is None:
+        return "auto"
+    if type(value) is bool:
+        return "bool"
+    if type(value) is int:
+        return "int" if INT_MIN <= value <= INT_MAX else "object"
+    if type(value) is float:
+        return "float"
+    if type(value) is str:
+        return "str"
+    return "object"
+
+
+def widen_type(current: ColumnType, other: ColumnType) -> ColumnType:
+    """Get the narrowest storage type that can hold both types.
+
+    Args:
+        current: Current column type
+        other: Type of the incoming values
+
+    Returns:
+        ColumnType: Combined storage type
+
+    """
+    if other == "auto" or current == other:
+        return current
+    if current == "auto":
+        return other
+    if {current, other} == {"int", "float"}:
+        return "float"
+    return "object"
+
+
+def infer_type(values: Sequence[CellValue]) -> ColumnType:
+    """Infer the storage type for a sequence of values.
+
+    Args:
+        values: Column values
+
+    Returns:
+        ColumnType: Inferred type, "auto" when every value is ``None``
+
+    """
+    kinds = {type(value) for value in values}
+    kinds.discard(type(None))
+    if int in kinds:
+        ints = [value for value in values if type(value) is int]
+        if not INT_MIN <= min(ints) <= max(ints) <= INT_MAX:
+            return "object"
+
+    names: dict[type, ColumnType] = {
+        bool: "bool",
+        int: "int",
+        float: "float",
+        str: "str",
+    }
+    result: ColumnType = "auto"
+    for kind in kinds:
+        result = widen_type(result, names.get(kind, "object"))
+    return result
+
+
+class ColumnArray(ABC):
+    """Base class for typed column storage.
+
+    Attributes:
+        dtype (str): Storage type of the column
+        writable (bool): Whether the store may change the column in place;
+            read-only columns are copied on the first change
+
+    """
+
+    dtype: ClassVar[ColumnType] = "object"
+    writable: ClassVar[bool] = True
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Get the number of stored values."""
+
+    @abstractmethod
+    def __getitem__(self, index: int) -> CellValue:
+        """Get a value by row index."""
+
+    def __iter__(self) -> Iterator[CellValue]:
+        """Iterate over the stored values."""
+        return (self[index] for index in range(len(self)))
+
+    def accepts(self, value: CellValue) -> bool:
+        """Check whether a value can be stored without widening the type.
+
+        Args:
+            value: Cell value
+
+        Returns:
+            bool: Whether the value fits the column type
+
+        """
+        return widen_type(self.dtype, value_type(value)) == self.dtype
+
+    @abstractmethod
+    def extend(self, values: Sequence[CellValue]) -> None:
+        """Append values to the column.
+
+        Args:
+            values: Values accepted by the column
+
+        """
+
+    @abstractmethod
+    def set(self, index: int, value: CellValue) -> None:
+        """Replace the value at a row index.
+
+        Args:
+            index: Row index
+            value: Value accepted by the column
+
+        """
+
+    def sort_keys(self, *, blocks: bool = False) -> Sequence[int] | Sequence[float]:
+        """Get typed sort keys, one per row, with ``None`` sorting last.
+
+        Args:
+            blocks: Whether to sort in blocks, so that a worker thread
+                computing the keys does not hold the GIL for long
+
+        Returns:
+            Sequence: Numeric keys whose order matches the value order
+
+        """
+        return _rank(list(self), key=_object_sort_key, blocks=blocks)
+
+    def null_mask(self) -> Sequence[int] | None:
+        """Get a flag per row that is 1 where the value is ``None``.
+
+        Returns:
+            Optional[Sequence[int]]: Null flags, ``None`` when no row is null
+
+        """
+        flags = bytearray(value is None for value in self)
+        return flags if 1 in flags else None
+
+    @abstractmethod
+    def snapshot(self) -> ColumnArray:
+        """Copy the column so that the copy can be read on another thread.
+
+        Only the value buffers are copied; changes made to this column
+        afterwards do not affect the copy.
+
+        Returns:
+            ColumnArray: Column of the same type holding the current values
+
+        """
+
+    @property
+    @abstractmethod
+    def nbytes(self) -> int:
+        """Get the approximate size of the column buffers in bytes."""
+
+
+class _NumericColumn(ColumnArray):
+    """Numeric column backed by an ``array`` and an optional null mask."""
+
+    typecode: ClassVar[str] = "q"
+
+    def __init__(self, values: Sequence[CellValue] = ()) -> None:
+        """Initialize the column.
+
+        Args:
+            values: Initial values
+
+        """
+        # Holds ints or floats depending on the typecode of the subclass.
+        self.values: array[Any] = array(self.typecode)
+        self.nulls: bytearray | None = None
+        self.extend(values)
+
+    def __len__(self) -> int:
+        """Get the number of stored values."""
+        return len(self.values)
+
+    def __getitem__(self, index: int) -> CellValue:
+        """Get a value by row index."""
+        if self.nulls is not None and self.nulls[index]:
+            return None
+        return self.values[index]
+
+    def __iter__(self) -> Iterator[CellValue]:
+        """Iterate over the stored values."""
+        if self.nulls is None:
+            return iter(self.values)
+        return (
+            None if null else value
+            for value, null in zip(self.values, self.nulls, strict=True)
+        )
+
+    def extend(self, values: Sequence[CellValue]) -> None:
+        """Append values to the column.
+
+        Args:
+            values: Values accepted by the column
+
+        """
+        if any(value is None for value in values):
+            if self.nulls is None:
+                self.nulls = bytearray(len(self.values))
+            self.nulls.extend(value is None for value in values)
+            self.values.fromlist([0 if value is None else value for value in values])
+            return
+        if self.nulls is not None:
+            self.nulls.extend(bytes(len(values)))
+        self.values.fromlist(list(values))
+
+    def set(self, index: int, value: CellValue) -> None:
+        """Replace the value at a row index.
+
+        Args:
+            index: Row index
+            value: Value accepted by the column
+
+        """
+        if value is None and self.nulls is None:
+            self.nulls = bytearray(len(self.values))
+        if self.nulls is not None:
+            self.nulls[index] = value is None
+        self.values[index] = 0 if value is None else value
+
+    def snapshot(self) -> ColumnArray:
+        """Copy the value buffer and the null mask."""
+        clone = copy.copy(self)
+        clone.values = self.values[:]
+        clone.nulls = None if self.nulls is None else self.nulls[:]
+        return clone
+
+    def sort_keys(self, *, blocks: bool = False) -> Sequence[int] | Sequence[float]:
+        """Get typed sort keys, one per row, with ``None`` sorting last.
+
+        Args:
+            blocks: Whether to sort in blocks, unused for numbers
+
+        Returns:
+            Sequence: The value buffer itself when there are no nulls
+
+        """
+        if self.nulls is None or 1 not in self.nulls:
+            return self.values
+        keys = array(self.typecode, self.values)
+        last = INT_MAX if self.typecode == "q" else float("inf")
+        index = self.nulls.find(1)
+        while index >= 0:
+            keys[index] = last
+            index = self.nulls.find(1, index + 1)
+        return keys
+
+    def null_mask(self) -> Sequence[int] | None:
+        """Get a flag per row that is 1 where the value is ``None``.
+
+        Returns:
+            Optional[Sequence[int]]: The null mask itself, ``None`` when no
+                row is null
+
+        """
+        if self.nulls is None or 1 not in self.nulls:
+            return None
+        return self.nulls
+
+    @property
+    def nbytes(self) -> int:
+        """Get the approximate size of the column buffers in bytes."""
+        nulls = len(self.nulls) if self.nulls is not None else 0
+        return self.values.itemsize * len(self.values) + nulls
+
+
+class IntColumn(_NumericColumn):
+    """Signed 64-bit integer column."""
+
+    dtype: ClassVar[ColumnType] = "int"
+    typecode: ClassVar[str] = "q"
+
+
+class FloatColumn(_NumericColumn):
+    """Double precision float column."""
+
+    dtype: ClassVar[ColumnType] = "float"
+    typecode: ClassVar[str] = "d"
+
+    def extend(self, values: Sequence[CellValue]) -> None:
+        """Append values to the column.
+
+        Args:
+            values: Values accepted by the column
+
+        """
+        super().extend([None if value is None else float(value) for value in values])
+
+    def set(self, index: int, value: CellValue) -> None:
+        """Replace the value at a row index.
+
+        Args:
+            index: Row index
+            value: Value accepted by the column
+
+        """
+        super().set(index, None if value is None else float(value))
+
+    def sort_keys(self, *, blocks: bool = False) -> Sequence[int] | Sequence[float]:
+        """Get typed sort keys, one per row, with ``None`` and NaN last.
+
+        Args:
+            blocks: Whether to sort in blocks, unused for numbers
+
+        Returns:
+            Sequence: The value buffer itself when there are no gaps
+
+        """
+        keys = super().sort_keys(blocks=blocks)
+        # NaN propagates through the C-level sum, so clean data skips the scan.
+        if not math.isnan(sum(keys)):
+            return keys
+        inf = float("inf")
+        return array("d", [inf if math.isnan(value) else value for value in keys])
+
+
+class BoolColumn(ColumnArray):
+    """Boolean column stored one byte per row, with 2 marking ``None``."""
+
+    dtype: ClassVar[ColumnType] = "bool"
+
+    def __init__(self, values: Sequence[CellValue] = ()) -> None:
+        """Initialize the column.
+
+        Args:
+            values: Initial values
+
+        """
+        self.values = bytearray()
+        self.extend(values)
+
+    def __len__(self) -> int:
+        """Get the number of stored values."""
+        return len(self.values)
+
+    def __getitem__(self, index: int) -> CellValue:
+        """Get a value by row index."""
+        code = self.values[index]
+        return None if code == 2 else bool(code)
+
+    def extend(self, values: Sequence[CellValue]) -> None:
+        """Append values to the column.
+
+        Args:
+            values: Values accepted by the column
+
+        """
+        self.values.extend(2 if value is None else int(value) for value in values)
+
+    def set(self, index: int, value: CellValue) -> None:
+        """Replace the value at a row index.
+
+        Args:
+            index: Row index
+            value: Value accepted by the column
+
+        """
+        self.values[index] = 2 if value is None else int(value)
+
+    def snapshot(self) -> ColumnArray:
+        """Copy the byte buffer."""
+        clone = copy.copy(self)
+        clone.values = self.values[:]
+        return clone
+
+    def sort_keys(self, *, blocks: bool = False) -> Sequence[int] | Sequence[float]:
+        """Get typed sort keys, one per row, with ``None`` sorting last.
+
+        Args:
+            blocks: Whether to sort in blocks, unused for booleans
+
+        Returns:
+            Sequence: The byte buffer itself, where ``None`` is stored as 2
+
+        """
+        return self.values
+
+    def null_mask(self) -> Sequence[int] | None:
+        """Get a flag per row that is 1 where the value is ``None``.
+
+        Returns:
+            Optional[Sequence[int]]: Null flags, ``None`` when no row is null
+
+        """
+        if 2 not in self.values:
+            return None
+        return self.values.translate(_BOOL_NULLS)
+
+    @property
+    def nbytes(self) -> int:
+        """Get the approximate size of the column buffers in bytes."""
+        return len(self.values)
+
+
+class StrColumn(ColumnArray):
+    """String column holding one reference per row."""
+
+    dtype: ClassVar[ColumnType] = "str"
+
+    def __init__(self, values: Sequence[CellValue] = ()) -> None:
+        """Initialize the column.
+
+        Args:
+            values: Initial values
+
+        """
+        self.values: list[CellValue] = list(values)
+
+    def __len__(self) -> int:
+        """Get the number of stored values."""
+        return len(self.values)
+
+    def __getitem__(self, index: int) -> CellValue:
+        """Get a value by row index."""
+        return self.values[index]
+
+    def __iter__(self) -> Iterator[CellValue]:
+        """Iterate over the stored values."""
+        return iter(self.values)
+
+    def extend(self, values: Sequence[CellValue]) -> None:
+        """Append values to the column.
+
+        Args:
+            values: Values accepted by the column
+
+        """
+        self.values.extend(values)
+
+    def set(self, index: int, value: CellValue) -> None:
+        """Replace the value at a row index.
+
+        Args:
+            index: Row index
+            value: Value accepted by the column
+
+        """
+        self.values[index] = value
+
+    def snapshot(self) -> ColumnArray:
+        """Copy the list of value references."""
+        clone = copy.copy(self)
+        clone.values = self.values[:]
+        return clone
+
+    def sort_keys(self, *, blocks: bool = False) -> Sequence[int] | Sequence[float]:
+        """Get typed sort keys, one per row, with ``None`` sorting last.
+
+        Args:
+            blocks: Whether to sort in blocks, so that a worker thread
+                computing the keys does not hold the GIL for long
+
+        Returns:
+            Sequence: Dense rank of each value among the distinct values
+
+        """
+        if self.dtype == "str":
+            return _rank(self.values, blocks=blocks)
+        return super().sort_keys(blocks=blocks)
+
+    @property
+    def nbytes(self) -> int:
+        """Get the approximate size of the column buffers in bytes."""
+        return 8 * len(self.values)
+
+
+class ObjectColumn(StrColumn):
+    """Fallback column for mixed or unsupported value types."""
+
+    dtype: ClassVar[ColumnType] = "object"
+
+
+class DictColumn(ColumnArray):
+    """Dictionary-encoded string column for low-cardinality values.
+
+    Attributes:
+        codes (array): Per-row index into ``dictionary``, -1 for ``None``
+        dictionary (List[str]): Distinct values in first-seen order
+
+    """
+
+    dtype: ClassVar[ColumnType] = "str"
+
+    def __init__(self, values: Sequence[CellValue] = ()) -> None:
+        """Initialize the column.
+
+        Args:
+            values: Initial values
+
+        """
+        self.codes = array("i")
+        self.dictionary: list[str] = []
+        self._lookup: dict[str, int] = {}
+        self.extend(values)
+
+    def __len__(self) -> int:
+        """Get the number of stored values."""
+        return len(self.codes)
+
+    def __getitem__(self, index: int) -> CellValue:
+        """Get a value by row index."""
+        code = self.codes[index]
+        return None if code < 0 else self.dictionary[code]
+
+    def _encode(self, value: CellValue) -> int:
+        """Get the code for a value, adding it to the dictionary if needed."""
+        if value is None:
+            return -1
+        # Values accepted by the column are strings.
+        text = cast("str", value)
+        code = self._lookup.get(text)
+        if code is None:
+            code = self._lookup[text] = len(self.dictionary)
+            self.dictionary.append(text)
+        return code
+
+    def extend(self, values: Sequence[CellValue]) -> None:
+        """Append values to the column.
+
+        Args:
+            values: Values accepted by the column
+
+        """
+        self.codes.fromlist([self._encode(value) for value in values])
+
+    def set(self, index: int, value: CellValue) -> None:
+        """Replace the value at a row index.
+
+        Args:
+            index: Row index
+            value: Value accepted by the column
+
+        """
+        self.codes[index] = self._encode(value)
+
+    def snapshot(self) -> ColumnArray:
+        """Copy the codes and the dictionary."""
+        clone = copy.copy(self)
+        clone.codes = self.codes[:]
+        clone.dictionary = self.dictionary[:]
+        clone._lookup = dict(self._lookup)
+        return clone
+
+    def sort_keys(self, *, blocks: bool = False) -> Sequence[int] | Sequence[float]:
+        """Get typed sort keys, one per row, with ``None`` sorting last.
+
+        Only the dictionary is sorted; rows are then mapped to the rank of
+        their code, with code -1 picking the trailing ``None`` rank.
+
+        Args:
+            blocks: Whether to sort in blocks, unused for the small
+                dictionary
+
+        Returns:
+            Sequence: Rank of each row value among the distinct values
+
+        """
+        size = len(self.dictionary)
+        ranks = array("q", bytes(8 * (size + 1)))
+        ranks[size] = size
+        ordered = sorted(range(size), key=self.dictionary.__getitem__)
+        for rank, code in enumerate(ordered):
+            ranks[code] = rank
+        return array("q", map(ranks.__getitem__, self.codes))
+
+    def null_mask(self) -> Sequence[int] | None:
+        """Get a flag per row that is 1 where the value is ``None``.
+
+        Returns:
+            Optional[Sequence[int]]: Null flags, ``None`` when no row is null
+
+        """
+        if -1 not in self.codes:
+            return None
+        return bytearray(code < 0 for code in self.codes)
+
+    @property
+    def nbytes(self) -> int:
+        """Get the approximate size of the column buffers in bytes."""
+        return self.codes.itemsize * len(self.codes) + 8 * len(self.dictionary)
+
+
+def _object_sort_key(value: CellValue) -> tuple[int, CellValue]:
+    """Get a key that orders mixed values: numbers, then text."""
+    if isinstance(value, int | float):
+        return (0, value)
+    return (1, str(value))
+
+
+def sorted_in_blocks(
+    values: Iterable[CellValue],
+    key: Callable[[CellValue], Any] | None = None,
+) -> list[CellValue]:
+    """Sort values in blocks that are then merged.
+
+    ``sorted`` holds the GIL for its whole run, which stalls the event loop
+    when a worker thread sorts many values. Blocks are short sorts and
+    ``heapq.merge`` runs as Python code, so the thread releases the GIL in
+    between. The result is the same stable order.
+
+    Args:
+        values: Values to sort
+        key: Sort key
+
+    Returns:
+        List: Sorted values
+
+    """
+    # Values that do not compare with each other need a key that makes them.
+    items: list[Any] = list(values)
+    sorted_blocks = [
+        sorted(items[start : start + SORT_BLOCK], key=key)
+        for start in range(0, len(items), SORT_BLOCK)
+    ]
+    return list(heapq.merge(*sorted_blocks, key=key))
+
+
+def _rank(
+    values: Sequence[CellValue],
+    key: Callable[[CellValue], Any] | None = None,
+    *,
+    blocks: bool = False,
+) -> array[int]:
+    """Replace each value by its dense rank among the distinct values.
+
+    Args:
+        values: Column values
+        key: Sort key for the distinct values
+        blocks: Whether to sort and map the values in blocks
+
+    Returns:
+        array: Ranks, with ``None`` ranked after every other value
+
+    """
+    # The values of one column compare with each other, or through the key.
+    distinct: set[Any] = {value for value in values if value is not None}
+    ordered = sorted_in_blocks(distinct, key) if blocks else sorted(distinct, key=key)
+    ranks: dict[CellValue, int] = {value: rank for rank, value in enumerate(ordered)}
+    ranks[None] = len(ordered)
+    if not blocks:
+        return array("q", map(ranks.__getitem__, values))
+    keys = array("q")
+    for start in range(0, len(values), SORT_BLOCK):
+        keys.extend(map(ranks.__getitem__, values[start : start + SORT_BLOCK]))
+    return keys
+
+
+def make_column(dtype: ColumnType, values: Sequence[CellValue] = ()) -> ColumnArray:
+    """Create a typed column holding the given values.
+
+    Args:
+        dtype: Storage type, "auto" stores the values as objects
+        values: Initial values, all accepted by ``dtype``
+
+    Returns:
+        ColumnArray: Typed column
+
+    """
+    if dtype == "str":
+        distinct = len(set(values))
+        if distinct <= DICTIONARY_LIMIT and distinct * 2 <= len(values):
+            return DictColumn(values)
+        return StrColumn(values)
+    column_types: dict[ColumnType, type[ColumnArray]] = {
+        "int": IntColumn,
+        "float": FloatColumn,
+        "bool": BoolColumn,
+    }
+    return column_types.get(dtype, ObjectColumn)(values)
+
+
+class ColumnStore:
+    """Columnar backing store for table rows.
+
+    Values are stored per ``Column.key``; keys that are not table columns are
+    dropped on load. A row is identified by its storage index, which stays
+    stable across sorts, updates and deletes: deleted rows are only marked in
+    a tombstone mask until the next ``load``. When a column is declared as
+    the primary key, a hash index maps its values to row indexes.
+
+    Example:
+        >>> store = ColumnStore([Column("id", "ID")], [{"id": 1}, {"id": 2}])
+        >>> store.value(1, "id")
+        2
+
+    Attributes:
+        arrays (Dict[str, ColumnArray]): Typed storage per column key
+        deleted (Optional[bytearray]): Tombstone mask, allocated on delete
+        versions (Optional[array]): Per-row update counters, allocated on the
+            first update
+        primary_key (Optional[str]): Key of the primary key column
+        key_index (Dict[Any, int]): Row index by primary key value, empty
+            without a primary key
+
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[Column],
+        rows: Sequence[Row] = (),
+    ) -> None:
+        """Initialize the store.
+
+        Args:
+            columns: Table columns
+            rows: Initial data rows
+
+        Raises:
+            ValueError: If several columns are primary keys, or the primary
+                keys of the rows are not unique.
+
+        """
+        keys = [column.key for column in columns if column.primary_key]
+        if len(keys) > 1:
+            error_msg = f"Only one primary key column is allowed, got {keys}"
+            raise ValueError(error_msg)
+        self._columns = list(columns)
+        self.primary_key = keys[0] if keys else None
+        self.key_index: dict[CellValue, int] = {}
+        self.arrays: dict[str, ColumnArray] = {}
+        self.deleted: bytearray | None = None
+        self.versions: array[int] | None = None
+        self._length = 0
+        self._live: array[int] | None = None
+        # Keys of "auto" columns that have only held None so far.
+        self._untyped: set[str] = set()
+        self.load(rows)
+
+    def __len__(self) -> int:
+        """Get the number of row slots, including deleted rows."""
+        return self._length
+
+    @property
+    def row_count(self) -> int:
+        """Get the number of rows that are not deleted."""
+        return len(self.live_rows())
+
+    def live_rows(self) -> Sequence[int]:
+        """Get the indexes of rows that are not deleted, in storage order.
+
+        Once rows were deleted, the same array is returned until the next
+        load and is updated in place as rows are appended or deleted, so
+        callers that read it later or on another thread take a copy.
+
+        Returns:
+            Sequence[int]: Row indexes
+
+        """
+        if self.deleted is None:
+            return range(self._length)
+        if self._live is None:
+            self._live = array(
+                "q", [row for row, dead in enumerate(self.deleted) if not dead]
+            )
+        return self._live
+
+    def is_deleted(self, index: int) -> bool:
+        """Check whether a row was deleted.
+
+        Args:
+            index: Row index
+
+        Returns:
+            bool: Whether the row is deleted
+
+        """
+        return self.deleted is not None and bool(self.deleted[index])
+
+    def _check_row(self, index: int) -> None:
+        """Validate a row index.
+
+        Args:
+            index: Row index
+
+        Raises:
+            IndexError: If the row does not exist or was deleted.
+
+        """
+        if not 0 <= index < self._length or self.is_deleted(index):
+            error_msg = f"Row {index} not found"
+            raise IndexError(error_msg)
+
+    def load(self, rows: Sequence[Row]) -> None:
+        """Replace the store contents.
+
+        Args:
+            rows: Data rows
+
+        Raises:
+            ValueError: If the primary keys of the rows are not unique.
+
+        """
+        primary_key = self.primary_key
+        key_index = self._index_keys(
+            [] if primary_key is None else [row.get(primary_key) for row in rows]
+        )
+        self.arrays = {}
+        self._untyped = set()
+        for column in self._columns:
+            values = [row.get(column.key) for row in rows]
+            inferred = infer_type(values)
+            if column.dtype == "auto" and inferred == "auto":
+                self._untyped.add(column.key)
+            dtype = self._resolve_type(column, inferred)
+            self.arrays[column.key] = make_column(dtype, values)
+        self._length = len(rows)
+        self.deleted = None
+        self.versions = None
+        self._live = None
+        self.key_index = key_index
+
+    def load_arrays(self, arrays: Mapping[str, ColumnArray]) -> None:
+        """Replace the store contents with existing column arrays.
+
+        The arrays are used as they are, without copying, unless their type
+        does not match the declared column type. Table columns missing from
+        the mapping are filled with ``None``.
+
+        Args:
+            arrays: Column arrays of equal length by column key
+
+        Raises:
+            ValueError: If the arrays differ in length, or the primary keys
+                are not unique.
+
+        """
+        lengths = {len(values) for values in arrays.values()}
+        if len(lengths) > 1:
+            error_msg = f"Column arrays differ in length: {sorted(lengths)}"
+            raise ValueError(error_msg)
+        length = lengths.pop() if lengths else 0
+        keys = arrays.get(self.primary_key) if self.primary_key else None
+        key_index = self._index_keys([None] * length if keys is None else list(keys))
+        self.arrays = {}
+        self._untyped = set()
+        for column in self._columns:
+            current = arrays.get(column.key)
+            if current is None:
+                if column.dtype == "auto":
+                    self._untyped.add(column.key)
+                dtype = self._resolve_type(column, "auto")
+                current = make_column(dtype, [None] * length)
+            else:
+                dtype = self._resolve_type(column, current.dtype)
+                if dtype != current.dtype:
+                    current = make_column(dtype, list(current))
+            self.arrays[column.key] = current
+        self._length = length
+        self.deleted = None
+        self.versions = None
+        self._live = None
+        self.key_index = key_index
+
+    def _index_keys(
+        self,
+        keys: Sequence[CellValue],
+        start: int = 0,
+    ) -> dict[CellValue, int]:
+        """Map the primary keys of consecutive rows to their row indexes.
+
+        Args:
+            keys: Primary key values of the rows
+            start: Row index of the first row
+
+        Returns:
+            Dict[Any, int]: Row index by key, empty without a primary key
+
+        Raises:
+            ValueError: If a key is ``None`` or appears twice.
+
+        """
+        if self.primary_key is None:
+            return {}
+        index = dict(zip(keys, range(start, start + len(keys)), strict=True))
+        if None in index:
+            error_msg = f"Missing primary key in column '{self.primary_key}'"
+            raise ValueError(error_msg)
+        if len(index) < len(keys):
+            seen: set[CellValue] = set()
+            for key in keys:
+                if key in seen:
+                    error_msg = f"Duplicate primary key: {key!r}"
+                    raise ValueError(error_msg)
+                seen.add(key)
+        return index
+
+    def find(self, key: CellValue) -> int | None:
+        """Get the row holding a primary key value.
+
+        Args:
+            key: Primary key value
+
+        Returns:
+            Optional[int]: Row index, ``None`` if no live row has the key
+
+        """
+        return self.key_index.get(key)
+
+    def append_rows(self, rows: Sequence[Row]) -> None:
+        """Append rows, widening column types when needed.
+
+        Args:
+            rows: Data rows
+
+        """
+        self.append_columns(
+            {
+                column.key: [row.get(column.key) for row in rows]
+                for column in self._columns
+            },
+            len(rows),
+        )
+
+    def append_columns(
+        self,
+        values: Mapping[str, Sequence[CellValue]],
+        count: int,
+    ) -> None:
+        """Append rows given column by column, widening types when needed.
+
+        This avoids building a mapping per row when the data is already
+        columnar, such as fields parsed from a file.
+
+        Args:
+            values: Values of the new rows by column key; missing columns
+                are filled with ``None``
+            count: Number of new rows
+
+        Raises:
+            ValueError: If a column does not hold ``count`` values, or a
+                primary key is missing or already used.
+
+        """
+        # Every column is checked before any is extended, so that a bad
+        # batch leaves the store unchanged.
+        for column in self._columns:
+            column_values = values.get(column.key)
+            if column_values is not None and len(column_values) != count:
+                error_msg = f"Expected {count} values for column '{column.key}'"
+                raise ValueError(error_msg)
+        if self.primary_key is not None:
+            keys = values.get(self.primary_key, [None] * count)
+            added = self._index_keys(keys, self._length)
+            if not added.keys().isdisjoint(self.key_index):
+                duplicate = next(key for key in added if key in self.key_index)
+                error_msg = f"Duplicate primary key: {duplicate!r}"
+                raise ValueError(error_msg)
+        for column in self._columns:
+            column_values = values.get(column.key)
+            if column_values is None:
+                column_values = [None] * count
+            current = self._widen(column, infer_type(column_values))
+            current.extend(column_values)
+            self._check_dictionary(column.key)
+        start = self._length
+        self._length += count
+        if self.deleted is not None:
+            self.deleted.extend(bytes(count))
+            if self._live is not None:
+                self._live.extend(range(start, self._length))
+        if self.versions is not None:
+            self.versions.frombytes(bytes(count * self.versions.itemsize))
+        if self.primary_key is not None:
+            self.key_index.update(added)
+
+    def update_row(self, index: int, changes: Row) -> Row:
+        """Update values of a single row in place.
+
+        Args:
+            index: Row index
+            changes: New values by column key, unknown keys are ignored
+
+        Returns:
+            Row: Previous values of the columns whose value changed
+
+        Raises:
+            IndexError: If the row does not exist or was deleted.
+            ValueError: If the primary key changes to ``None`` or to the key
+                of another row.
+
+        """
+        self._check_row(index)
+        if self.primary_key in changes:
+            key = changes[self.primary_key]
+            if key is None or self.key_index.get(key, index) != index:
+                error_msg = f"Duplicate or missing primary key: {key!r}"
+                raise ValueError(error_msg)
+        changed = {}
+        for column in self._columns:
+            if column.key not in changes:
+                continue
+            value = changes[column.key]
+            current = self.arrays[column.key]
+            if current[index] == value and type(current[index]) is type(value):
+                continue
+            if not current.writable or not current.accepts(value):
+                current = self._widen(column, value_type(value))
+            changed[column.key] = current[index]
+            current.set(index, value)
+            if value is not None:
+                self._untyped.discard(column.key)
+            self._check_dictionary(column.key)
+            if column.key == self.primary_key:
+                del self.key_index[changed[column.key]]
+                self.key_index[value] = index
+        if changed:
+            if self.versions is None:
+                self.versions = array("I", bytes(4 * self._length))
+            self.versions[index] = (self.versions[index] + 1) & 0xFFFFFFFF
+        return changed
+
+    def check_updates(self, updates: Iterable[tuple[int, Row]]) -> None:
+        """Validate a batch of row updates before any of them is applied.
+
+        Primary key changes are checked in order, as ``update_row`` would
+        apply them, so a batch may move a key from one row to another.
+
+        Args:
+            updates: ``(index, changes)`` pairs
+
+        Raises:
+            IndexError: If a row does not exist or was deleted.
+            ValueError: If a primary key changes to ``None`` or to the key
+                of another row.
+
+        """
+        primary_key = self.primary_key
+        keys: dict[int, CellValue] = {}
+        owners: dict[CellValue, int | None] = {}
+        for index, changes in updates:
+            self._check_row(index)
+            if primary_key is None or primary_key not in changes:
+                continue
+            key = changes[primary_key]
+            owner = owners[key] if key in owners else self.key_index.get(key)
+            if key is None or owner not in {None, index}:
+                error_msg = f"Duplicate or missing primary key: {key!r}"
+                raise ValueError(error_msg)
+            old = keys.get(index, self.arrays[primary_key][index])
+            owners[old] = None
+            owners[key] = index
+            keys[index] = key
+
+    def version(self, index: int) -> int:
+        """Get the update counter of a row.
+
+        The counter changes whenever a value of the row changes, so it can
+        key caches derived from the row contents.
+
+        Args:
+            index: Row index
+
+        Returns:
+            int: Row version
+
+        """
+        return 0 if self.versions is None else self.versions[index]
+
+    def delete_rows(self, indexes: Iterable[int]) -> list[int]:
+        """Mark rows as deleted.
+
+        Args:
+            indexes: Row indexes
+
+        Returns:
+            List[int]: Indexes of the rows that were deleted
+
+        Raises:
+            IndexError: If a row does not exist or was deleted.
+            ValueError: If a row is given twice.
+
+        """
+        removed = list(indexes)
+        for index in removed:
+            self._check_row(index)
+        if len(set(removed)) != len(removed):
+            error_msg = "Duplicate row index in delete"
+            raise ValueError(error_msg)
+        if self.deleted is None:
+            self.deleted = bytearray(self._length)
+        key_column = (
+            self.arrays[self.primary_key] if self.primary_key is not None else None
+        )
+        for index in removed:
+            self.deleted[index] = 1
+            if key_column is not None:
+                del self.key_index[key_column[index]]
+        if removed and self._live is not None:
+            self._remove_live(self._live, removed)
+        return removed
+
+    @staticmethod
+    def _remove_live(live: array[int], removed: Sequence[int]) -> None:
+        """Remove deleted rows from the sorted live row indexes in place.
+
+        Args:
+            live: Live row indexes in storage order
+            removed: Indexes of live rows that were deleted
+
+        """
+        if len(removed) * LIVE_PATCH_RATIO > len(live):
+            dead = set(removed)
+            live[:] = array("q", [row for row in live if row not in dead])
+            return
+        for index in sorted(removed, reverse=True):
+            del live[bisect_left(live, index)]
+
+    def _widen(self, column: Column, dtype: ColumnType) -> ColumnArray:
+        """Widen a column so that it can hold values of another type.
+
+        Args:
+            column: Column configuration
+            dtype: Type of the incoming values
+
+        Returns:
+            ColumnArray: Writable column storage able to hold both types
+
+        """
+        current = self.arrays[column.key]
+        untyped = column.key in self._untyped
+        if untyped and dtype == "auto" and current.writable:
+            return current
+        # Columns that only held None so far take the type of new data.
+        widened = widen_type("auto" if untyped else current.dtype, dtype)
+        if widened != current.dtype or not current.writable:
+            widened = self._resolve_type(column, widened)
+            current = self.arrays[column.key] = make_column(widened, list(current))
+        if dtype != "auto":
+            self._untyped.discard(column.key)
+        return current
+
+    def _check_dictionary(self, key: str) -> None:
+        """Drop dictionary encoding once a column stops being low-cardinality.
+
+        Args:
+            key: Column key
+
+        """
+        current = self.arrays[key]
+        if not isinstance(current, DictColumn):
+            return
+        if len(current.dictionary) > DICTIONARY_LIMIT:
+            self.arrays[key] = StrColumn(list(current))
+
+    def _resolve_type(self, column: Column, inferred: ColumnType) -> ColumnType:
+        """Combine a declared column type with the type found in the data.
+
+        Args:
+            column: Column configuration
+            inferred: Type inferred from the values
+
+        Returns:
+            ColumnType: Storage type to use
+
+        """
+        if column.dtype == "auto":
+            return "object" if inferred == "auto" else inferred
+        dtype = widen_type(column.dtype, inferred)
+        if dtype != column.dtype:
+            logger.warning(
+                "Column values do not match declared type",
+                column=column.key,
+                declared=column.dtype,
+                stored=dtype,
+            )
+        return dtype
+
+    def column(self, key: str) -> ColumnArray:
+        """Get the storage for a column.
+
+        Args:
+            key: Column key
+
+        Returns:
+            ColumnArray: Typed column storage
+
+        Raises:
+            KeyError: If the key is not a table column.
+
+        """
+        if key not in self.arrays:
+            error_msg = f"Column '{key}' not found"
+            raise KeyError(error_msg)
+        return self.arrays[key]
+
+    def value(self, index: int, key: str) -> CellValue:
+        """Get a single cell value.
+
+        Args:
+            index: Row index
+            key: Column key
+
+        Returns:
+            CellValue: Stored value, ``None`` for unknown keys
+
+        """
+        column = self.arrays.get(key)
+        return None if column is None else column[index]
+
+    def row(self, index: int) -> Row:
+        """Materialize a row as a dictionary.
+
+        Args:
+            index: Row index
+
+        Returns:
+            Row: Row values by column key
+
+        """
+        return {key: column[index] for key, column in self.arrays.items()}
+
+    def rows(self, order: Sequence[int] | None = None) -> RowsView:
+        """Get a lazy row view over the store.
+
+        Args:
+            order: Row indexes to expose, live rows in storage order by default
+
+        Returns:
+            RowsView: Sequence of materialized rows
+
+        """
+        return RowsView(self, self.live_rows() if order is None else order)
+
+    @property
+    def nbytes(self) -> int:
+        """Get the approximate size of the column buffers in bytes."""
+        return sum(column.nbytes for column in self.arrays.values())
+
+
+class RowsView(Sequence[Row]):
+    """Read-only sequence of rows materialized on access."""
+
+    def __init__(self, store: ColumnStore, order: Sequence[int]) -> None:
+        """Initialize the view.
+
+        Args:
+            store: Backing store
+            order: Row indexes in view order
+
+        """
+        self._store = store
+        self._order = order
+
+    def __len__(self) -> int:
+        """Get the number of rows in the view."""
+        return len(self._order)
+
+    @overload
+    def __getitem__(self, index: int) -> Row: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Row]: ...
+
+    def __getitem__(self, index: int | slice) -> Row | list[Row]:
+        """Get one row or a slice of rows."""
+        if isinstance(index, slice):
+            return [self._store.row(row) for row in self._order[index]]
+        return self._store.row(self._order[index])
@@ -0,0 +1,87 @@
+"""Batching of streamed rows for table widgets."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterable, AsyncIterator
+
+    from .store import Row
+
+
+_END = object()
+
+
+async def batch_rows(
+    source: AsyncIterable[Row],
+    batch_size: int = 1_000,
+    max_latency: float = 0.05,
+    max_pending: int | None = None,
+) -> AsyncIterator[list[Row]]:
+    """Group rows from an async source into batches.
+
+    A batch is yielded once it holds ``batch_size`` rows or its first row has
+    waited ``max_latency`` seconds. Rows are read ahead into a bounded buffer;
+    when the consumer of the batches falls behind the buffer fills up and the
+    source is no longer pulled, which applies backpressure to the producer.
+
+    Example:
+        >>> async for batch in batch_rows(tail_log(), batch_size=500):
+        ...     await table.append_rows(batch)
+
+    Args:
+        source: Async iterable of data rows
+        batch_size: Maximum number of rows per batch
+        max_latency: Maximum seconds a row waits before its batch is yielded
+        max_pending: Rows buffered ahead of the consumer, defaults to four
+            batches
+
+    Yields:
+        List[Row]: Non-empty batches of rows in arrival order
+
+    """
+    batch_size = max(1, batch_size)
+    queue: asyncio.Queue[object] = asyncio.Queue(maxsize=max_pending or 4 * batch_size)
+
+    async def read() -> None:
+        try:
+            async for row in source:
+                await queue.put(row)
+        except Exception as error:  # noqa: BLE001 - re-raised by the consumer
+            await queue.put(error)
+        else:
+            await queue.put(_END)
+
+    reader = asyncio.create_task(read())
+    loop = asyncio.get_running_loop()
+    ending: object = None
+    try:
+        while ending is None:
+            item = await queue.get()
+            if item is _END or isinstance(item, Exception):
+                ending = item
+                break
+            batch = [item]
+            deadline = loop.time() + max_latency
+            while len(batch) < batch_size:
+                if queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(queue.get(), timeout)
+                    except TimeoutError:
+                        break
+                else:
+                    item = queue.get_nowait()
+                if item is _END or isinstance(item, Exception):
+                    ending = item
+                    break
+                batch.append(item)
+            yield batch
+    finally:
+        reader.cancel()
+    if isinstance(ending, Exception):
+        raise ending
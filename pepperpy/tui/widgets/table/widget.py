@@ -0,0 +1,1694 @@
+"""Table widget for data display."""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import operator
+import time
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, ClassVar
+
+import structlog
+from rich.cells import cell_len
+from rich.table import Table as RichTable
+from textual.geometry import Region
+from textual.widgets import Static
+
+from ..base import EventData, PepperWidget
+from .aggregate import TableAggregates, format_footer
+from .buffer import column_arrays
+from .export import EXPORT_CHUNK, export_view
+from .filter import TableFilter
+from .formatters import format_value
+from .highlight import ChangeHighlights
+from .sort import SortIndex, SortSpec, parse_sort_keys
+from .source import AggregateSource, PagedRows
+from .sqlite_table import SQLiteTable
+from .store import ColumnStore, RowsView
+from .selection import RowSelection
+from .stream import batch_rows
+from .width import ColumnWidths
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterable, Iterable, Iterator, Sequence
+    from pathlib import Path
+
+    from rich.text import Text
+    from textual.binding import Binding
+    from textual.events import (
+        Click,
+        MouseScrollDown,
+        MouseScrollLeft,
+        MouseScrollRight,
+        MouseScrollUp,
+    )
+    from textual.timer import Timer
+
+    from ..progress import Progress
+    from .column import Column
+    from .export import Chunk, ExportFormat
+    from .filter import IndexKind, Predicate
+    from .source import TableDataSource
+    from .store import CellValue, Row
+
+logger = structlog.get_logger(__name__)
+
+# Lines taken by the top edge, the column labels and the header separator.
+HEADER_HEIGHT = 3
+
+# Minimum seconds between two streamed batches being applied.
+FRAME_INTERVAL = 1 / 60
+
+# Cell text shown while the page of a row is being fetched.
+LOADING_CELL = "…"
+
+# Columns take one space of padding on each side and a border on the right.
+COLUMN_PADDING = 3
+
+# Width assumed for a column that has no width and was never measured.
+MIN_COLUMN_WIDTH = 8
+
+# Row slots from which sorts run on a worker thread instead of in render.
+BACKGROUND_SORT_ROWS = 100_000
+
+# Style of the selected rows.
+SELECTED_ROW_STYLE = "on #6272a4"
+
+
+class PepperTable(PepperWidget, Static):
+    """Enhanced table widget with sorting and filtering.
+
+    Rows are held in a typed ``ColumnStore`` rather than a list of dicts,
+    or read in place from NumPy arrays and typed buffers with
+    ``load_arrays``. In virtual mode only the rows inside the visible scroll window are
+    formatted and handed to Rich, so repaint cost depends on the widget
+    height instead of the dataset size. Rows can be appended, updated and
+    deleted in place, or upserted through the index of a primary key
+    column; only the rows whose content changed are re-formatted and
+    repainted. Filters are predicate expressions evaluated once into a
+    row mask and re-evaluated incrementally as rows change.
+
+    Datasets that do not fit in memory can be read from a
+    ``TableDataSource`` instead: sorting and filtering are pushed down to the
+    source and only the pages around the scroll window are fetched.
+    ``load_sqlite`` loads rows into SQLite to get the same pushdown, with
+    indexes and footer aggregates computed by the database.
+    Wide tables are virtualized horizontally as well: only the columns that
+    fit the widget are formatted, measured and rendered, and columns marked
+    ``frozen`` stay pinned at the left while the others scroll.
+    With ``highlight_changes`` set, cells whose value an update changes
+    flash and fade out, driven by a single animation clock.
+    Rows can be selected by click, shift-click for a range and ctrl-click to
+    toggle; the selection is a bitmap of row keys, so it survives sorting
+    and filtering, and selecting every row takes constant time.
+    ``export`` streams the current view to a CSV, JSONL or Parquet file.
+
+    Example:
+        >>> table = PepperTable(columns=[Column("host", "Host")], virtual=True)
+        >>> await table.load_data(rows)
+        >>> table.scroll_to_row(1_000)
+        >>> await table.filter_by(Eq("region", "eu") & Range("latency", high=50))
+
+    Attributes:
+        columns (List[Column]): Table columns
+        store (ColumnStore): Columnar table data
+        data (Sequence[Dict[str, Any]]): Lazy row view over the store
+        sort_key (Optional[str]): Current primary sort column
+        sort_spec (SortSpec): Current ``(key, descending)`` sort columns
+        sort_reverse (bool): Whether the direction of every sort key is
+            flipped
+        filter (Optional[Predicate]): Active row filter
+        virtual (bool): Whether only the visible window is rendered
+        overscan (int): Rows formatted ahead of and behind the window
+        auto_width (bool): Whether column widths are measured from a sample
+        highlight_changes (float): Seconds a changed cell stays highlighted,
+            0 when changes are not highlighted
+        aggregates (TableAggregates): Footer aggregates, in total and by group
+        scroll_row (int): Index of the first visible row in virtual mode
+        scroll_column (int): Index of the first visible column among those
+            that are not frozen, in virtual mode
+        selection (RowSelection): Keys of the selected rows
+
+    """
+
+    BINDINGS: ClassVar[list[Binding | tuple[str, str] | tuple[str, str, str]]] = [
+        ("up", "scroll_rows(-1)", "Scroll up"),
+        ("down", "scroll_rows(1)", "Scroll down"),
+        ("pageup", "scroll_page(-1)", "Page up"),
+        ("pagedown", "scroll_page(1)", "Page down"),
+        ("home", "scroll_home", "First row"),
+        ("end", "scroll_end", "Last row"),
+        ("left", "scroll_columns(-1)", "Scroll left"),
+        ("right", "scroll_columns(1)", "Scroll right"),
+        ("ctrl+a", "select_all", "Select all"),
+        ("escape", "clear_selection", "Clear selection"),
+    ]
+
+    DEFAULT_CSS = """
+    $primary: #bd93f9;
+    $secondary: #6272a4;
+    $accent: #ff79c6;
+    $background: #282a36;
+    $text: #f8f8f2;
+    $error: #ff5555;
+    $warning: #ffb86c;
+    $success: #50fa7b;
+    $info: #8be9fd;
+    $selection: #44475a;
+
+    PepperTable {
+        background: $selection;
+        color: $text;
+        border: solid $primary;
+        padding: 0;
+        width: 100%;
+        height: auto;
+    }
+
+    PepperTable.-virtual {
+        height: 1fr;
+    }
+
+    PepperTable > Header {
+        background: $primary;
+        color: $text;
+    }
+    """
+
+    def __init__(
+        self,
+        *args: tuple[()],
+        columns: list[Column],
+        virtual: bool = False,
+        overscan: int = 5,
+        auto_width: bool = False,
+        highlight_changes: float = 0.0,
+        **kwargs: dict[str, EventData],
+    ) -> None:
+        """Initialize the table widget.
+
+        Args:
+            columns: The columns to display in the table.
+            virtual: Whether to render only the rows in the scroll window.
+            overscan: Rows to keep formatted above and below the window.
+            auto_width: Whether to size columns without a width from a
+                sample of the rows instead of measuring every cell.
+            highlight_changes: Seconds a cell whose value changed stays
+                highlighted, 0 to disable highlighting.
+            *args: Additional positional arguments.
+            **kwargs: Additional keyword arguments.
+
+        """
+        super().__init__(*args, **kwargs)
+        self.columns = columns
+        self.store = ColumnStore(columns)
+        self._sort_index = SortIndex(self.store)
+        self._filter = TableFilter(self.store, self._sort_index)
+        self.rows: list[list[str]] = []
+        self.sort_key: str | None = None
+        self.sort_spec: SortSpec = ()
+        self.sort_reverse = False
+        self.virtual = virtual
+        self.overscan = max(0, overscan)
+        self.scroll_row = 0
+        self.scroll_column = 0
+        self._row_cache: dict[int, tuple[int, list[str]]] = {}
+        self._cache_keys: list[str] = []
+        self._visible_keys: set[str] = {col.key for col in columns}
+        self._window_rows: Sequence[int] = []
+        self._rendered: tuple[RichTable, list[Column]] | None = None
+        self._spans: dict[str, tuple[int, int]] | None = None
+        self._paged: PagedRows | None = None
+        self._scroll_direction = 1
+        self.auto_width = auto_width
+        self.highlight_changes = highlight_changes
+        self._highlights = ChangeHighlights(highlight_changes)
+        self._highlight_clock: Timer | None = None
+        self._widths = ColumnWidths()
+        self._aggregates = TableAggregates(self.store, columns)
+        self._sort_task: asyncio.Task[None] | None = None
+        self._source_totals: tuple[Row, dict[CellValue, Row]] | None = None
+        self._shown: tuple[tuple[object, ...], Sequence[int]] | None = None
+        self.selection = RowSelection()
+        self._anchor: int | None = None
+
+        if virtual:
+            self.can_focus = True
+            self.add_class("-virtual")
+
+    def render(self) -> RichTable:
+        """Render the table.
+
+        Returns:
+            RichTable: Rich table instance
+
+        """
+        columns = self._get_visible_columns()
+        cells = self._get_cells(columns)
+        widths: dict[str, int] = {}
+        if self.auto_width:
+            # Outside virtual mode every row is rendered, so only the sample
+            # is measured to keep layout cost independent of the row count.
+            widths = self._widths.measure(
+                columns,
+                cells if self.virtual else (),
+                lambda row: self._format_sampled_row(row, columns),
+            )
+        elif self.virtual:
+            # Window widths only decide which columns fit on screen.
+            self._widths.measure(columns, cells)
+
+        show_footer = self._show_footer()
+        footer = self._footer(columns) if show_footer else []
+        table = RichTable(
+            expand=True,
+            show_header=True,
+            show_footer=show_footer,
+            show_edge=True,
+            show_lines=True,
+            border_style="#bd93f9",
+        )
+
+        # Add columns
+        for index, col in enumerate(columns):
+            table.add_column(
+                col.label,
+                footer=footer[index] if footer else "",
+                width=col.width or widths.get(col.key),
+                justify=col.align,
+                style=col.style or "white",
+                no_wrap=self.virtual or self.auto_width,
+            )
+
+        # Add rows
+        rows = self._window_rows if self.selection or self._highlights else ()
+        now = time.monotonic()
+        for position, row in enumerate(cells):
+            key = rows[position] if position < len(rows) else None
+            styled: Sequence[str | Text] = row
+            if key is not None and key in self._highlights.rows:
+                styled = self._highlights.apply(key, columns, row, now)
+            selected = key is not None and key in self.selection
+            table.add_row(*styled, style=SELECTED_ROW_STYLE if selected else None)
+
+        self._rendered = (table, columns)
+        self._spans = None
+        return table
+
+    def _get_visible_columns(self) -> list[Column]:
+        """Get the columns that fit the widget at the scroll position.
+
+        Frozen columns come first, followed by the scrolled columns from
+        ``scroll_column`` on, as long as their width fits. Widths are taken
+        from the column, or measured on earlier renders.
+
+        Returns:
+            List[Column]: Columns to render, at least one scrolled column
+                when there is any
+
+        """
+        available = self.content_size.width
+        if not self.virtual or available <= 0:
+            return self.columns
+        frozen = [col for col in self.columns if col.frozen]
+        scrolled = [col for col in self.columns if not col.frozen]
+        self.scroll_column = max(0, min(self.scroll_column, len(scrolled) - 1))
+
+        measured = self._widths.widths
+
+        def width(col: Column) -> int:
+            return COLUMN_PADDING + (
+                col.width
+                or measured.get(col.key)
+                or max(cell_len(col.label), MIN_COLUMN_WIDTH)
+            )
+
+        used = 1 + sum(map(width, frozen))
+        shown: list[Column] = []
+        for col in scrolled[self.scroll_column :]:
+            if shown and used + width(col) > available:
+                return frozen + shown
+            used += width(col)
+            shown.append(col)
+        # At the last column, bring earlier columns back into the free space.
+        while (
+            self.scroll_column
+            and used + width(scrolled[self.scroll_column - 1]) <= available
+        ):
+            self.scroll_column -= 1
+            used += width(scrolled[self.scroll_column])
+            shown.insert(0, scrolled[self.scroll_column])
+        return frozen + shown
+
+    def _get_cells(self, columns: Sequence[Column]) -> list[list[str]]:
+        """Get the formatted cells of the rows to render.
+
+        Args:
+            columns: Columns to render
+
+        Returns:
+            List[List[str]]: Cell text of each rendered row in display order
+
+        """
+        keys = [col.key for col in columns]
+        if keys != self._cache_keys:
+            self._row_cache = {}
+            self._cache_keys = keys
+            self._visible_keys = set(keys)
+        if self._paged is not None:
+            return self._get_paged_cells(self._paged, columns)
+
+        rows = self._get_sorted_rows()
+        if not self.virtual:
+            self._row_cache = cache = self._format_rows(rows, columns)
+            self._window_rows = rows
+            return [cache[row][1] for row in rows]
+
+        start, end = self._get_window(len(rows))
+        low = max(0, start - self.overscan)
+        high = min(len(rows), end + self.overscan)
+
+        # Keep only the formatted rows around the window, formatting the
+        # overscan so that short scrolls reuse the cached cells.
+        self._row_cache = cache = self._format_rows(
+            [rows[position] for position in range(low, high)], columns
+        )
+        self._window_rows = [rows[position] for position in range(start, end)]
+        return [cache[row][1] for row in self._window_rows]
+
+    def _get_paged_cells(
+        self, pages: PagedRows, columns: Sequence[Column]
+    ) -> list[list[str]]:
+        """Get the window cells of a data source, fetching missing pages.
+
+        Args:
+            pages: Page cache of the data source
+            columns: Columns to render
+
+        Returns:
+            List[List[str]]: Cell text of each window row, placeholders for
+                rows whose page is not loaded yet
+
+        """
+        start, end = self._get_window(pages.total)
+        pages.request(
+            max(0, start - self.overscan),
+            end + self.overscan,
+            self._scroll_direction,
+        )
+        self._window_rows = []
+        loading = [LOADING_CELL] * len(columns)
+        cells = []
+        for position in range(start, end):
+            row = pages.row(position)
+            cells.append(loading if row is None else self._format_values(row, columns))
+        return cells
+
+    def _format_sampled_row(
+        self, row: int, columns: Sequence[Column]
+    ) -> list[str] | None:
+        """Format a row of the width sample, unless it was deleted.
+
+        Args:
+            row: Row index in the store
+            columns: Columns to format
+
+        Returns:
+            Optional[List[str]]: Cell text, ``None`` for a deleted row
+
+        """
+        if row >= len(self.store) or self.store.is_deleted(row):
+            return None
+        return self._format_row(row, columns)
+
+    def _format_rows(
+        self, rows: Sequence[int], columns: Sequence[Column]
+    ) -> dict[int, tuple[int, list[str]]]:
+        """Format rows, reusing cached cells of rows that did not change.
+
+        Cached cells are keyed by row index and row version, so re-sorting,
+        filtering and scrolling never re-format a row; updates bump the
+        version of the rows they touch and only those are formatted again.
+
+        Args:
+            rows: Row indexes in the store
+            columns: Columns to format, the same as for the cached cells
+
+        Returns:
+            Dict[int, Tuple[int, List[str]]]: Row version and cell text by
+                row index
+
+        """
+        previous = self._row_cache
+        version = self.store.version
+        cache = {}
+        for row in rows:
+            entry = previous.get(row)
+            current = version(row)
+            if entry is None or entry[0] != current:
+                entry = (current, self._format_row(row, columns))
+            cache[row] = entry
+        return cache
+
+    def _format_row(self, row: int, columns: Sequence[Column]) -> list[str]:
+        """Format a stored row into cell strings.
+
+        Args:
+            row: Row index in the store
+            columns: Columns to format
+
+        Returns:
+            List[str]: Cell text in column order
+
+        """
+        arrays = self.store.arrays
+        return [
+            (col.formatter or format_value)(arrays[col.key][row]) for col in columns
+        ]
+
+    def _format_values(self, row: Row, columns: Sequence[Column]) -> list[str]:
+        """Format a data row fetched from a source into cell strings.
+
+        Args:
+            row: Data row
+            columns: Columns to format
+
+        Returns:
+            List[str]: Cell text in column order
+
+        """
+        return [(col.formatter or format_value)(row.get(col.key)) for col in columns]
+
+    @property
+    def data(self) -> RowsView:
+        """Get the table rows in storage order.
+
+        Returns:
+            RowsView: Rows materialized from the store on access
+
+        """
+        return self.store.rows()
+
+    @property
+    def filter(self) -> Predicate | None:
+        """Get the active row filter.
+
+        Returns:
+            Optional[Predicate]: Filter predicate, ``None`` when unfiltered
+
+        """
+        return self._filter.predicate
+
+    @property
+    def view_count(self) -> int:
+        """Get the number of rows shown after filtering.
+
+        Returns:
+            int: Matching row count
+
+        """
+        if self._paged is not None:
+            return self._paged.total
+        return self._filter.count if self._filter.active else self.store.row_count
+
+    @property
+    def page_size(self) -> int:
+        """Get the number of rows that fit in the widget.
+
+        Returns:
+            int: Visible row count (at least one)
+
+        """
+        # Besides the header there is the bottom edge, and every row is
+        # followed by a separator except the last.
+        height = self.content_size.height - self._footer_height()
+        return max(1, (height - HEADER_HEIGHT) // 2) if height > 0 else 1
+
+    def _show_footer(self) -> bool:
+        """Check whether the aggregate footer is shown."""
+        return self._aggregates.active and (
+            self._paged is None or self._source_totals is not None
+        )
+
+    def _footer_height(self) -> int:
+        """Get the lines taken by the footer separator and footer lines."""
+        if not self._show_footer():
+            return 0
+        if self._source_totals is not None:
+            return len(self._source_totals[1]) + 2
+        return len(self._aggregates.groups) + 2
+
+    def _footer(self, columns: Sequence[Column]) -> list[str]:
+        """Format the footer cells, from the data source if it has them.
+
+        Args:
+            columns: Columns to render
+
+        Returns:
+            List[str]: Footer text per column
+
+        """
+        if self._source_totals is None:
+            return self._aggregates.footer(columns)
+        total, groups = self._source_totals
+        return format_footer(
+            columns,
+            self._aggregates.kinds,
+            self._aggregates.group_key,
+            total,
+            groups,
+        )
+
+    def _get_window(self, total: int) -> tuple[int, int]:
+        """Get the visible row range for the current scroll position.
+
+        Args:
+            total: Number of rows in the view
+
+        Returns:
+            Tuple[int, int]: Start (inclusive) and end (exclusive) indexes
+
+        """
+        size = self.page_size
+        self.scroll_row = max(0, min(self.scroll_row, total - size))
+        return self.scroll_row, min(total, self.scroll_row + size)
+
+    def scroll_to_row(self, index: int) -> None:
+        """Scroll so that a row is the first visible one.
+
+        Args:
+            index: Row index in the current sort order
+
+        """
+        limit = max(0, self.view_count - self.page_size)
+        index = max(0, min(index, limit))
+        if index != self.scroll_row:
+            self._scroll_direction = 1 if index > self.scroll_row else -1
+            self.scroll_row = index
+            self.refresh()
+
+    def action_scroll_rows(self, delta: int) -> None:
+        """Scroll by a number of rows.
+
+        Args:
+            delta: Rows to move, negative to scroll up
+
+        """
+        self.scroll_to_row(self.scroll_row + delta)
+
+    def action_scroll_page(self, pages: int) -> None:
+        """Scroll by a number of pages.
+
+        Args:
+            pages: Pages to move, negative to scroll up
+
+        """
+        self.scroll_to_row(self.scroll_row + pages * self.page_size)
+
+    def scroll_to_column(self, index: int) -> None:
+        """Scroll so that a column is the first visible one after the frozen.
+
+        Args:
+            index: Column index among the columns that are not frozen
+
+        """
+        count = sum(1 for col in self.columns if not col.frozen)
+        index = max(0, min(index, count - 1))
+        if index != self.scroll_column:
+            self.scroll_column = index
+            self.refresh()
+
+    def action_scroll_columns(self, delta: int) -> None:
+        """Scroll by a number of columns.
+
+        Args:
+            delta: Columns to move, negative to scroll left
+
+        """
+        self.scroll_to_column(self.scroll_column + delta)
+
+    def action_scroll_home(self) -> None:
+        """Scroll to the first row."""
+        self.scroll_to_row(0)
+
+    def action_scroll_end(self) -> None:
+        """Scroll to the last page."""
+        self.scroll_to_row(self.view_count)
+
+    def on_mouse_scroll_down(self, event: MouseScrollDown) -> None:
+        """Handle mouse wheel scrolling down."""
+        if self.virtual:
+            event.stop()
+            self.action_scroll_rows(3)
+
+    def on_mouse_scroll_up(self, event: MouseScrollUp) -> None:
+        """Handle mouse wheel scrolling up."""
+        if self.virtual:
+            event.stop()
+            self.action_scroll_rows(-3)
+
+    def on_mouse_scroll_left(self, event: MouseScrollLeft) -> None:
+        """Handle horizontal mouse wheel scrolling to the left."""
+        if self.virtual:
+            event.stop()
+            self.action_scroll_columns(-1)
+
+    def on_mouse_scroll_right(self, event: MouseScrollRight) -> None:
+        """Handle horizontal mouse wheel scrolling to the right."""
+        if self.virtual:
+            event.stop()
+            self.action_scroll_columns(1)
+
+    async def load_data(
+        self,
+        data: Sequence[Row],
+    ) -> None:
+        """Load table data.
+
+        The rows are converted into the columnar store; keys that are not
+        table columns are dropped.
+
+        Args:
+            data: List of data rows
+
+        Raises:
+            ValueError: If the primary keys of the rows are not unique.
+
+        """
+        self._reset_data(ColumnStore(self.columns, data))
+        self.refresh()
+        await self.emit_event("data_loaded", {"count": len(data)})
+
+    async def load_arrays(self, data: Mapping[str, object] | object) -> None:
+        """Load columns from NumPy arrays or typed buffers without copying.
+
+        Each column reads the given memory directly and converts a value to
+        a Python object only when it is shown, sorted on or aggregated, so
+        no row dicts are built. A column is copied into the table the first
+        time one of its rows is updated or appended to; until then the
+        arrays must not be changed.
+
+        Example:
+            >>> await table.load_arrays(np.load("samples.npy"))
+            >>> await table.load_arrays(
+            ...     {"host": Utf8Column(offsets, text), "cpu": cpu_buffer}
+            ... )
+
+        Args:
+            data: NumPy structured array, whose fields are the columns, or
+                mapping of column keys to NumPy arrays, 1-D buffers such as
+                ``memoryview`` objects, or ``BufferColumn`` and
+                ``Utf8Column`` adapters
+
+        Raises:
+            ValueError: If a buffer is unsupported, the columns differ in
+                length, or the primary keys are not unique.
+
+        """
+        store = ColumnStore(self.columns)
+        store.load_arrays(column_arrays(data))
+        self._reset_data(store)
+        self.refresh()
+        await self.emit_event("data_loaded", {"count": len(store)})
+
+    async def load_source(
+        self,
+        source: TableDataSource,
+        fetch_size: int = 100,
+        max_pages: int = 32,
+    ) -> None:
+        """Show rows fetched on demand from a data source.
+
+        Only the pages around the scroll window are fetched, the page after
+        it is prefetched, and at most ``max_pages`` pages are kept. Sorting
+        and filtering are passed to the source. Until ``load_data`` is called
+        again, rows cannot be appended, updated or deleted through the table.
+
+        Example:
+            >>> await table.load_source(SQLiteSource("metrics.db", "samples"))
+
+        Args:
+            source: Data source
+            fetch_size: Rows per fetched page
+            max_pages: Pages kept in memory
+
+        Raises:
+            ValueError: If the table is not in virtual mode.
+
+        """
+        if not self.virtual:
+            error_msg = "Data sources require a virtual table"
+            raise ValueError(error_msg)
+        self._reset_data(ColumnStore(self.columns))
+        self._paged = PagedRows(
+            source, fetch_size, max_pages, on_page=self._on_page_loaded
+        )
+        count = await self._paged.reset(self._source_sort(), self._filter.predicate)
+        await self._update_source_totals()
+        self.refresh()
+        await self.emit_event("data_loaded", {"count": count})
+
+    async def load_sqlite(
+        self,
+        data: Iterable[Row],
+        database: str | Path = ":memory:",
+        table: str = "rows",
+        fetch_size: int = 100,
+        max_pages: int = 32,
+    ) -> SQLiteTable:
+        """Load rows into SQLite and show them with query pushdown.
+
+        The schema is derived from the table columns. Sorting, filtering,
+        paging and footer aggregates run as SQL, with indexes created when a
+        sort or filter first needs them, so only the pages on screen are
+        held in Python.
+
+        Example:
+            >>> await table.load_sqlite(read_rows(), "metrics.db")
+
+        Args:
+            data: Data rows, inserted on a worker thread
+            database: Database path, or ":memory:"
+            table: Table name, created if it does not exist
+            fetch_size: Rows per fetched page
+            max_pages: Pages kept in memory
+
+        Returns:
+            SQLiteTable: Data source holding the rows
+
+        Raises:
+            ValueError: If the table is not in virtual mode.
+
+        """
+        if not self.virtual:
+            error_msg = "Data sources require a virtual table"
+            raise ValueError(error_msg)
+        source = SQLiteTable(self.columns, database, table)
+        await source.insert_rows(data)
+        await self.load_source(source, fetch_size, max_pages)
+        return source
+
+    async def _update_source_totals(self) -> None:
+        """Fetch the footer aggregates from a data source that computes them.
+
+        As for rows held by the table, the aggregates cover every row rather
+        than only those matching the filter.
+        """
+        self._source_totals = None
+        if (
+            self._paged is not None
+            and self._aggregates.active
+            and isinstance(self._paged.source, AggregateSource)
+        ):
+            self._source_totals = await self._paged.source.aggregate(
+                self._aggregates.kinds, None, self._aggregates.group_key
+            )
+
+    async def recount_source(self) -> int:
+        """Update the row count of a data source that grew.
+
+        Example:
+            >>> source = FileSource("export.csv", on_progress=lambda rows, done: (
+            ...     table.call_later(table.recount_source)))
+
+        Returns:
+            int: Number of rows shown
+
+        Raises:
+            RuntimeError: If the table does not show a data source.
+
+        """
+        if self._paged is None:
+            error_msg = "The table does not show a data source"
+            raise RuntimeError(error_msg)
+        count = await self._paged.recount()
+        await self._update_source_totals()
+        self.refresh()
+        return count
+
+    def _reset_data(self, store: ColumnStore) -> None:
+        """Replace the stored rows, keeping the sort, filter and indexes.
+
+        Args:
+            store: Column store holding the new rows
+
+        """
+        if self._paged is not None:
+            self._paged.close()
+            self._paged = None
+        self._source_totals = None
+        if self._sort_task is not None:
+            self._sort_task.cancel()
+            self._sort_task = None
+        self._shown = None
+        self.store = store
+        self._sort_index = SortIndex(self.store)
+        self._filter = self._filter.rebind(self.store, self._sort_index)
+        self.scroll_row = 0
+        self._row_cache.clear()
+        self._window_rows = []
+        self.selection = RowSelection()
+        self._anchor = None
+        self._highlights.clear()
+        self._widths.reset()
+        self._widths.add_rows(range(len(self.store)))
+        self._aggregates = TableAggregates(
+            self.store, self.columns, self._aggregates.group_key
+        )
+
+    def _on_page_loaded(self, page: int) -> None:
+        """Repaint when a fetched page arrives.
+
+        Args:
+            page: Page number
+
+        """
+        self.refresh()
+
+    def _source_sort(self) -> SortSpec:
+        """Get the sort passed to a data source, with the reversal applied.
+
+        Returns:
+            SortSpec: ``(key, descending)`` pairs in priority order
+
+        """
+        return tuple((key, desc != self.sort_reverse) for key, desc in self.sort_spec)
+
+    def _check_local(self) -> None:
+        """Ensure the rows are held by the table rather than a data source.
+
+        Raises:
+            RuntimeError: If the table shows a data source.
+
+        """
+        if self._paged is not None:
+            error_msg = "Rows of a data source cannot be changed through the table"
+            raise RuntimeError(error_msg)
+
+    async def append_rows(self, rows: Sequence[Row]) -> range:
+        """Append rows without reloading the table.
+
+        Args:
+            rows: Data rows
+
+        Returns:
+            range: Row keys assigned to the new rows
+
+        Raises:
+            RuntimeError: If the table shows a data source.
+
+        """
+        self._check_local()
+        start = len(self.store)
+        if not rows:
+            return range(start, start)
+        visible = self.view_count
+        self.store.append_rows(rows)
+        self._sort_index.rows_appended(range(start, len(self.store)))
+        self._filter.rows_appended(range(start, len(self.store)))
+        self._widths.add_rows(range(start, len(self.store)))
+        self._aggregates.rows_added(range(start, len(self.store)))
+
+        # Unsorted rows land at the end, so the view only changes when the
+        # window reaches past the previous last row.
+        if not self.virtual:
+            self.refresh(layout=True)
+        elif (
+            self.sort_spec
+            or self._show_footer()
+            or self.scroll_row + self.page_size > visible
+        ):
+            self.refresh()
+        await self.emit_event("rows_appended", {"count": len(rows)})
+        return range(start, len(self.store))
+
+    async def consume(
+        self,
+        source: AsyncIterable[Row],
+        batch_size: int = 1_000,
+        max_latency: float = 0.05,
+        max_pending: int | None = None,
+    ) -> int:
+        """Append rows from an async producer in batches.
+
+        Each batch is applied as a single ``append_rows`` call, so it causes
+        one refresh and one ``rows_appended`` event, and batches are applied
+        at most once per frame. Rows are buffered up to ``max_pending``; when
+        the table falls behind, the source is not pulled until it catches up.
+
+        Example:
+            >>> await table.consume(tail_log("app.log"), batch_size=500)
+
+        Args:
+            source: Async iterable of data rows
+            batch_size: Maximum number of rows per batch
+            max_latency: Maximum seconds a row waits before it is applied
+            max_pending: Rows buffered ahead of the table, defaults to four
+                batches
+
+        Returns:
+            int: Number of rows appended
+
+        """
+        loop = asyncio.get_running_loop()
+        total = 0
+        applied = 0.0
+        async for batch in batch_rows(source, batch_size, max_latency, max_pending):
+            delay = applied + FRAME_INTERVAL - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self.append_rows(batch)
+            applied = loop.time()
+            total += len(batch)
+        return total
+
+    async def update_rows(
+        self,
+        keys: Sequence[int],
+        changes: Row | Sequence[Row],
+    ) -> None:
+        """Update rows in place, repainting only the rows that changed.
+
+        Example:
+            >>> await table.update_rows([3, 7], {"status": "down"})
+
+        Args:
+            keys: Row keys, as returned by ``append_rows`` or the position
+                of the row in the data passed to ``load_data``
+            changes: New values for every row, or one mapping per row key
+
+        Raises:
+            ValueError: If the number of changes does not match the keys, or
+                a primary key changes to ``None`` or to the key of another
+                row.
+            IndexError: If a row key does not exist.
+            RuntimeError: If the table shows a data source.
+
+        """
+        keys = self._check_rows(keys)
+        if isinstance(changes, Mapping):
+            changes = [changes] * len(keys)
+        if len(changes) != len(keys):
+            error_msg = "Expected one change mapping per row key"
+            raise ValueError(error_msg)
+        # Nothing is changed unless the whole batch is valid.
+        self.store.check_updates(zip(keys, changes, strict=True))
+
+        previous: dict[int, dict[str, CellValue]] = {}
+        now = time.monotonic()
+        for row, change in zip(keys, changes, strict=True):
+            changed = self.store.update_row(row, change)
+            if changed:
+                self._highlights.changed(row, changed, self.store, now)
+                # Keep the oldest value when a row changes twice.
+                values = previous.setdefault(row, {})
+                values.update(
+                    (key, old) for key, old in changed.items() if key not in values
+                )
+        if not previous:
+            return
+        if self._highlights:
+            self._start_highlight_clock()
+
+        columns = set().union(*previous.values())
+        # Changes to columns scrolled out of view need no repaint.
+        dirty = [
+            (row, key)
+            for row, values in previous.items()
+            for key in values.keys() & self._visible_keys
+        ]
+        self._sort_index.invalidate(columns)
+        for row, values in previous.items():
+            self._aggregates.row_updated(row, values)
+        # Rows entering or leaving the filter shift the rows below them, and
+        # aggregated columns change the footer.
+        moved = self._filter.rows_updated(previous)
+        footer = self._show_footer() and not columns.isdisjoint(
+            {*self._aggregates.kinds, self._aggregates.group_key}
+        )
+        if moved or footer or columns.intersection(k for k, _ in self.sort_spec):
+            self.refresh()
+        else:
+            self._refresh_cells(dirty)
+        await self.emit_event("rows_updated", {"count": len(previous)})
+
+    async def upsert_rows(self, rows: Sequence[Row]) -> list[int]:
+        """Update rows by primary key, appending those with a new key.
+
+        Rows are found through the primary key index instead of a scan, so
+        the cost depends on the number of rows given rather than the table
+        size. Row keys stay valid across sorts and deletes. Rows with the
+        same key are merged in order.
+
+        Example:
+            >>> table = PepperTable(columns=[Column("id", "ID", primary_key=True)])
+            >>> await table.upsert_rows([{"id": 7, "status": "down"}])
+
+        Args:
+            rows: Data rows, each holding its primary key; columns a row
+                omits keep their value
+
+        Returns:
+            List[int]: Row key of each given row
+
+        Raises:
+            ValueError: If no column is the primary key, or a row has none.
+            RuntimeError: If the table shows a data source.
+
+        """
+        self._check_local()
+        primary_key = self.store.primary_key
+        if primary_key is None:
+            error_msg = "Upserts require a primary key column"
+            raise ValueError(error_msg)
+
+        updates: dict[int, Row] = {}
+        inserts: dict[CellValue, Row] = {}
+        for row in rows:
+            key = row.get(primary_key)
+            if key is None:
+                error_msg = f"Row without primary key '{primary_key}'"
+                raise ValueError(error_msg)
+            index = self.store.find(key)
+            if index is not None:
+                updates.setdefault(index, {}).update(row)
+            else:
+                inserts.setdefault(key, {}).update(row)
+
+        if updates:
+            await self.update_rows(list(updates), list(updates.values()))
+        await self.append_rows(list(inserts.values()))
+        return [self.store.key_index[row[primary_key]] for row in rows]
+
+    def find_row(self, key: CellValue) -> int | None:
+        """Get the row key of a primary key value.
+
+        Args:
+            key: Primary key value
+
+        Returns:
+            Optional[int]: Row key, ``None`` if no row has the primary key
+
+        """
+        return self.store.find(key)
+
+    async def delete_rows(self, keys: Sequence[int]) -> None:
+        """Delete rows without reloading the table.
+
+        Args:
+            keys: Row keys
+
+        Raises:
+            IndexError: If a row key does not exist.
+            ValueError: If a row key is given twice.
+            RuntimeError: If the table shows a data source.
+
+        """
+        removed = self.store.delete_rows(self._check_rows(keys))
+        if not removed:
+            return
+        self._sort_index.discard(removed)
+        self._filter.rows_deleted(removed)
+        self._aggregates.rows_removed(removed)
+        self.selection.difference_update(removed)
+        self._highlights.discard_rows(removed)
+        self.refresh(layout=not self.virtual)
+        await self.emit_event("rows_deleted", {"count": len(removed)})
+
+    def _check_rows(self, keys: Iterable[int]) -> list[int]:
+        """Validate row keys of the rows held by the table.
+
+        Args:
+            keys: Row keys
+
+        Returns:
+            List[int]: The row keys as ``int``
+
+        Raises:
+            IndexError: If a row key does not exist.
+            RuntimeError: If the table shows a data source.
+
+        """
+        self._check_local()
+        keys = list(map(operator.index, keys))
+        for key in keys:
+            if not 0 <= key < len(self.store) or self.store.is_deleted(key):
+                error_msg = f"Row {key} not found"
+                raise IndexError(error_msg)
+        return keys
+
+    async def _selection_changed(self, rows: Sequence[int] | None = None) -> None:
+        """Repaint the rows whose selection changed and emit an event.
+
+        Args:
+            rows: Row keys that changed, ``None`` to repaint every row
+
+        """
+        if rows is None:
+            self.refresh()
+        elif rows:
+            self._refresh_rows(rows)
+        else:
+            return
+        await self.emit_event("selection_changed", {"count": len(self.selection)})
+
+    async def select_rows(self, keys: Iterable[int], *, extend: bool = False) -> None:
+        """Select rows by key.
+
+        Example:
+            >>> await table.select_rows([table.find_row("web-1")], extend=True)
+
+        Args:
+            keys: Row keys
+            extend: Whether to keep the rows selected before
+
+        Raises:
+            IndexError: If a row key does not exist.
+            RuntimeError: If the table shows a data source.
+
+        """
+        keys = self._check_rows(keys)
+        if extend:
+            await self._selection_changed(self.selection.update(keys))
+            return
+        self.selection.clear()
+        self.selection.update(keys)
+        await self._selection_changed()
+
+    async def deselect_rows(self, keys: Iterable[int]) -> None:
+        """Deselect rows by key.
+
+        Args:
+            keys: Row keys
+
+        Raises:
+            IndexError: If a row key does not exist.
+            RuntimeError: If the table shows a data source.
+
+        """
+        keys = self._check_rows(keys)
+        await self._selection_changed(self.selection.difference_update(keys))
+
+    async def toggle_row(self, key: int) -> None:
+        """Select a row if it is not selected, deselect it otherwise.
+
+        Args:
+            key: Row key
+
+        Raises:
+            IndexError: If the row key does not exist.
+            RuntimeError: If the table shows a data source.
+
+        """
+        (key,) = self._check_rows((key,))
+        if not self.selection.discard(key):
+            self.selection.add(key)
+        await self._selection_changed([key])
+
+    async def select_range(
+        self,
+        start: int,
+        end: int,
+        *,
+        extend: bool = False,
+    ) -> None:
+        """Select the rows between two positions of the current view.
+
+        Args:
+            start: First position in the sorted and filtered view
+            end: Position after the last one
+            extend: Whether to keep the rows selected before
+
+        Raises:
+            RuntimeError: If the table shows a data source.
+
+        """
+        self._check_local()
+        rows = self._get_sorted_rows()
+        start, end = max(0, start), min(end, len(rows))
+        await self.select_rows(
+            (rows[position] for position in range(start, end)), extend=extend
+        )
+
+    async def select_all(self) -> None:
+        """Select every row in the view.
+
+        Without a filter this takes constant time; with one, the rows it
+        shows are selected.
+
+        Raises:
+            RuntimeError: If the table shows a data source.
+
+        """
+        self._check_local()
+        if self._filter.predicate is None:
+            self.selection.select_all(len(self.store), self.store.row_count)
+        else:
+            self.selection.clear()
+            self.selection.update(self._get_sorted_rows())
+        await self._selection_changed()
+
+    async def clear_selection(self) -> None:
+        """Deselect every row."""
+        if not self.selection:
+            return
+        self.selection.clear()
+        await self._selection_changed()
+
+    async def action_select_all(self) -> None:
+        """Select every row in the view."""
+        if self._paged is None:
+            await self.select_all()
+
+    async def action_clear_selection(self) -> None:
+        """Deselect every row."""
+        await self.clear_selection()
+
+    def selected_rows(self) -> Iterator[int]:
+        """Iterate over the keys of the selected rows in storage order.
+
+        The bitmap is read as the iteration advances, so bulk actions can
+        stream over a large selection in batches. Rows hidden by the filter
+        stay selected.
+
+        Example:
+            >>> rows = table.selected_rows()
+            >>> while batch := list(islice(rows, 10_000)):
+            ...     await table.update_rows(batch, {"acknowledged": True})
+
+        Returns:
+            Iterator[int]: Row keys
+
+        """
+        deleted = self.store.deleted
+        length = len(self.store)
+        for row in self.selection:
+            if row >= length:
+                return
+            if deleted is None or not deleted[row]:
+                yield row
+
+    async def on_click(self, event: Click) -> None:
+        """Select the clicked row; shift selects a range, ctrl toggles."""
+        if not self.virtual or self._paged is not None:
+            return
+        offset = event.get_content_offset(self)
+        if offset is None or offset.y < HEADER_HEIGHT:
+            return
+        line, separator = divmod(offset.y - HEADER_HEIGHT, 2)
+        if separator or line >= len(self._window_rows):
+            return
+        event.stop()
+        position = self.scroll_row + line
+        if event.shift and self._anchor is not None:
+            low, high = sorted((self._anchor, position))
+            await self.select_range(low, high + 1, extend=event.ctrl)
+            return
+        self._anchor = position
+        if event.ctrl:
+            await self.toggle_row(self._window_rows[line])
+        else:
+            await self.select_rows([self._window_rows[line]])
+
+    def _start_highlight_clock(self) -> None:
+        """Run the clock fading the highlights, shared by every cell."""
+        if self._highlight_clock is None:
+            self._highlight_clock = self.set_interval(
+                max(FRAME_INTERVAL, self._highlights.interval),
+                self._fade_highlights,
+            )
+        else:
+            self._highlight_clock.resume()
+
+    def _fade_highlights(self) -> None:
+        """Advance the highlight fade, repainting the highlighted cells."""
+        ended = self._highlights.expire(time.monotonic())
+        self._refresh_cells([*self._highlights.cells, *ended])
+        if not self._highlights and self._highlight_clock is not None:
+            self._highlight_clock.pause()
+
+    def _refresh_rows(self, rows: Sequence[int]) -> None:
+        """Repaint the lines of the given rows if they are on screen.
+
+        Args:
+            rows: Row keys whose content changed
+
+        """
+        if not self.virtual:
+            self.refresh()
+            return
+
+        dirty = set(rows)
+        width = self.content_size.width
+        regions = [
+            Region(0, HEADER_HEIGHT + 2 * position, width, 1)
+            for position, row in enumerate(self._window_rows)
+            if row in dirty
+        ]
+        if regions:
+            self.refresh(*regions)
+
+    def _column_spans(self) -> dict[str, tuple[int, int]] | None:
+        """Get where the cells of each rendered column are on a line.
+
+        The widths are laid out again from the last rendered table once per
+        render, the same way Rich laid them out when rendering it.
+
+        Returns:
+            Optional[Dict[str, Tuple[int, int]]]: Offset and width of the
+                cells by column key, ``None`` before the first render
+
+        """
+        if self._spans is None and self._rendered is not None:
+            table, columns = self._rendered
+            console = self.app.console
+            # Rich lays the cells out in the width left by the edges and the
+            # separators, and each cell follows one of them.
+            inner = self.content_size.width - len(columns) - 1
+            widths = table._calculate_column_widths(
+                console, console.options.update_width(inner)
+            )
+            spans = {}
+            offset = 1
+            for col, width in zip(columns, widths, strict=True):
+                spans[col.key] = (offset, width)
+                offset += width + 1
+            self._spans = spans
+        return self._spans
+
+    def _refresh_cells(self, cells: Iterable[tuple[int, str]]) -> None:
+        """Repaint the given cells if they are on screen.
+
+        Args:
+            cells: ``(row key, column key)`` of the cells whose content
+                changed
+
+        """
+        if not self.virtual:
+            self.refresh()
+            return
+
+        dirty: dict[int, set[str]] = {}
+        for row, key in cells:
+            dirty.setdefault(row, set()).add(key)
+        spans = self._column_spans()
+        if spans is None:
+            self._refresh_rows(list(dirty))
+            return
+        regions = []
+        for position, row in enumerate(self._window_rows):
+            for key in dirty.get(row, ()):
+                span = spans.get(key)
+                # Columns that were not rendered have no cells on screen.
+                if span is not None:
+                    offset, width = span
+                    y = HEADER_HEIGHT + 2 * position
+                    regions.append(Region(offset, y, width, 1))
+        if regions:
+            self.refresh(*regions)
+
+    async def filter_by(self, predicate: Predicate | None) -> None:
+        """Show only the rows matching a filter.
+
+        Applying a stricter version of the active filter, such as a longer
+        search text, only re-evaluates the rows it currently shows.
+
+        Example:
+            >>> await table.filter_by(Contains("host", "db") | Eq("role", "db"))
+
+        Args:
+            predicate: Filter predicate, ``None`` to show every row
+
+        Raises:
+            KeyError: If the predicate reads a column that does not exist.
+
+        """
+        for key in predicate.columns() if predicate is not None else ():
+            self.store.column(key)
+        count = self._filter.apply(predicate)
+        if self._paged is not None:
+            count = await self._paged.reset(self._source_sort(), predicate)
+        self.scroll_row = 0
+        self.refresh(layout=not self.virtual)
+        await self.emit_event("filtered", {"count": count})
+
+    def create_index(self, key: str, kind: IndexKind = "hash") -> None:
+        """Index a column to speed up filters on it.
+
+        Hash indexes serve ``Eq`` and sorted indexes serve ``Range``. Indexes
+        are built on first use and kept up to date as rows change.
+
+        Args:
+            key: Column key
+            kind: "hash" or "sorted"
+
+        Raises:
+            KeyError: If the key is not a table column.
+            ValueError: If the index kind is unknown.
+
+        """
+        self._filter.create_index(key, kind)
+
+    @property
+    def aggregates(self) -> TableAggregates:
+        """Get the column aggregates shown in the footer.
+
+        Returns:
+            TableAggregates: Aggregates over every row, and per group
+
+        """
+        return self._aggregates
+
+    async def group_by(self, key: str | None) -> None:
+        """Show footer subtotals for each value of a column.
+
+        Subtotals cover the columns declared with ``Column(aggregate=...)``
+        and are kept up to date as rows change. Data sources that compute
+        aggregates themselves, such as ``SQLiteTable``, are queried instead.
+
+        Example:
+            >>> await table.group_by("region")
+
+        Args:
+            key: Column key, ``None`` to show only the totals
+
+        Raises:
+            KeyError: If the key is not a table column.
+
+        """
+        self._aggregates = TableAggregates(self.store, self.columns, key)
+        await self._update_source_totals()
+        self.refresh(layout=True)
+        await self.emit_event("grouped", {"key": key})
+
+    async def sort_by(self, key: str | Sequence[str]) -> None:
+        """Sort table by one or more columns.
+
+        Values are compared by their stored type, so numbers sort numerically,
+        and nulls come last in either direction. Sorting again by the same
+        columns flips the direction of each. Large tables are sorted on a worker
+        thread and keep showing the previous order meanwhile; the new order is
+        applied, and the ``sorted`` event emitted, once it is ready. A newer
+        call cancels an older one that is still sorting, which then returns
+        without effect.
+
+        Example:
+            >>> await table.sort_by(["region", "-latency"])
+
+        Args:
+            key: Column key, or list of keys where a "-" prefix sorts
+                that column in descending order
+
+        """
+        spec = parse_sort_keys(key)
+        reverse = self.sort_spec == spec and not self.sort_reverse
+        if self._paged is None and not await self._prepare_sort(spec, reverse):
+            return
+        self.sort_spec = spec
+        self.sort_reverse = reverse
+        self.sort_key = spec[0][0] if spec else None
+        if self._paged is not None:
+            await self._paged.reset(self._source_sort(), self._filter.predicate)
+
+        self.refresh()
+        label = key if isinstance(key, str) else ",".join(key)
+        await self.emit_event("sorted", {"key": label, "reverse": self.sort_reverse})
+
+    async def _prepare_sort(self, spec: SortSpec, reverse: bool) -> bool:
+        """Make the permutation of a sort ready, cancelling an older sort.
+
+        Args:
+            spec: ``(key, descending)`` pairs in priority order
+            reverse: Whether the direction of every key is flipped
+
+        Returns:
+            bool: Whether the sort is ready, ``False`` if a newer sort
+                replaced it
+
+        """
+        if self._sort_task is not None:
+            self._sort_task.cancel()
+            self._sort_task = None
+        index = self._sort_index
+        ready = index.is_cached(spec, reverse=reverse)
+        if len(self.store) < BACKGROUND_SORT_ROWS or ready:
+            return True
+        task = self._sort_task = asyncio.create_task(
+            index.prepare(spec, reverse=reverse)
+        )
+        try:
+            await asyncio.wait({task})
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        if self._sort_task is not task:
+            return False
+        self._sort_task = None
+        task.result()
+        return True
+
+    def _sort_in_background(self) -> None:
+        """Start sorting by the current sort on a worker thread, if needed."""
+        if self._sort_task is not None and not self._sort_task.done():
+            return
+
+        async def sort() -> None:
+            try:
+                await self._sort_index.prepare(
+                    self.sort_spec, reverse=self.sort_reverse
+                )
+            except Exception:  # noqa: BLE001 - the next render tries again
+                logger.exception("Failed to sort table")
+                return
+            self.refresh()
+
+        self._sort_task = asyncio.create_task(sort())
+
+    async def export(
+        self,
+        path: str | Path,
+        file_format: ExportFormat | None = None,
+        *,
+        formatted: bool = False,
+        chunk_size: int = EXPORT_CHUNK,
+        progress: Progress | None = None,
+    ) -> int:
+        """Write the current sorted and filtered view to a file.
+
+        Rows are streamed in chunks, formatted and written on a worker
+        thread, so large exports neither block the interface nor copy the
+        table. The view is the one shown when the export starts; values
+        changed meanwhile are written as they are when their chunk is read.
+        Cancel the task running the export to stop it.
+
+        Example:
+            >>> await table.export("view.jsonl", progress=progress_bar)
+
+        Args:
+            path: Target file path
+            file_format: "csv", "jsonl" or "parquet", guessed from the
+                suffix if omitted
+            formatted: Whether to write cell text instead of stored values
+            chunk_size: Rows read and written per step
+            progress: Progress widget updated after each chunk
+
+        Returns:
+            int: Number of rows written
+
+        Raises:
+            ValueError: If the format is unknown.
+            ImportError: If Parquet is requested without pyarrow installed.
+
+        """
+        if self._paged is None and len(self.store) >= BACKGROUND_SORT_ROWS:
+            await self._sort_index.prepare(self.sort_spec, reverse=self.sort_reverse)
+        if self._paged is not None:
+            source = self._paged.source
+            sort, predicate = self._paged.sort, self._paged.predicate
+            total = await source.count(predicate)
+
+            async def read_chunk(start: int, end: int) -> Chunk:
+                rows = await source.fetch(start, end - start, sort, predicate)
+                return {
+                    col.key: [row.get(col.key) for row in rows] for col in self.columns
+                }
+
+            dtypes = None
+        else:
+            # The view positions are copied when the export starts, but the
+            # values are read chunk by chunk: rows updated meanwhile are
+            # written with their new values, unless the update replaced
+            # the column with a wider type.
+            order = copy.copy(self._get_sorted_rows())
+            arrays = dict(self.store.arrays)
+            total = len(order)
+
+            async def read_chunk(start: int, end: int) -> Chunk:
+                rows = order[start:end]
+                return {
+                    col.key: [arrays[col.key][row] for row in rows]
+                    for col in self.columns
+                }
+
+            dtypes = {key: column.dtype for key, column in arrays.items()}
+
+        count = await export_view(
+            path,
+            self.columns,
+            total,
+            read_chunk,
+            file_format=file_format,
+            dtypes=dtypes,
+            formatted=formatted,
+            chunk_size=chunk_size,
+            progress=progress,
+        )
+        await self.emit_event("exported", {"path": str(path), "count": count})
+        return count
+
+    def _get_sorted_rows(self) -> Sequence[int]:
+        """Get store row indexes in display order.
+
+        Sort permutations are cached per sort specification, so re-renders
+        and direction changes do not re-sort the data. Filtered views are
+        cached the same way until the filter or its rows change.
+
+        When rows changed in a large table, the sort is redone on a worker
+        thread; meanwhile the rows keep their previous order, or their
+        storage order if the filter or sort changed since.
+
+        Returns:
+            Sequence[int]: Sorted row indexes
+
+        """
+        spec = self.sort_spec
+        state = (self.store, self._filter.predicate, spec, self.sort_reverse)
+        if (
+            spec
+            and len(self.store) >= BACKGROUND_SORT_ROWS
+            and not self._sort_index.is_cached(spec, reverse=self.sort_reverse)
+        ):
+            self._sort_in_background()
+            if self._shown is not None and self._shown[0] == state:
+                return self._shown[1]
+            spec = ()
+
+        if self._filter.active:
+            rows = self._filter.view(spec, self.sort_reverse)
+        elif not spec:
+            rows = self.store.live_rows()
+        else:
+            rows = self._sort_index.order(spec, reverse=self.sort_reverse)
+        if spec:
+            self._shown = (state, rows)
+        return rows
+
+    def _get_sorted_data(self) -> RowsView:
+        """Get sorted data rows.
+
+        Returns:
+            RowsView: Sorted rows materialized on access
+
+        """
+        return self.store.rows(self._get_sorted_rows())
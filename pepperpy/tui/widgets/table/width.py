@@ -0,0 +1,151 @@
+"""Sampled column width measurement for table widgets.
+
+Rich sizes columns without a fixed width by measuring every cell, so layout
+cost grows with the table. ``ColumnWidths`` measures a bounded sample
+instead: the column labels, the rows on screen and a reservoir sample of all
+rows. Widths only grow, so columns do not jitter while scrolling.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from typing import TYPE_CHECKING
+
+from rich.cells import cell_len
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Sequence
+
+    from .column import Column
+
+
+class ColumnWidths:
+    """Grow-only column widths measured over a sample of the rows.
+
+    The sample is a uniform reservoir over every row added, maintained with
+    Li's algorithm L, so adding rows costs time proportional to the number
+    of sample replacements rather than to the number of rows.
+
+    Example:
+        >>> widths = ColumnWidths(sample_size=128)
+        >>> widths.add_rows(range(len(store)))
+        >>> widths.measure(columns, visible_cells, format_row)
+
+    Attributes:
+        sample_size (int): Rows kept in the reservoir sample
+        widths (Dict[str, int]): Measured width by column key
+
+    """
+
+    def __init__(self, sample_size: int = 256, seed: int | None = None) -> None:
+        """Initialize the width cache.
+
+        Args:
+            sample_size: Rows kept in the reservoir sample
+            seed: Seed of the sampling random generator
+
+        """
+        self.sample_size = max(0, sample_size)
+        self.widths: dict[str, int] = {}
+        self.sample: list[int] = []
+        self._random = random.Random(seed)
+        self._pending: list[int] = []
+        self._seen = 0
+        self._weight = 1.0
+        self._next = 0
+
+    def reset(self) -> None:
+        """Forget the widths and the sample, e.g. when new data is loaded."""
+        self.widths.clear()
+        self.sample.clear()
+        self._pending.clear()
+        self._seen = 0
+        self._weight = 1.0
+        self._next = 0
+
+    def add_rows(self, rows: Sequence[int]) -> None:
+        """Offer new rows to the reservoir sample.
+
+        Args:
+            rows: Indexes of the added rows
+
+        """
+        if not self.sample_size:
+            return
+        end = self._seen + len(rows)
+        position = self._seen
+        while position < end and len(self.sample) < self.sample_size:
+            self._keep(len(self.sample), rows[position - self._seen])
+            position += 1
+            if len(self.sample) == self.sample_size:
+                self._weight = self._draw_weight()
+                self._next = position + self._skip()
+        while len(self.sample) == self.sample_size and self._next < end:
+            slot = self._random.randrange(self.sample_size)
+            self._keep(slot, rows[self._next - self._seen])
+            self._weight *= self._draw_weight()
+            self._next += 1 + self._skip()
+        self._seen = end
+
+    def _keep(self, slot: int, row: int) -> None:
+        """Put a row in a sample slot and queue it for measurement."""
+        if slot == len(self.sample):
+            self.sample.append(row)
+        else:
+            self.sample[slot] = row
+        self._pending.append(row)
+
+    def _draw_weight(self) -> float:
+        """Draw the weight factor of algorithm L."""
+        return math.exp(math.log(1.0 - self._random.random()) / self.sample_size)
+
+    def _skip(self) -> int:
+        """Draw how many rows to pass over before the next replacement."""
+        if self._weight >= 1.0:
+            return 0
+        draw = math.log(1.0 - self._random.random())
+        return int(draw / math.log(1.0 - self._weight))
+
+    def measure(
+        self,
+        columns: Sequence[Column],
+        cells: Iterable[Sequence[str]],
+        format_row: Callable[[int], Sequence[str] | None] | None = None,
+    ) -> dict[str, int]:
+        """Grow the widths to fit the labels, the given cells and the sample.
+
+        Sampled rows are formatted and measured once, when they enter the
+        sample, or when a column is measured for the first time, such as a
+        column scrolled into view; the given cells, normally the rows on
+        screen, are measured on every call.
+
+        Args:
+            columns: Table columns
+            cells: Formatted rows to fit, in column order
+            format_row: Formats a sampled row, or returns ``None`` if it no
+                longer exists
+
+        Returns:
+            Dict[str, int]: Width by column key
+
+        """
+        widths = self.widths
+        unmeasured = any(col.key not in widths for col in columns)
+        for col in columns:
+            widths[col.key] = max(widths.get(col.key, 0), cell_len(col.label))
+
+        rows: list[Sequence[str]] = list(cells)
+        if format_row is not None:
+            sampled = self.sample if unmeasured else ()
+            for row in dict.fromkeys([*self._pending, *sampled]):
+                formatted = format_row(row)
+                if formatted is not None:
+                    rows.append(formatted)
+        self._pending.clear()
+
+        for index, col in enumerate(columns):
+            width = max((cell_len(row[index]) for row in rows), default=0)
+            if width > widths[col.key]:
+                widths[col.key] = width
+        return widths
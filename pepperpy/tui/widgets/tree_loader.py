@@ -0,0 +1,182 @@
+"""Async child loading for virtual tree views.
+
+Rows whose data is ``DEFERRED`` get their children from a
+``TreeDataProvider``, such as a filesystem walk, a database query or a
+process table. ``ChildLoader`` starts a load when such a row expands, runs
+at most a fixed number of loads at once, cancels the load of a row that is
+collapsed before it finishes and keeps the most recently collapsed subtrees,
+so that expanding them again does not reload them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Protocol, runtime_checkable
+
+import structlog
+
+from .tree_model import build_rows
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+    from .tree_model import TreeRow
+    from .tree_view import NodeData
+
+logger = structlog.get_logger(__name__)
+
+
+@runtime_checkable
+class TreeDataProvider(Protocol):
+    """Protocol for tree children fetched on demand."""
+
+    async def load_children(
+        self,
+        path: Sequence[str],
+    ) -> dict[str, NodeData] | list[NodeData]:
+        """Fetch the children of a node.
+
+        Children that have children of their own to fetch are given the
+        ``DEFERRED`` data value.
+
+        Args:
+            path: Labels from the root down to the node
+
+        Returns:
+            Union[Dict, List]: Tree data of the children
+
+        """
+        ...
+
+
+class ChildLoader:
+    """Concurrency-limited loader of deferred tree children.
+
+    Example:
+        >>> loader = ChildLoader(FileSystemProvider(), on_load=tree.loaded)
+        >>> loader.request(row)
+
+    Attributes:
+        provider (TreeDataProvider): Source of the children
+        max_loads (int): Loads running at once
+        cache_size (int): Collapsed subtrees kept in memory
+        on_load (Optional[Callable]): Called with the row and its child rows
+            when a load finishes, or with ``None`` when it failed
+
+    """
+
+    def __init__(
+        self,
+        provider: TreeDataProvider,
+        max_loads: int = 4,
+        cache_size: int = 64,
+        on_load: Callable[[TreeRow, list[TreeRow] | None], None] | None = None,
+    ) -> None:
+        """Initialize the loader.
+
+        Args:
+            provider: Source of the children
+            max_loads: Loads running at once
+            cache_size: Collapsed subtrees kept in memory
+            on_load: Called when a load finishes
+
+        """
+        self.provider = provider
+        self.max_loads = max(1, max_loads)
+        self.cache_size = max(0, cache_size)
+        self.on_load = on_load
+        self._slots = asyncio.Semaphore(self.max_loads)
+        self._pending: dict[TreeRow, asyncio.Task[None]] = {}
+        self._subtrees: OrderedDict[tuple[str, ...], list[TreeRow]] = OrderedDict()
+
+    def is_loading(self, row: TreeRow) -> bool:
+        """Check whether the children of a row are being loaded.
+
+        Args:
+            row: Deferred row
+
+        Returns:
+            bool: Whether a load is pending or running
+
+        """
+        return row in self._pending
+
+    def request(self, row: TreeRow) -> None:
+        """Start loading the children of a row unless already loading.
+
+        Args:
+            row: Deferred row
+
+        """
+        if row not in self._pending:
+            self._pending[row] = asyncio.create_task(self._load(row))
+
+    async def _load(self, row: TreeRow) -> None:
+        """Fetch the children of a row once a load slot is free."""
+        try:
+            async with self._slots:
+                data = await self.provider.load_children(tuple(row.path))
+            children: list[TreeRow] | None = build_rows(data, row.level + 1, row)
+        except asyncio.CancelledError:
+            raise
+        except Exception:  # noqa: BLE001 - the row is loaded again on expand
+            logger.exception("Failed to load tree children", path=row.path)
+            children = None
+        finally:
+            if self._pending.get(row) is asyncio.current_task():
+                del self._pending[row]
+        if self.on_load is not None:
+            self.on_load(row, children)
+
+    def cancel(self, row: TreeRow) -> None:
+        """Cancel the load of a row's children, if any.
+
+        Args:
+            row: Deferred row
+
+        """
+        task = self._pending.pop(row, None)
+        if task is not None:
+            task.cancel()
+
+    def store(self, row: TreeRow, children: list[TreeRow]) -> None:
+        """Keep the loaded children of a collapsed row.
+
+        The least recently stored subtree is dropped when the cache is full.
+
+        Args:
+            row: Collapsed row
+            children: Its detached child rows
+
+        """
+        if not self.cache_size:
+            return
+        key = tuple(row.path)
+        self._subtrees[key] = children
+        self._subtrees.move_to_end(key)
+        while len(self._subtrees) > self.cache_size:
+            self._subtrees.popitem(last=False)
+
+    def take(self, row: TreeRow) -> list[TreeRow] | None:
+        """Remove and return the cached children of a row.
+
+        Args:
+            row: Deferred row
+
+        Returns:
+            Optional[List[TreeRow]]: Cached child rows, ``None`` on a miss
+
+        """
+        children = self._subtrees.pop(tuple(row.path), None)
+        # The row may have been created again since its children were kept.
+        for child in children or ():
+            child.parent = row
+        return children
+
+    def close(self) -> None:
+        """Cancel pending loads and drop cached subtrees."""
+        for task in self._pending.values():
+            task.cancel()
+        self._pending.clear()
+        self._subtrees.clear()
@@ -0,0 +1,533 @@
+"""Flattened row model for virtual tree views.
+
+Tree data is wrapped in lightweight ``TreeRow`` records instead of widgets.
+The visible rows, meaning every root and every row whose ancestors are all
+expanded, are addressed by their position in display order without keeping
+them in a list: every row counts the visible rows of its subtree, and every
+row with children keeps a Fenwick tree over the counts of its children.
+Expanding or collapsing a row then only updates the counts along its
+ancestors, and mapping a position to a row or a row to its position walks
+down or up the tree, each taking logarithmic time per level.
+
+Like ``TreeNode``, a row keeps its raw data and only creates its child rows
+the first time it is expanded. A row whose data is ``DEFERRED`` gets its
+children from an async provider instead, see ``ChildLoader``; until they
+arrive it shows a single loading placeholder.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from .tree_view import NodeData
+
+# Label of the placeholder row shown while children are loading.
+LOADING_LABEL = "Loading…"
+
+
+class Deferred:
+    """Marker data value of rows whose children are not in the data."""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str) -> None:
+        """Initialize the marker.
+
+        Args:
+            name: Marker name, used as its representation
+
+        """
+        self.name = name
+
+    def __repr__(self) -> str:
+        """Get the marker name."""
+        return self.name
+
+
+# Data of a node whose children are loaded on demand.
+DEFERRED = Deferred("DEFERRED")
+
+# Data of the placeholder row of a node whose children are loading.
+LOADING = Deferred("LOADING")
+
+
+class VisibleCounts:
+    """Fenwick tree over the visible row counts of sibling rows.
+
+    Example:
+        >>> counts = VisibleCounts([1, 1, 1])
+        >>> counts.add(1, 4)
+        >>> counts.prefix(2), counts.search(5)
+        (6, (1, 4))
+
+    """
+
+    __slots__ = ("_tree", "total")
+
+    def __init__(self, counts: list[int]) -> None:
+        """Build the tree in linear time.
+
+        Args:
+            counts: Visible row count of each sibling
+
+        """
+        tree = [0, *counts]
+        size = len(tree)
+        for index in range(1, size):
+            parent = index + (index & -index)
+            if parent < size:
+                tree[parent] += tree[index]
+        self._tree = tree
+        self.total = sum(counts)
+
+    def __len__(self) -> int:
+        """Get the number of siblings."""
+        return len(self._tree) - 1
+
+    def add(self, index: int, delta: int) -> None:
+        """Change the count of a sibling.
+
+        Args:
+            index: Sibling index
+            delta: Change of its count
+
+        """
+        tree = self._tree
+        index += 1
+        while index < len(tree):
+            tree[index] += delta
+            index += index & -index
+        self.total += delta
+
+    def prefix(self, index: int) -> int:
+        """Get the sum of the counts of the siblings before an index.
+
+        Args:
+            index: Sibling index
+
+        Returns:
+            int: Rows shown before the sibling
+
+        """
+        tree = self._tree
+        total = 0
+        while index > 0:
+            total += tree[index]
+            index -= index & -index
+        return total
+
+    def search(self, offset: int) -> tuple[int, int]:
+        """Find the sibling whose rows contain an offset.
+
+        Args:
+            offset: Row offset from the first sibling, below ``total``
+
+        Returns:
+            Tuple[int, int]: Sibling index and offset inside its rows
+
+        """
+        tree = self._tree
+        index = 0
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            following = index + step
+            if following < len(tree) and tree[following] <= offset:
+                index = following
+                offset -= tree[following]
+            step >>= 1
+        return index, offset
+
+
+class TreeRow:
+    """One node of a virtual tree.
+
+    Attributes:
+        label (str): Node label
+        data (Any): Node value, the source of the children when it is a
+            ``dict`` or ``list``, or a ``Deferred`` marker
+        level (int): Depth below the roots
+        parent (Optional[TreeRow]): Parent row, ``None`` for roots
+        index (int): Position among its siblings
+        is_expanded (bool): Whether the children are shown
+        visible (int): Rows shown for the subtree while the row is visible,
+            the row included
+
+    """
+
+    __slots__ = (
+        "_children",
+        "_counts",
+        "data",
+        "index",
+        "is_expanded",
+        "label",
+        "level",
+        "parent",
+        "visible",
+    )
+
+    def __init__(
+        self,
+        label: str,
+        data: NodeData | Deferred = None,
+        level: int = 0,
+        parent: TreeRow | None = None,
+        index: int = 0,
+    ) -> None:
+        """Initialize a collapsed row.
+
+        Args:
+            label: Node label
+            data: Node value
+            level: Depth below the roots
+            parent: Parent row
+            index: Position among its siblings
+
+        """
+        self.label = label
+        self.data = data
+        self.level = level
+        self.parent = parent
+        self.index = index
+        self.is_expanded = False
+        self.visible = 1
+        self._children: list[TreeRow] | None = None
+        self._counts: VisibleCounts | None = None
+
+    def _materialize(self) -> tuple[list[TreeRow], VisibleCounts]:
+        """Create the child rows and their counts from the data.
+
+        A deferred row gets a loading placeholder as its only child.
+
+        Returns:
+            Tuple[List[TreeRow], VisibleCounts]: New child rows and counts
+
+        """
+        data = self.data
+        if data is DEFERRED:
+            children = [TreeRow(LOADING_LABEL, LOADING, self.level + 1, self)]
+        elif isinstance(data, dict | list):
+            children = build_rows(data, self.level + 1, self)
+        else:
+            children = []
+        counts = VisibleCounts([1] * len(children))
+        self._children = children
+        self._counts = counts
+        return children, counts
+
+    @property
+    def children(self) -> list[TreeRow]:
+        """Get the child rows, creating them from the data on first access."""
+        children = self._children
+        if children is None:
+            children, _ = self._materialize()
+        return children
+
+    @property
+    def counts(self) -> VisibleCounts:
+        """Get the visible row counts of the children, created with them."""
+        counts = self._counts
+        if counts is None:
+            _, counts = self._materialize()
+        return counts
+
+    @property
+    def has_children(self) -> bool:
+        """Check whether the row has children, without creating them."""
+        if self._children is not None:
+            return bool(self._children)
+        if self.data is DEFERRED:
+            return True
+        return isinstance(self.data, dict | list) and bool(self.data)
+
+    @property
+    def loading(self) -> bool:
+        """Check whether the children are a loading placeholder."""
+        children = self._children
+        return children is not None and bool(children) and children[0].data is LOADING
+
+    @property
+    def path(self) -> list[str]:
+        """Get the labels from the root down to this row."""
+        labels = []
+        row: TreeRow | None = self
+        while row is not None:
+            labels.append(row.label)
+            row = row.parent
+        return labels[::-1]
+
+
+def build_rows(
+    data: dict[str, NodeData] | list[NodeData],
+    level: int = 0,
+    parent: TreeRow | None = None,
+) -> list[TreeRow]:
+    """Create the rows of one level of tree data.
+
+    Args:
+        data: Mapping or list whose items become rows
+        level: Depth of the rows
+        parent: Parent of the rows
+
+    Returns:
+        List[TreeRow]: One row per item
+
+    """
+    if isinstance(data, dict):
+        items = data.items()
+    else:
+        items = ((str(i), item) for i, item in enumerate(data))
+    return [
+        TreeRow(key, value, level, parent, index)
+        for index, (key, value) in enumerate(items)
+    ]
+
+
+class FlatTree:
+    """Visible rows of a tree in display order.
+
+    The roots hang from a hidden, always expanded root row, so that every
+    level is counted the same way.
+
+    Example:
+        >>> tree = FlatTree({"a": {"b": 1}, "c": 2})
+        >>> tree.expand(tree[0])
+        >>> [row.label for row in tree.window(0, 10)]
+        ['a', 'b', 'c']
+
+    Attributes:
+        roots (List[TreeRow]): Top level rows
+
+    """
+
+    def __init__(self, data: dict[str, NodeData] | list[NodeData]) -> None:
+        """Initialize the model with every root collapsed.
+
+        Args:
+            data: Tree data
+
+        """
+        self.roots = build_rows(data)
+        self._root = TreeRow("", data, level=-1)
+        self._root._children = self.roots
+        self._root._counts = VisibleCounts([1] * len(self.roots))
+        self._root.is_expanded = True
+        self._root.visible += len(self.roots)
+
+    def __len__(self) -> int:
+        """Get the number of visible rows."""
+        return self._root.visible - 1
+
+    def _parent(self, row: TreeRow) -> TreeRow:
+        """Get the parent of a row, the hidden root for the roots."""
+        return self._root if row.parent is None else row.parent
+
+    def __getitem__(self, position: int) -> TreeRow:
+        """Get the visible row at a position.
+
+        Args:
+            position: Position in display order, negative from the end
+
+        Returns:
+            TreeRow: Row at the position
+
+        Raises:
+            IndexError: If the position is out of range.
+
+        """
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            error_msg = f"Row position {position} out of range"
+            raise IndexError(error_msg)
+        row = self._root
+        while True:
+            index, position = row.counts.search(position)
+            row = row.children[index]
+            if not position:
+                return row
+            position -= 1
+
+    def _next(self, row: TreeRow) -> TreeRow | None:
+        """Get the visible row following a visible row."""
+        if row.is_expanded and row.children:
+            return row.children[0]
+        while row is not self._root:
+            parent = self._parent(row)
+            if row.index + 1 < len(parent.children):
+                return parent.children[row.index + 1]
+            row = parent
+        return None
+
+    def iter_from(self, position: int) -> Iterator[TreeRow]:
+        """Iterate over the visible rows from a position on.
+
+        Args:
+            position: Position of the first row
+
+        Yields:
+            TreeRow: Rows in display order
+
+        """
+        if not 0 <= position < len(self):
+            return
+        row: TreeRow | None = self[position]
+        while row is not None:
+            yield row
+            row = self._next(row)
+
+    def window(self, start: int, end: int) -> list[TreeRow]:
+        """Get the visible rows between two positions.
+
+        Args:
+            start: First position
+            end: Position after the last one
+
+        Returns:
+            List[TreeRow]: Rows in display order
+
+        """
+        start = max(0, start)
+        rows: list[TreeRow] = []
+        for row in self.iter_from(start):
+            if len(rows) >= end - start:
+                break
+            rows.append(row)
+        return rows
+
+    def index(self, row: TreeRow) -> int:
+        """Get the position of a visible row.
+
+        Args:
+            row: Visible row
+
+        Returns:
+            int: Position in display order
+
+        Raises:
+            ValueError: If the row is not visible.
+
+        """
+        position = -1
+        while row is not self._root:
+            parent = self._parent(row)
+            if not parent.is_expanded:
+                error_msg = f"Row '{row.label}' is not visible"
+                raise ValueError(error_msg)
+            position += 1 + parent.counts.prefix(row.index)
+            row = parent
+        return position
+
+    def _propagate(self, row: TreeRow, delta: int) -> int:
+        """Add a change of the rows shown below a row to its ancestors.
+
+        Args:
+            row: Row whose subtree count changed by ``delta``
+            delta: Change of the count
+
+        Returns:
+            int: Change in the number of visible rows, 0 when an ancestor
+            is collapsed
+
+        """
+        row.visible += delta
+        while row is not self._root:
+            parent = self._parent(row)
+            parent.counts.add(row.index, delta)
+            if not parent.is_expanded:
+                return 0
+            parent.visible += delta
+            row = parent
+        return delta
+
+    def expand(self, row: TreeRow) -> int:
+        """Expand a row, showing its expanded descendants.
+
+        Args:
+            row: Row to expand
+
+        Returns:
+            int: Number of rows shown
+
+        """
+        if row.is_expanded or not row.has_children:
+            return 0
+        row.is_expanded = True
+        return self._propagate(row, row.counts.total)
+
+    def collapse(self, row: TreeRow) -> int:
+        """Collapse a row, hiding its descendants.
+
+        Args:
+            row: Row to collapse
+
+        Returns:
+            int: Number of rows hidden
+
+        """
+        if not row.is_expanded:
+            return 0
+        row.is_expanded = False
+        return -self._propagate(row, -row.counts.total)
+
+    def set_children(self, row: TreeRow, children: list[TreeRow]) -> int:
+        """Replace the child rows of a row, such as its loading placeholder.
+
+        Args:
+            row: Parent row
+            children: New child rows, whose parent must be ``row``
+
+        Returns:
+            int: Change in the number of visible rows
+
+        """
+        previous = row.counts.total
+        for index, child in enumerate(children):
+            child.index = index
+        row._children = children
+        row._counts = VisibleCounts([child.visible for child in children])
+        if not row.is_expanded:
+            return 0
+        return self._propagate(row, row._counts.total - previous)
+
+    def release_children(self, row: TreeRow) -> list[TreeRow] | None:
+        """Detach the child rows of a collapsed row.
+
+        The children are created again from the data, or loaded again for a
+        deferred row, the next time the row expands.
+
+        Args:
+            row: Collapsed row
+
+        Returns:
+            Optional[List[TreeRow]]: Detached children, ``None`` when they
+            were not created
+
+        Raises:
+            ValueError: If the row is expanded.
+
+        """
+        if row.is_expanded:
+            error_msg = f"Cannot release the children of expanded row '{row.label}'"
+            raise ValueError(error_msg)
+        children = row._children
+        row._children = None
+        row._counts = None
+        return children
+
+    def toggle(self, row: TreeRow) -> int:
+        """Expand a collapsed row or collapse an expanded one.
+
+        Args:
+            row: Row to toggle
+
+        Returns:
+            int: Change in the number of visible rows
+
+        """
+        if row.is_expanded:
+            return -self.collapse(row)
+        return self.expand(row)
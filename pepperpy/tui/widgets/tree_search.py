@@ -0,0 +1,313 @@
+"""Label and path search over tree data.
+
+``TreeIndex`` numbers every node of the tree data in display order and
+keeps, per node, its parent and its position among its siblings. The
+lowercase labels are joined into one newline-separated text, so that a
+query becomes a single regular expression scanned by the ``re`` engine in C
+instead of a Python loop over the nodes: every pattern consumes the rest of
+the line after its match, which makes the number of matches the number of
+matching nodes. A match is mapped back to its node by bisecting the label
+offsets.
+
+A query containing ``/`` is a path: the last segment is matched against the
+labels and the other segments must equal the labels of the nearest
+ancestors, from the root when the query starts with ``/``.
+"""
+
+from __future__ import annotations
+
+import re
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import accumulate, chain
+from typing import TYPE_CHECKING, Literal
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from .tree_view import NodeData
+
+SearchMode = Literal["prefix", "substring", "fuzzy"]
+
+# Separator of the segments of a path query.
+PATH_SEPARATOR = "/"
+
+# Rest of the line after a match, with an empty group so that ``findall``
+# returns shared empty strings instead of copies of the lines.
+_LINE_REST = r"[^\n]*()"
+
+
+@dataclass
+class SearchResult:
+    """Nodes matching a query.
+
+    Attributes:
+        query (str): Searched text
+        mode (SearchMode): How labels are matched
+        count (int): Number of matching nodes
+        nodes (List[int]): First matching nodes in display order
+
+    """
+
+    query: str
+    mode: SearchMode
+    count: int = 0
+    nodes: list[int] = field(default_factory=list)
+
+
+@lru_cache(maxsize=32)
+def _compile(text: str, mode: SearchMode) -> re.Pattern[str]:
+    """Compile the pattern matching the lowercase label text of a query.
+
+    Args:
+        text: Lowercase label query, without newlines
+        mode: How labels are matched
+
+    Returns:
+        Pattern: Pattern consuming the matching lines
+
+    """
+    if mode == "prefix":
+        core = "\n" + re.escape(text)
+    elif mode == "fuzzy":
+        # Each character is looked for after the previous one; excluding it
+        # from the gap makes the first occurrence match, without backtracking.
+        core = re.escape(text[0]) + "".join(
+            f"[^\n{re.escape(char)}]*{re.escape(char)}" for char in text[1:]
+        )
+    else:
+        core = re.escape(text)
+    return re.compile(core + _LINE_REST)
+
+
+def _items(
+    data: dict[str, NodeData] | list[NodeData],
+) -> Iterable[tuple[str, NodeData]]:
+    """Get the labels and values of the children in tree data."""
+    if isinstance(data, dict):
+        return data.items()
+    return ((str(i), item) for i, item in enumerate(data))
+
+
+class TreeIndex:
+    """Search index of the labels and paths of tree data.
+
+    Example:
+        >>> index = TreeIndex.build({"config": {"server": {"port": 80}}})
+        >>> index.search("config/serv", "prefix").nodes
+        [1]
+        >>> index.path(1)
+        ['config', 'server']
+
+    Attributes:
+        labels (List[str]): Label of each node
+        parents (array): Parent of each node, -1 for roots
+        positions (array): Position of each node among its siblings
+        text (str): Lowercase labels, one per line between newlines
+        starts (array): Offset of each label in ``text``, followed by the
+            length of ``text`` plus one
+
+    """
+
+    def __init__(
+        self,
+        labels: list[str],
+        parents: array[int],
+        positions: array[int],
+    ) -> None:
+        """Index nodes given in display order.
+
+        Args:
+            labels: Label of each node
+            parents: Parent of each node, -1 for roots
+            positions: Position of each node among its siblings
+
+        """
+        self.labels = labels
+        self.parents = parents
+        self.positions = positions
+        lowered = [label.lower().replace("\n", " ") for label in labels]
+        self.text = "\n" + "\n".join(lowered) + "\n"
+        self.starts = array(
+            "q", accumulate(chain((1,), (len(label) + 1 for label in lowered)))
+        )
+
+    @classmethod
+    def build(cls, data: dict[str, NodeData] | list[NodeData]) -> TreeIndex:
+        """Index every node of tree data.
+
+        This walks the whole tree, so it is meant to run in a worker thread.
+
+        Args:
+            data: Tree data
+
+        Returns:
+            TreeIndex: Index of the nodes in display order
+
+        """
+        labels: list[str] = []
+        parents = array("q")
+        positions = array("q")
+        stack: list[tuple[int, Iterator[tuple[int, tuple[str, NodeData]]]]] = [
+            (-1, enumerate(_items(data)))
+        ]
+        while stack:
+            parent, items = stack[-1]
+            item = next(items, None)
+            if item is None:
+                stack.pop()
+                continue
+            position, (label, value) = item
+            node = len(labels)
+            labels.append(label)
+            parents.append(parent)
+            positions.append(position)
+            if isinstance(value, dict | list) and value:
+                stack.append((node, enumerate(_items(value))))
+        return cls(labels, parents, positions)
+
+    def __len__(self) -> int:
+        """Get the number of indexed nodes."""
+        return len(self.labels)
+
+    def path(self, node: int) -> list[str]:
+        """Get the labels from the root down to a node.
+
+        Args:
+            node: Node number
+
+        Returns:
+            List[str]: Labels of the ancestors and of the node
+
+        """
+        labels = []
+        while node >= 0:
+            labels.append(self.labels[node])
+            node = self.parents[node]
+        return labels[::-1]
+
+    def route(self, node: int) -> list[int]:
+        """Get the sibling positions leading from the roots to a node.
+
+        Args:
+            node: Node number
+
+        Returns:
+            List[int]: Position among its siblings of each ancestor and of
+            the node
+
+        """
+        route = []
+        while node >= 0:
+            route.append(self.positions[node])
+            node = self.parents[node]
+        return route[::-1]
+
+    def _parse(self, query: str) -> tuple[str, list[str], bool]:
+        """Split a query into its label part and its ancestor labels."""
+        query = query.lower().replace("\n", " ")
+        if PATH_SEPARATOR not in query:
+            return query, [], False
+        *ancestors, label = query.split(PATH_SEPARATOR)
+        anchored = bool(ancestors) and not ancestors[0]
+        return label, ancestors[1:] if anchored else ancestors, anchored
+
+    def _under(self, node: int, ancestors: list[str], anchored: bool) -> bool:
+        """Check whether the nearest ancestors of a node have given labels."""
+        text = self.text
+        starts = self.starts
+        parent = self.parents[node]
+        for label in reversed(ancestors):
+            if parent < 0 or text[starts[parent] : starts[parent + 1] - 1] != label:
+                return False
+            parent = self.parents[parent]
+        return not anchored or parent < 0
+
+    def _matches(self, query: str, mode: SearchMode, start: int = 0) -> Iterator[int]:
+        """Iterate over the nodes matching a query from a node on."""
+        label, ancestors, anchored = self._parse(query)
+        if not label:
+            return
+        pattern = _compile(label, mode)
+        starts = self.starts
+        for match in pattern.finditer(self.text, starts[start] - 1):
+            node = bisect_right(starts, match.end()) - 1
+            if not (ancestors or anchored) or self._under(node, ancestors, anchored):
+                yield node
+
+    def search(
+        self,
+        query: str,
+        mode: SearchMode = "substring",
+        limit: int = 100,
+    ) -> SearchResult:
+        """Find the nodes whose label, or path, matches a query.
+
+        Args:
+            query: Label text, or ``/``-separated path
+            mode: Whether the label starts with, contains or contains in
+                order the characters of the query's label part
+            limit: Matching nodes to return
+
+        Returns:
+            SearchResult: Number of matches and the first matching nodes
+
+        """
+        result = SearchResult(query, mode)
+        label, ancestors, anchored = self._parse(query)
+        if not label or not self.labels:
+            return result
+        if ancestors or anchored:
+            for node in self._matches(query, mode):
+                if result.count < limit:
+                    result.nodes.append(node)
+                result.count += 1
+            return result
+        pattern = _compile(label, mode)
+        result.count = len(pattern.findall(self.text))
+        for node in self._matches(query, mode):
+            if len(result.nodes) >= limit:
+                break
+            result.nodes.append(node)
+        return result
+
+    def next_match(
+        self,
+        query: str,
+        mode: SearchMode = "substring",
+        after: int = -1,
+        *,
+        reverse: bool = False,
+    ) -> int | None:
+        """Find the match following or preceding a node, wrapping around.
+
+        Args:
+            query: Label text, or ``/``-separated path
+            mode: How labels are matched
+            after: Node to search from, -1 to start at the first node
+            reverse: Whether to search backwards
+
+        Returns:
+            Optional[int]: Matching node, ``None`` when nothing matches
+
+        """
+        if not self.labels:
+            return None
+        if not reverse:
+            start = after + 1 if after + 1 < len(self.labels) else 0
+            node = next(self._matches(query, mode, start), None)
+            if node is None and start:
+                node = next(self._matches(query, mode), None)
+            return node
+        last = None
+        wrapped = False
+        for node in self._matches(query, mode):
+            if not wrapped and 0 <= after <= node:
+                if last is not None:
+                    return last
+                # No match before the node: wrap around to the last one.
+                wrapped = True
+            last = node
+        return last
@@ -1,34 +1,99 @@
-"""TreeView widget for displaying hierarchical data."""
+"""TreeView widget for displaying hierarchical data.
+
+Nodes are created one level at a time: a node keeps its raw ``NodeData`` and
+only creates and mounts its child nodes the first time it is expanded, so
+the widgets in the tree follow what the user opened rather than the size of
+the data.
+
+For large trees the view has a virtual mode without a widget per node: the
+visible rows are kept in a flattened ``FlatTree`` and only the rows inside
+the viewport are rendered, as lines of the view itself. In virtual mode the
+children of ``DEFERRED`` nodes can be fetched from an async provider as the
+nodes expand.
+
+Labels and paths are searched through a ``TreeIndex`` of the data, built in
+a worker thread whenever data is set.
+"""
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import asyncio
+from typing import TYPE_CHECKING, ClassVar
 
 import structlog
+from rich.text import Text
 from textual.containers import Container
 from textual.message import Message
 from textual.widgets import Static
 
 from .base import EventData, PepperWidget
+from .tree_loader import ChildLoader
+from .tree_model import DEFERRED, LOADING, FlatTree
+from .tree_search import TreeIndex
 
 if TYPE_CHECKING:
     from collections.abc import Generator
 
+    from textual.binding import Binding
+    from textual.events import Click, Key, MouseScrollDown, MouseScrollUp
+
+    from .tree_loader import TreeDataProvider
+    from .tree_model import TreeRow
+    from .tree_search import SearchMode, SearchResult
+
 
 logger = structlog.get_logger(__name__)
 
 type NodeData = str | int | float | bool | None | dict[str, NodeData] | list[NodeData]
 
+# Style of the cursor row in virtual mode.
+CURSOR_STYLE = "on #44475a"
+
+# Style of the placeholder row of children being loaded.
+LOADING_STYLE = "dim italic"
+
+# Style of the search bar in virtual mode.
+SEARCH_STYLE = "reverse"
+
+# Order in which the search bar cycles through the match modes.
+SEARCH_MODES: tuple[SearchMode, ...] = ("substring", "prefix", "fuzzy")
+
+
+def build_nodes(
+    data: dict[str, NodeData] | list[NodeData],
+    level: int = 0,
+) -> list[TreeNode]:
+    """Create the nodes of one level of tree data.
+
+    Container values are not descended into; their nodes create their own
+    children when first expanded.
+
+    Args:
+        data: Mapping or list whose items become nodes
+        level: Indentation level of the nodes
+
+    Returns:
+        List[TreeNode]: One node per item
+
+    """
+    if isinstance(data, dict):
+        items = data.items()
+    else:
+        items = ((str(i), item) for i, item in enumerate(data))
+    return [TreeNode(label=key, level=level, data=value) for key, value in items]
+
 
 class TreeNode(PepperWidget, Static):
     """Tree node widget.
 
     Attributes:
         label (str): Node label
-        children (List[TreeNode]): Child nodes
+        children (List[TreeNode]): Child nodes, created from ``data`` on
+            first access unless given
         is_expanded (bool): Whether node is expanded
         level (int): Node indentation level
-        data (Any): Optional associated data
+        data (Any): Optional associated data, the source of the children
+            when it is a ``dict`` or ``list``
 
     """
 
@@ -88,7 +153,8 @@ class TreeNode(PepperWidget, Static):
 
         Args:
             label: The label to display for this node.
-            children: Child nodes of this node.
+            children: Child nodes of this node, created lazily from a
+                ``dict`` or ``list`` data value when omitted.
             is_expanded: Whether this node is expanded.
             level: The indentation level of this node.
             data: Custom data associated with this node.
@@ -98,19 +164,38 @@ class TreeNode(PepperWidget, Static):
         """
         super().__init__(*args, **kwargs)
         self.label = label
-        self._children = children or []
+        self._children = children
         self.is_expanded = is_expanded
         self.level = level
         self.data = data
 
-        if self._children:
+        if self.has_children:
             self.add_class("-has-children")
 
     @property
     def children(self) -> list["TreeNode"]:
-        """Get child nodes."""
+        """Get child nodes, creating them from the node data on first access."""
+        if self._children is None:
+            data = self.data
+            self._children = (
+                build_nodes(data, self.level + 1)
+                if isinstance(data, dict | list)
+                else []
+            )
         return self._children
 
+    @property
+    def materialized(self) -> bool:
+        """Check whether the child nodes were created."""
+        return self._children is not None
+
+    @property
+    def has_children(self) -> bool:
+        """Check whether the node has children, without creating them."""
+        if self._children is not None:
+            return bool(self._children)
+        return isinstance(self.data, dict | list) and bool(self.data)
+
     def render(self) -> str:
         """Render the node.
 
@@ -119,30 +204,62 @@ class TreeNode(PepperWidget, Static):
 
         """
         indent = "  " * self.level
-        icon = "▼ " if self.is_expanded else "▶ " if self.children else "  "
+        icon = "▼ " if self.is_expanded else "▶ " if self.has_children else "  "
         return f"{indent}{icon}{self.label}"
 
     def toggle(self) -> None:
         """Toggle node expansion."""
-        if self.children:
+        if self.has_children:
             self.is_expanded = not self.is_expanded
             self.refresh()
 
     async def on_click(self) -> None:
         """Handle click events."""
         self.toggle()
+        self.post_message(self.NodeClicked(self))
         await self.emit_event("clicked", {"node": self.label})
 
 
 class TreeView(PepperWidget, Container):
     """Tree view widget for displaying hierarchical data.
 
+    In virtual mode no node widgets are created: the view renders the rows
+    of a ``FlatTree`` that fall inside its height and moves a cursor row
+    with the keyboard, so scrolling costs the same for any tree size.
+
+    Example:
+        >>> tree = TreeView(data=inventory, virtual=True)
+
     Attributes:
-        nodes (List[TreeNode]): Root level nodes
+        nodes (List[TreeNode]): Root level nodes, empty in virtual mode
         selected_node (Optional[TreeNode]): Currently selected node
+        virtual (bool): Whether rows are rendered as lines of the view
+        model (Optional[FlatTree]): Visible rows in virtual mode
+        scroll_row (int): Position of the first rendered row in virtual mode
+        cursor_row (int): Position of the cursor row in virtual mode
+        loader (Optional[ChildLoader]): Loader of deferred children
+        index (Optional[TreeIndex]): Search index of the data, ``None``
+            while it is being built
+        search_query (Optional[str]): Text of the open search bar, ``None``
+            when it is closed
+        search_mode (SearchMode): Match mode of the search bar
+        search_result (Optional[SearchResult]): Match count of the query
 
     """
 
+    BINDINGS: ClassVar[list[Binding | tuple[str, str] | tuple[str, str, str]]] = [
+        ("up", "move_cursor(-1)", "Previous node"),
+        ("down", "move_cursor(1)", "Next node"),
+        ("pageup", "move_page(-1)", "Page up"),
+        ("pagedown", "move_page(1)", "Page down"),
+        ("home", "cursor_home", "First node"),
+        ("end", "cursor_end", "Last node"),
+        ("left", "collapse", "Collapse"),
+        ("right", "expand", "Expand"),
+        ("enter", "toggle", "Toggle"),
+        ("slash", "start_search", "Search"),
+    ]
+
     DEFAULT_CSS = """
     TreeView {
         layout: vertical;
@@ -154,33 +271,59 @@ class TreeView(PepperWidget, Container):
         margin: 1 0;
         overflow-y: scroll;
     }
+
+    TreeView.-virtual {
+        height: 1fr;
+        overflow-y: hidden;
+        padding-left: 2;
+    }
     """
 
     def __init__(
         self,
         *args: tuple[()],
         data: dict[str, NodeData] | list[NodeData],
+        virtual: bool = False,
         **kwargs: dict[str, EventData],
     ) -> None:
         """Initialize tree view.
 
         Args:
             data: The data to display in the tree.
+            virtual: Whether to render the visible rows as lines of the view
+                instead of creating a widget per node.
             *args: Additional positional arguments.
             **kwargs: Additional keyword arguments.
 
         """
         super().__init__(*args, **kwargs)
         self.data = data
-        self.nodes: list[TreeNode] = []
+        self.virtual = virtual
+        self.model: FlatTree | None = FlatTree(data) if virtual else None
+        self.nodes: list[TreeNode] = [] if virtual else self._build_tree(data)
         self.selected_node: TreeNode | None = None
+        self.scroll_row = 0
+        self.cursor_row = 0
+        self.loader: ChildLoader | None = None
+        self.index: TreeIndex | None = None
+        self._index_task: asyncio.Task[TreeIndex] | None = None
+        self.search_query: str | None = None
+        self.search_mode: SearchMode = "substring"
+        self.search_result: SearchResult | None = None
+        self._match: int | None = None
+
+        if virtual:
+            self.can_focus = True
+            self.add_class("-virtual")
 
     def _build_tree(
         self,
         data: dict[str, NodeData] | list[NodeData],
         level: int = 0,
     ) -> list[TreeNode]:
-        """Build tree structure from data.
+        """Build the nodes of one tree level from data.
+
+        Deeper levels are created as nodes are expanded.
 
         Args:
             data: Tree data structure
@@ -190,34 +333,11 @@ class TreeView(PepperWidget, Container):
             List[TreeNode]: Created tree nodes
 
         """
-        nodes = []
-
-        if isinstance(data, dict):
-            items = [(k, v) for k, v in data.items()]
-        else:
-            items = [(str(i), item) for i, item in enumerate(data)]
-
-        for key, value in items:
-            if isinstance(value, dict | list):
-                children = self._build_tree(value, level + 1)
-                node = TreeNode(
-                    label=key,
-                    children=children,
-                    level=level,
-                    data=value,
-                )
-            else:
-                node = TreeNode(label=key, level=level, data=value)
-            nodes.append(node)
-
-        return nodes
+        return build_nodes(data, level)
 
     def compose(self) -> Generator[TreeNode, None, None]:
         """Compose the tree view layout."""
-        for node in self.nodes:
-            yield node
-            if node.is_expanded:
-                yield from node.children
+        yield from self._get_visible_nodes()
 
     def select_node(self, node: TreeNode) -> None:
         """Select a tree node.
@@ -234,10 +354,554 @@ class TreeView(PepperWidget, Container):
     async def on_tree_node_node_clicked(self, message: TreeNode.NodeClicked) -> None:
         """Handle node click events."""
         self.select_node(message.node)
+        await self._update_children(message.node)
+
+    async def _update_children(self, node: TreeNode) -> None:
+        """Show or hide the descendants of a node after it was toggled.
 
-    def _get_visible_nodes(self) -> Generator[TreeNode, None, None]:
-        """Get all visible nodes in the tree."""
-        for node in self.nodes:
+        Children are created and mounted below the node the first time it
+        expands; collapsing it afterwards only hides them.
+
+        Args:
+            node: Toggled node
+
+        """
+        if not node.is_expanded:
+            for child in self._created_descendants(node):
+                child.display = False
+            return
+        children = node.children
+        new = [child for child in children if not child.is_mounted]
+        if new:
+            await self.mount(*new, after=node)
+        for child in children:
+            child.display = True
+            if child.is_expanded:
+                await self._update_children(child)
+
+    def _created_descendants(self, node: TreeNode) -> Generator[TreeNode, None, None]:
+        """Get the descendants of a node whose widgets were created."""
+        if not node.materialized:
+            return
+        for child in node.children:
+            yield child
+            yield from self._created_descendants(child)
+
+    def _get_visible_nodes(
+        self,
+        nodes: list[TreeNode] | None = None,
+    ) -> Generator[TreeNode, None, None]:
+        """Get all visible nodes in the tree, at every expanded level."""
+        for node in self.nodes if nodes is None else nodes:
             yield node
             if node.is_expanded:
-                yield from node.children
+                yield from self._get_visible_nodes(node.children)
+
+    @property
+    def page_size(self) -> int:
+        """Get the number of rows that fit in the view in virtual mode.
+
+        Returns:
+            int: Visible row count (at least one)
+
+        """
+        searching = self.search_query is not None
+        return max(1, self.content_size.height - searching)
+
+    @property
+    def cursor_node(self) -> TreeRow | None:
+        """Get the row under the cursor in virtual mode."""
+        if self.model is None or not len(self.model):
+            return None
+        return self.model[self.cursor_row]
+
+    def render(self) -> Text:
+        """Render the rows inside the viewport in virtual mode.
+
+        Returns:
+            Text: One line per visible row
+
+        """
+        if self.model is None:
+            return Text()
+        start = self.scroll_row
+        lines = Text(no_wrap=True, overflow="ellipsis")
+        for position, row in enumerate(
+            self.model.window(start, start + self.page_size),
+            start,
+        ):
+            if position > start:
+                lines.append("\n")
+            indent = "  " * row.level
+            icon = "▼ " if row.is_expanded else "▶ " if row.has_children else "  "
+            style = LOADING_STYLE if row.data is LOADING else ""
+            if position == self.cursor_row:
+                style = f"{style} {CURSOR_STYLE}".strip()
+            lines.append(f"{indent}{icon}{row.label}", style=style)
+        if self.search_query is not None:
+            if lines:
+                lines.append("\n")
+            lines.append(self._search_bar(), style=SEARCH_STYLE)
+        return lines
+
+    def _search_bar(self) -> str:
+        """Get the text of the search bar, with the match count."""
+        if self.index is None:
+            status = "indexing…"
+        elif self.search_result is None:
+            status = self.search_mode
+        else:
+            count = self.search_result.count
+            status = f"{count} match{'' if count == 1 else 'es'}, {self.search_mode}"
+        return f"/{self.search_query}  [{status}]"
+
+    def scroll_to_row(self, position: int) -> None:
+        """Scroll so that a row is the first rendered one.
+
+        Args:
+            position: Row position among the visible rows
+
+        """
+        if self.model is None:
+            return
+        limit = max(0, len(self.model) - self.page_size)
+        position = max(0, min(position, limit))
+        if position != self.scroll_row:
+            self.scroll_row = position
+            self.refresh()
+
+    def move_cursor_to(self, position: int) -> None:
+        """Move the cursor to a row, scrolling it into view.
+
+        Args:
+            position: Row position among the visible rows
+
+        """
+        if self.model is None or not len(self.model):
+            return
+        position = max(0, min(position, len(self.model) - 1))
+        self.cursor_row = position
+        if position < self.scroll_row:
+            self.scroll_to_row(position)
+        elif position >= self.scroll_row + self.page_size:
+            self.scroll_to_row(position - self.page_size + 1)
+        self.refresh()
+
+    def action_move_cursor(self, delta: int) -> None:
+        """Move the cursor by a number of rows.
+
+        Args:
+            delta: Rows to move, negative to move up
+
+        """
+        self.move_cursor_to(self.cursor_row + delta)
+
+    def action_move_page(self, pages: int) -> None:
+        """Move the cursor by a number of pages.
+
+        Args:
+            pages: Pages to move, negative to move up
+
+        """
+        self.move_cursor_to(self.cursor_row + pages * self.page_size)
+
+    def action_cursor_home(self) -> None:
+        """Move the cursor to the first row."""
+        self.move_cursor_to(0)
+
+    def action_cursor_end(self) -> None:
+        """Move the cursor to the last row."""
+        if self.model is not None:
+            self.move_cursor_to(len(self.model) - 1)
+
+    def _rows_changed(self, count: int) -> None:
+        """Keep the scroll position valid after rows were shown or hidden.
+
+        Args:
+            count: Number of rows shown or hidden
+
+        """
+        if count:
+            self.scroll_to_row(self.scroll_row)
+            self.refresh()
+
+    def set_provider(
+        self,
+        provider: TreeDataProvider,
+        max_loads: int = 4,
+        cache_size: int = 64,
+    ) -> None:
+        """Fetch the children of ``DEFERRED`` nodes from an async provider.
+
+        A deferred node shows a loading placeholder from the moment it
+        expands until its children arrive. At most ``max_loads`` loads run
+        at once, collapsing a node cancels its load, and the subtrees of the
+        last ``cache_size`` collapsed deferred nodes are kept for when they
+        expand again.
+
+        Example:
+            >>> tree = TreeView(data={"/": DEFERRED}, virtual=True)
+            >>> tree.set_provider(FileSystemProvider(), max_loads=8)
+
+        Args:
+            provider: Source of the children
+            max_loads: Loads running at once
+            cache_size: Collapsed subtrees kept in memory
+
+        Raises:
+            ValueError: If the view is not in virtual mode.
+
+        """
+        if self.model is None:
+            error_msg = "Child providers require a virtual tree view"
+            raise ValueError(error_msg)
+        if self.loader is not None:
+            self.loader.close()
+        self.loader = ChildLoader(
+            provider, max_loads, cache_size, on_load=self._children_loaded
+        )
+
+    def _expand_row(self, row: TreeRow) -> int:
+        """Expand a row, loading its children when they are deferred.
+
+        Args:
+            row: Row to expand
+
+        Returns:
+            int: Number of rows shown
+
+        """
+        if self.model is None:
+            return 0
+        loader = self.loader
+        if loader is not None and row.data is DEFERRED and not row.is_expanded:
+            children = loader.take(row)
+            if children is not None:
+                self.model.set_children(row, children)
+        shown = self.model.expand(row)
+        if loader is not None and row.loading:
+            loader.request(row)
+        return shown
+
+    def _collapse_row(self, row: TreeRow) -> int:
+        """Collapse a row, cancelling or caching its deferred children.
+
+        Args:
+            row: Row to collapse
+
+        Returns:
+            int: Number of rows hidden
+
+        """
+        if self.model is None:
+            return 0
+        hidden = self.model.collapse(row)
+        if self.loader is not None and row.data is DEFERRED:
+            self.loader.cancel(row)
+            loading = row.loading
+            children = self.model.release_children(row)
+            if children is not None and not loading:
+                self.loader.store(row, children)
+        return hidden
+
+    def _position_of(self, row: TreeRow | None) -> int:
+        """Get the position of a row, or of its parent for a placeholder."""
+        if row is None or self.model is None:
+            return 0
+        if row.data is LOADING and row.parent is not None:
+            row = row.parent
+        try:
+            return self.model.index(row)
+        except ValueError:
+            return 0
+
+    def _children_loaded(self, row: TreeRow, children: list[TreeRow] | None) -> None:
+        """Replace the loading placeholder of a row by its children.
+
+        The rows at the top of the view and under the cursor keep their
+        place. A failed load collapses the row so that it loads again when
+        expanded.
+
+        Args:
+            row: Deferred row
+            children: Loaded child rows, ``None`` when the load failed
+
+        """
+        if self.model is None:
+            return
+        top = self.model[self.scroll_row] if len(self.model) else None
+        cursor = self.cursor_node
+        if children is None:
+            self.model.collapse(row)
+            self.model.release_children(row)
+        else:
+            self.model.set_children(row, children)
+        self.scroll_row = self._position_of(top)
+        self.cursor_row = self._position_of(cursor)
+        self.scroll_to_row(self.scroll_row)
+        self.refresh()
+
+    async def action_toggle(self) -> None:
+        """Expand or collapse the row under the cursor."""
+        row = self.cursor_node
+        if row is None:
+            return
+        if row.is_expanded:
+            self._rows_changed(self._collapse_row(row))
+        else:
+            self._rows_changed(self._expand_row(row))
+        await self.emit_event("clicked", {"node": row.label})
+
+    def action_expand(self) -> None:
+        """Expand the row under the cursor."""
+        row = self.cursor_node
+        if row is not None:
+            self._rows_changed(self._expand_row(row))
+
+    def action_collapse(self) -> None:
+        """Collapse the row under the cursor, or move to its parent."""
+        row = self.cursor_node
+        if row is None or self.model is None:
+            return
+        if row.is_expanded:
+            self._rows_changed(self._collapse_row(row))
+        elif row.parent is not None:
+            self.move_cursor_to(self.model.index(row.parent))
+
+    async def on_click(self, event: Click) -> None:
+        """Move the cursor to the clicked row and toggle it in virtual mode."""
+        if self.model is None:
+            return
+        offset = event.get_content_offset(self)
+        if offset is None:
+            return
+        position = self.scroll_row + offset.y
+        if position >= len(self.model):
+            return
+        event.stop()
+        self.move_cursor_to(position)
+        await self.action_toggle()
+
+    def on_mount(self) -> None:
+        """Start indexing the data for search."""
+        self._start_index()
+
+    def on_unmount(self) -> None:
+        """Cancel pending child loads and indexing."""
+        if self.loader is not None:
+            self.loader.close()
+        if self._index_task is not None:
+            self._index_task.cancel()
+
+    async def set_data(self, data: dict[str, NodeData] | list[NodeData]) -> None:
+        """Replace the tree data, collapsing every node.
+
+        Args:
+            data: The data to display in the tree.
+
+        """
+        self.data = data
+        self.scroll_row = 0
+        self.cursor_row = 0
+        self._match = None
+        if self.loader is not None:
+            self.loader.close()
+        if self.virtual:
+            self.model = FlatTree(data)
+        else:
+            self.selected_node = None
+            self.nodes = self._build_tree(data)
+            if self.is_mounted:
+                await self.remove_children()
+                await self.mount_all(self.nodes)
+        if self.is_mounted:
+            self._start_index()
+        self.refresh()
+        await self.emit_event("data_loaded", {"count": len(data)})
+
+    def _start_index(self) -> None:
+        """Build the search index of the data in a worker thread."""
+        if self._index_task is not None:
+            self._index_task.cancel()
+        self.index = None
+        self._index_task = asyncio.create_task(
+            asyncio.to_thread(TreeIndex.build, self.data)
+        )
+        self._index_task.add_done_callback(self._index_built)
+
+    def _index_built(self, task: asyncio.Task[TreeIndex]) -> None:
+        """Keep the index built for the current data."""
+        if task is not self._index_task or task.cancelled():
+            return
+        if task.exception() is not None:
+            logger.error("Failed to index tree data", error=str(task.exception()))
+            return
+        self.index = task.result()
+        if self.search_query is not None:
+            self._update_search()
+            self.refresh()
+
+    async def get_index(self) -> TreeIndex:
+        """Get the search index, waiting for it to be built.
+
+        When the data is replaced while waiting, the index of the new data
+        is awaited instead.
+
+        Returns:
+            TreeIndex: Index of the current data
+
+        """
+        while self.index is None:
+            task = self._index_task
+            if task is None:
+                self._start_index()
+                continue
+            try:
+                index = await asyncio.shield(task)
+            except asyncio.CancelledError:
+                # Only a build replaced by newer data is retried.
+                if not task.cancelled() or task is self._index_task:
+                    raise
+                continue
+            if task is self._index_task:
+                self.index = index
+        return self.index
+
+    async def search(
+        self,
+        query: str,
+        mode: SearchMode = "substring",
+        limit: int = 100,
+    ) -> SearchResult:
+        """Find the nodes whose label, or path, matches a query.
+
+        A query containing ``/`` matches paths: its last segment is matched
+        against labels, the others must equal the labels of the nearest
+        ancestors, from a root when the query starts with ``/``.
+
+        Example:
+            >>> result = await tree.search("config/serv", mode="prefix")
+            >>> await tree.jump_to(result.nodes[0])
+
+        Args:
+            query: Label text, or ``/``-separated path
+            mode: Whether labels start with, contain or contain in order
+                the characters of the query
+            limit: Matching nodes to return
+
+        Returns:
+            SearchResult: Number of matches and the first matching nodes,
+            numbered in display order of the fully expanded tree
+
+        """
+        index = await self.get_index()
+        return index.search(query, mode, limit)
+
+    async def jump_to(self, node: int) -> None:
+        """Expand the ancestors of an indexed node and select it.
+
+        Args:
+            node: Node number from a search result
+
+        """
+        index = await self.get_index()
+        route = index.route(node)
+        if self.model is not None:
+            row = self.model.roots[route[0]]
+            for position in route[1:]:
+                self._expand_row(row)
+                row = row.children[position]
+            self.move_cursor_to(self.model.index(row))
+        else:
+            tree_node = self.nodes[route[0]]
+            for position in route[1:]:
+                if not tree_node.is_expanded:
+                    tree_node.toggle()
+                    await self._update_children(tree_node)
+                tree_node = tree_node.children[position]
+            self.select_node(tree_node)
+            tree_node.scroll_visible()
+        self._match = node
+        await self.emit_event("found", {"node": index.labels[node]})
+
+    async def find_next(
+        self,
+        query: str,
+        mode: SearchMode = "substring",
+        *,
+        reverse: bool = False,
+    ) -> int | None:
+        """Jump to the match after, or before, the last one jumped to.
+
+        Args:
+            query: Label text, or ``/``-separated path
+            mode: How labels are matched
+            reverse: Whether to jump to the previous match
+
+        Returns:
+            Optional[int]: Node jumped to, ``None`` when nothing matches
+
+        """
+        index = await self.get_index()
+        after = -1 if self._match is None else self._match
+        node = index.next_match(query, mode, after, reverse=reverse)
+        if node is not None:
+            await self.jump_to(node)
+        return node
+
+    def action_start_search(self) -> None:
+        """Open the search bar in virtual mode."""
+        if self.model is not None and self.search_query is None:
+            self.search_query = ""
+            self.search_result = None
+            self.move_cursor_to(self.cursor_row)
+
+    def _update_search(self) -> None:
+        """Count the matches of the search bar query."""
+        if self.index is None or not self.search_query:
+            self.search_result = None
+            return
+        self.search_result = self.index.search(
+            self.search_query, self.search_mode, limit=0
+        )
+
+    async def on_key(self, event: Key) -> None:
+        """Edit the search bar query while it is open.
+
+        Typing updates the match count, enter and down jump to the next
+        match, up to the previous one, tab cycles the match mode and escape
+        closes the bar.
+        """
+        if self.search_query is None:
+            return
+        event.stop()
+        event.prevent_default()
+        query = self.search_query
+        if event.key == "escape":
+            self.search_query = None
+        elif event.key in {"enter", "down", "up"}:
+            if query and self.index is not None:
+                await self.find_next(query, self.search_mode, reverse=event.key == "up")
+        elif event.key == "tab":
+            modes = SEARCH_MODES
+            self.search_mode = modes[(modes.index(self.search_mode) + 1) % len(modes)]
+        elif event.key == "backspace":
+            self.search_query = query[:-1]
+        elif event.is_printable and event.character:
+            self.search_query = query + event.character
+        if self.search_query != query or event.key == "tab":
+            self._match = None
+            self._update_search()
+        self.refresh()
+
+    def on_mouse_scroll_down(self, event: MouseScrollDown) -> None:
+        """Handle mouse wheel scrolling down."""
+        if self.model is not None:
+            event.stop()
+            self.scroll_to_row(self.scroll_row + 3)
+
+    def on_mouse_scroll_up(self, event: MouseScrollUp) -> None:
+        """Handle mouse wheel scrolling up."""
+        if self.model is not None:
+            event.stop()
+            self.scroll_to_row(self.scroll_row - 3)
@@ -0,0 +1,87 @@
+"""Compare the memory used by table rows as dicts and in a ColumnStore.
+
+Usage:
+    python scripts/benchmark_table_memory.py [ROWS]
+"""
+
+from __future__ import annotations
+
+import gc
+import sys
+import tracemalloc
+
+from pepperpy.tui.widgets.table import Column, ColumnStore
+from pepperpy.tui.widgets.table.store import Row
+
+COLUMNS = [
+    Column("id", "ID"),
+    Column("host", "Host"),
+    Column("region", "Region"),
+    Column("latency", "Latency"),
+    Column("healthy", "Healthy"),
+]
+REGIONS = ["us-east", "us-west", "eu-central", "ap-south"]
+
+
+def make_rows(count: int) -> list[Row]:
+    """Build synthetic operations rows.
+
+    Args:
+        count: Number of rows
+
+    Returns:
+        List[Row]: Data rows
+
+    """
+    return [
+        {
+            "id": index,
+            "host": f"host-{index:07d}",
+            "region": REGIONS[index % len(REGIONS)],
+            "latency": (index % 997) / 7,
+            "healthy": index % 13 != 0,
+        }
+        for index in range(count)
+    ]
+
+
+def measure_rows(count: int) -> int:
+    """Measure the memory retained by rows stored as dicts."""
+    gc.collect()
+    tracemalloc.start()
+    rows = make_rows(count)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del rows
+    return size
+
+
+def measure_store(count: int) -> int:
+    """Measure the memory retained by the same rows in a ColumnStore."""
+    gc.collect()
+    tracemalloc.start()
+    rows = make_rows(count)
+    store = ColumnStore(COLUMNS, rows)
+    del rows
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del store
+    return size
+
+
+def main() -> None:
+    """Run the benchmark and print a summary."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rows_size = measure_rows(count)
+    store_size = measure_store(count)
+    print(f"rows:        {count:,}")
+    print(f"list[dict]:  {rows_size / 2**20:8.1f} MiB ({rows_size / count:.0f} B/row)")
+    print(
+        f"ColumnStore: {store_size / 2**20:8.1f} MiB ({store_size / count:.0f} B/row)"
+    )
+    print(f"ratio:       {store_size / rows_size:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Tests for incremental table aggregates."""
+
+from __future__ import annotations
+
+import math
+
+import pytest
+
+from pepperpy.tui.widgets.table import Column, ColumnStore, TableAggregates
+from pepperpy.tui.widgets.table.aggregate import Accumulator, is_number
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [(1, True), (2.5, True), (math.nan, False), (True, False), ("1", False)],
+)
+def test_is_number(value: object, expected: bool) -> None:
+    """Only ints and floats other than NaN are aggregated."""
+    assert is_number(value) is expected  # type: ignore[arg-type]
+
+
+def test_accumulator_results() -> None:
+    """Counts include text, the other aggregates only numbers."""
+    accumulator = Accumulator(ordered=True)
+    accumulator.extend([3, None, "x", 1.5, math.nan])
+    accumulator.add(10)
+    accumulator.remove(3)
+    assert accumulator.result("count") == 4
+    assert accumulator.result("sum") == 11.5
+    assert accumulator.result("mean") == 5.75
+    assert accumulator.result("min") == 1.5
+    assert accumulator.result("max") == 10
+    assert Accumulator().result("mean") is None
+
+
+def make_aggregates() -> tuple[ColumnStore, TableAggregates]:
+    """Create grouped aggregates over a few rows."""
+    columns = [
+        Column("region", "Region"),
+        Column("latency", "Latency", aggregate="max"),
+        Column("hits", "Hits", aggregate="sum"),
+    ]
+    rows = [
+        {"region": "eu", "latency": 10, "hits": 1},
+        {"region": "us", "latency": 30, "hits": 2},
+        {"region": "eu", "latency": 20, "hits": 3},
+    ]
+    store = ColumnStore(columns, rows)
+    return store, TableAggregates(store, columns, group_key="region")
+
+
+def test_aggregates_follow_updates_and_deletes() -> None:
+    """Totals and groups change with the rows, without a rescan."""
+    store, aggregates = make_aggregates()
+    assert aggregates.group_value("hits", "eu") == 4
+
+    previous = store.update_row(2, {"region": "us", "latency": 5})
+    aggregates.row_updated(2, previous)
+    assert aggregates.group_value("latency", "eu") == 10
+    assert aggregates.group_value("hits", "us") == 5
+    assert aggregates.value("latency") == 30
+
+    aggregates.rows_removed(store.delete_rows([0]))
+    assert "eu" not in aggregates.groups
+    assert aggregates.value("hits") == 5
+
+    store.append_rows([{"region": "eu", "latency": 50, "hits": 7}])
+    aggregates.rows_added([3])
+    assert aggregates.value("latency") == 50
+    assert aggregates.group_value("hits", "eu") == 7
@@ -0,0 +1,72 @@
+"""Tests for zero-copy buffer columns."""
+
+from __future__ import annotations
+
+import math
+from array import array
+
+import pytest
+
+from pepperpy.tui.widgets.table import BufferColumn, Column, PepperTable, Utf8Column
+
+# Rows 0, 2 and 3 hold a value; row 1 is null.
+VALIDITY = bytes([0b1101])
+
+
+def test_buffer_column_reads_memoryview_with_validity() -> None:
+    """Values are read in place and nulls come from the bitmap."""
+    column = BufferColumn(memoryview(array("d", [1.5, 0.0, math.nan, -2.0])), VALIDITY)
+    assert column.dtype == "float"
+    assert column[1] is None
+    assert list(column)[3] == -2.0
+    keys = column.sort_keys()
+    assert sorted(range(4), key=keys.__getitem__) == [3, 0, 1, 2]
+    assert list(column.null_mask() or ()) == [0, 1, 0, 0]
+    assert BufferColumn(memoryview(array("q", [1, 2]))).null_mask() is None
+
+
+def test_buffer_column_rejects_unsupported_buffers() -> None:
+    """Only 1-D buffers of native numbers are wrapped."""
+    with pytest.raises(ValueError, match="format"):
+        BufferColumn(memoryview(b"ab").cast("c"))
+    with pytest.raises(ValueError, match="1-D"):
+        BufferColumn(memoryview(array("q", [1, 2, 3, 4])).cast("B").cast("q", (2, 2)))
+    with pytest.raises(ValueError, match="too short"):
+        BufferColumn(memoryview(array("q", range(9))), b"\xff")
+
+
+def test_read_only_columns_reject_changes() -> None:
+    """Wrapped memory is never written to."""
+    column = BufferColumn(memoryview(array("q", [1])))
+    with pytest.raises(TypeError):
+        column.set(0, 2)
+    assert column.snapshot() is column
+
+
+def test_utf8_column_decodes_offsets() -> None:
+    """Strings are decoded from the offset and data buffers."""
+    column = Utf8Column(array("i", [0, 2, 4, 7, 9]), "euxxgcpé".encode(), VALIDITY)
+    assert list(column) == ["eu", None, "gcp", "é"]
+    assert list(column.sort_keys()) == [0, 3, 1, 2]
+    with pytest.raises(ValueError, match="Offsets"):
+        Utf8Column(array("d", [0.0]), b"")
+
+
+def test_numpy_masked_array_uses_its_mask() -> None:
+    """Masked NumPy values are null."""
+    np = pytest.importorskip("numpy")
+    column = BufferColumn(np.ma.masked_array([1, 2, 3], mask=[False, True, False]))
+    assert column.dtype == "int"
+    assert list(column) == [1, None, 3]
+
+
+@pytest.mark.asyncio
+async def test_table_copies_a_wrapped_column_on_update() -> None:
+    """Updating a row copies the column and leaves the buffer untouched."""
+    values = array("q", [3, 1, 2])
+    table = PepperTable(columns=[Column("v", "V")], virtual=True)
+    await table.load_arrays({"v": memoryview(values)})
+    assert isinstance(table.store.column("v"), BufferColumn)
+    await table.update_rows([0], {"v": 10})
+    assert table.store.value(0, "v") == 10
+    assert list(values) == [3, 1, 2]
@@ -0,0 +1,63 @@
+"""Tests for horizontal virtualization and frozen columns."""
+
+from __future__ import annotations
+
+import pytest
+from textual.app import App, ComposeResult
+
+from pepperpy.tui.widgets.table import Column, PepperTable
+
+COLUMNS = [Column("id", "ID", width=4, frozen=True)] + [
+    Column(f"c{i}", f"C{i}", width=10) for i in range(12)
+]
+
+
+class TableApp(App[None]):
+    """App showing one wide virtual table."""
+
+    def compose(self) -> ComposeResult:
+        """Create the table."""
+        yield PepperTable(columns=COLUMNS, virtual=True)
+
+
+def fits(table: PepperTable, columns: list[Column]) -> bool:
+    """Check whether columns fit the table, with borders and padding."""
+    used = 1 + sum(3 + (col.width or 0) for col in columns)
+    return used <= table.content_size.width
+
+
+@pytest.mark.asyncio
+async def test_frozen_column_stays_while_scrolling() -> None:
+    """The frozen column leads, followed by the columns that fit."""
+    app = TableApp()
+    async with app.run_test(size=(70, 12)) as pilot:
+        table = app.query_one(PepperTable)
+        await table.load_data([{col.key: 1 for col in COLUMNS}])
+        await pilot.pause()
+        shown = table._get_visible_columns()
+        assert shown[0].key == "id"
+        assert 2 < len(shown) < len(COLUMNS)
+        assert fits(table, shown)
+        assert not fits(table, [*shown, COLUMNS[len(shown)]])
+
+        table.action_scroll_columns(2)
+        assert [col.key for col in table._get_visible_columns()][:2] == ["id", "c2"]
+        table.render()
+        assert table._cache_keys == [col.key for col in table._get_visible_columns()]
+
+
+@pytest.mark.asyncio
+async def test_last_columns_fill_the_width() -> None:
+    """Scrolled to the end, earlier columns come back into free space."""
+    app = TableApp()
+    async with app.run_test(size=(70, 12)) as pilot:
+        table = app.query_one(PepperTable)
+        await table.load_data([{col.key: 1 for col in COLUMNS}])
+        await pilot.pause()
+        count = len(table._get_visible_columns())
+        table.scroll_to_column(100)
+        assert table.scroll_column == 11
+        shown = table._get_visible_columns()
+        assert shown[-1].key == "c11"
+        assert len(shown) == count
+        assert table.scroll_column == 12 - (count - 1)
@@ -0,0 +1,97 @@
+"""Tests for streaming table exports."""
+
+from __future__ import annotations
+
+import csv
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+
+from pepperpy.tui.widgets.table import Column, ExportTableCommand, PepperTable
+from pepperpy.tui.widgets.table.export import ExportWriter, export_view, guess_format
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pepperpy.tui.widgets.table.export import Chunk
+
+
+async def make_table() -> PepperTable:
+    """Create a table with a few rows."""
+    table = PepperTable(
+        columns=[Column("id", "ID"), Column("v", "Value")], virtual=True
+    )
+    await table.load_data([{"id": i, "v": 1.5 * (i % 5)} for i in range(25)])
+    return table
+
+
+def test_export_writer_is_abstract(tmp_path: Path) -> None:
+    """Writers must implement writing and closing."""
+    with pytest.raises(TypeError):
+        ExportWriter(tmp_path / "out.csv", ["id"])  # type: ignore[abstract]
+
+
+def test_guess_format(tmp_path: Path) -> None:
+    """The format follows the file suffix."""
+    assert guess_format(tmp_path / "rows.JSONL") == "jsonl"
+    assert guess_format(tmp_path / "rows.parquet") == "parquet"
+    assert guess_format(tmp_path / "rows.txt") == "csv"
+
+
+@pytest.mark.asyncio
+async def test_export_csv_in_sorted_order(tmp_path: Path) -> None:
+    """Rows are written in view order across several chunks."""
+    table = await make_table()
+    await table.sort_by("v")
+    path = tmp_path / "rows.csv"
+    assert await table.export(path, chunk_size=10) == 25
+    with path.open(encoding="utf-8") as file:
+        rows = list(csv.DictReader(file))
+    assert [row["id"] for row in rows[:6]] == ["0", "5", "10", "15", "20", "1"]
+    assert not path.with_name("rows.csv.part").exists()
+
+
+@pytest.mark.asyncio
+async def test_export_jsonl_keeps_values(tmp_path: Path) -> None:
+    """JSON Lines keep the stored types unless formatted."""
+    table = await make_table()
+    path = tmp_path / "rows.jsonl"
+    await table.export(path)
+    first = json.loads(path.read_text(encoding="utf-8").splitlines()[1])
+    assert first == {"id": 1, "v": 1.5}
+
+
+@pytest.mark.asyncio
+async def test_formatted_export_writes_cell_text(tmp_path: Path) -> None:
+    """Formatted exports write the text shown in the table."""
+    table = await make_table()
+    path = tmp_path / "rows.jsonl"
+    await table.export(path, formatted=True)
+    first = json.loads(path.read_text(encoding="utf-8").splitlines()[1])
+    assert first == {"id": "1", "v": "1.5"}
+
+
+@pytest.mark.asyncio
+async def test_failed_export_leaves_no_file(tmp_path: Path) -> None:
+    """An export that fails removes its partial file."""
+    path = tmp_path / "rows.csv"
+    columns = [Column("id", "ID")]
+
+    async def read_chunk(start: int, end: int) -> Chunk:
+        if start:
+            raise RuntimeError
+        return {"id": list(range(start, end))}
+
+    with pytest.raises(RuntimeError):
+        await export_view(path, columns, 20, read_chunk, chunk_size=10)
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_export_command_rejects_unknown_format(tmp_path: Path) -> None:
+    """An unknown format name is an error rather than a guess."""
+    command = ExportTableCommand(await make_table())
+    with pytest.raises(ValueError, match="'xlsx'"):
+        await command.execute(tmp_path / "rows.csv", file_format="xlsx")
+    assert not (tmp_path / "rows.csv").exists()
@@ -0,0 +1,70 @@
+"""Tests for the memory-mapped file data source."""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+
+from pepperpy.tui.widgets.table import And, FileSource, Or, Range
+from pepperpy.tui.widgets.table.file_source import parse_scalar
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.mark.parametrize(
+    ("text", "value"),
+    [("", None), ("12", 12), ("-3", -3), ("1.5", 1.5), ("1e3", 1000.0), ("x1", "x1")],
+)
+def test_parse_scalar(text: str, value: object) -> None:
+    """Fields become numbers when they parse as numbers."""
+    assert parse_scalar(text) == value
+
+
+@pytest.mark.asyncio
+async def test_csv_rows_sort_and_filter(tmp_path: Path) -> None:
+    """CSV rows are parsed, including quoted fields and missing values."""
+    path = tmp_path / "rows.csv"
+    lines = ["name,v", '"a, quoted",3', "b,", *(f"r{i},{i}" for i in range(10))]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    source = FileSource(path)
+    try:
+        rows = await source.fetch(0, 2)
+        assert rows == [{"name": "a, quoted", "v": 3}, {"name": "b", "v": None}]
+        assert await source.count() == 12
+        assert await source.count(Range("v", 3, 5)) == 4
+        first = await source.fetch(0, 2, sort=(("v", False),))
+        last = await source.fetch(11, 1, sort=(("v", False),))
+        assert [row["v"] for row in first + last] == [0, 1, None]
+    finally:
+        source.close()
+
+
+@pytest.mark.asyncio
+async def test_jsonl_skips_bad_lines(tmp_path: Path) -> None:
+    """Lines that are not JSON objects become empty rows."""
+    path = tmp_path / "rows.jsonl"
+    records = [json.dumps({"k": "a", "v": 1}), "not json", "[1]", json.dumps({"v": 2})]
+    path.write_text("\n".join(records) + "\n", encoding="utf-8")
+    source = FileSource(path)
+    try:
+        rows = await source.fetch(0, 4)
+        assert [row.get("v") for row in rows] == [1, None, None, 2]
+    finally:
+        source.close()
+
+
+@pytest.mark.asyncio
+async def test_filter_without_columns(tmp_path: Path) -> None:
+    """Filters that test no column need no parsed values."""
+    path = tmp_path / "rows.csv"
+    path.write_text("name\na\nb\n", encoding="utf-8")
+    source = FileSource(path)
+    try:
+        assert await source.count(And()) == 2
+        assert await source.count(Or()) == 0
+        assert await source.fetch(1, 1, predicate=And()) == [{"name": "b"}]
+    finally:
+        source.close()
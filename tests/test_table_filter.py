@@ -0,0 +1,128 @@
+"""Tests for table filters and their incremental indexes."""
+
+from __future__ import annotations
+
+import pytest
+
+from pepperpy.tui.widgets.table import (
+    Column,
+    Contains,
+    Eq,
+    PepperTable,
+    Predicate,
+    Range,
+)
+from pepperpy.tui.widgets.table.filter import SortedIndex
+
+
+def make_table() -> PepperTable:
+    """Create a table with a sorted index on its value column."""
+    table = PepperTable(
+        columns=[Column("id", "ID", primary_key=True), Column("v", "Value")],
+        virtual=True,
+    )
+    table.create_index("v", "sorted")
+    return table
+
+
+ROWS = [{"id": f"r{i}", "v": i % 10} for i in range(100)]
+
+
+def sorted_index(table: PepperTable) -> SortedIndex:
+    """Get the sorted index of the value column."""
+    index = table._filter.sorted_index("v")
+    assert index is not None
+    return index
+
+
+def assert_matches_rebuild(index: SortedIndex) -> None:
+    """Check that a patched index equals one built from scratch."""
+    assert index._rows is not None
+    rows, values = list(index._rows), list(index._values)
+    index.invalidate()
+    built_rows, built_values = index._build()
+    assert rows == list(built_rows)
+    assert values == list(built_values)
+
+
+def test_predicates_are_abstract() -> None:
+    """Only complete predicates can be created."""
+    with pytest.raises(TypeError):
+        Predicate()  # type: ignore[abstract]
+
+
+@pytest.mark.parametrize(
+    ("new", "old", "expected"),
+    [
+        (Range("v", 2, 4), Range("v", 0, 5), True),
+        (Range("v", 0, 5), Range("v", 2, 4), False),
+        (Range("v", 2), Range("v", 0, 5), False),
+        (Range("v", 2, 4), Range("w", 0, 5), False),
+        (Contains("id", "r1"), Contains("id", "r"), True),
+        (Contains("id", "r"), Contains("id", "r1"), False),
+        (Eq("v", 1) & Contains("id", "r"), Eq("v", 1), True),
+        (Eq("v", 1), Eq("v", 1) | Eq("v", 2), True),
+    ],
+)
+def test_narrows(new: Predicate, old: Predicate, expected: bool) -> None:
+    """A stricter filter narrows the filter it replaces."""
+    assert new.narrows(old) is expected
+
+
+@pytest.mark.asyncio
+async def test_narrowed_filter_matches_full_evaluation() -> None:
+    """Evaluating only the rows matched so far gives the same result."""
+    table = make_table()
+    await table.load_data(ROWS)
+    await table.filter_by(Range("v", 2, 6))
+    assert table.view_count == 50
+    await table.filter_by(Range("v", 3, 4) & Contains("id", "r1"))
+    assert list(table._filter.matched_rows() or ()) == [13, 14]
+
+
+@pytest.mark.asyncio
+async def test_update_patches_sorted_index(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A single row update moves the row instead of rebuilding the index."""
+    table = make_table()
+    await table.load_data(ROWS)
+    await table.filter_by(Range("v", 8, 9))
+    index = sorted_index(table)
+
+    def fail() -> None:
+        pytest.fail("Sorted index was rebuilt")
+
+    monkeypatch.setattr(index, "_build", fail)
+    await table.update_rows([3], {"v": 9})
+    await table.update_rows([8], {"v": None})
+    assert table.view_count == 20
+    assert 3 in (table._filter.matched_rows() or ())
+    assert list(index.between(9, 9) or ()) == sorted([*range(9, 100, 10), 3])
+    monkeypatch.undo()
+    assert_matches_rebuild(index)
+
+
+@pytest.mark.asyncio
+async def test_append_and_delete_patch_sorted_index() -> None:
+    """Appended and deleted rows are inserted into and removed from the index."""
+    table = make_table()
+    await table.load_data(ROWS)
+    await table.filter_by(Range("v", 5))
+    await table.append_rows([{"id": "new", "v": 7}])
+    await table.delete_rows([5, 17])
+    index = sorted_index(table)
+    assert 100 in (index.between(7, 7) or ())
+    assert 5 not in (index.between(5, 5) or ())
+    assert table.view_count == 49
+    assert_matches_rebuild(index)
+
+
+@pytest.mark.asyncio
+async def test_widened_column_rebuilds_sorted_index() -> None:
+    """A value that widens the column drops the index for a rebuild."""
+    table = make_table()
+    await table.load_data(ROWS)
+    await table.filter_by(Range("v", 8.5))
+    assert table.view_count == 10
+    await table.update_rows([0], {"v": 8.75})
+    assert table.view_count == 11
+    assert list(sorted_index(table).between(8.6, 8.9) or ()) == [0]
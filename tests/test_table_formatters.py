@@ -0,0 +1,60 @@
+"""Tests for cell formatters and the formatted-cell cache."""
+
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+
+from pepperpy.tui.widgets.table import (
+    Column,
+    ColumnStore,
+    PepperTable,
+    format_number,
+    format_timestamp,
+)
+from pepperpy.tui.widgets.table.store import CellValue
+
+
+def test_number_and_timestamp_formatters() -> None:
+    """Numbers and times are formatted, other values use ``str``."""
+    number = format_number(1, " ms", thousands=True)
+    assert number(12345.67) == "12,345.7 ms"
+    assert number(None) == ""
+    assert number(True) == "True"
+    assert number("n/a") == "n/a"
+    timestamp = format_timestamp("%Y-%m-%d %H:%M", utc=True)
+    assert timestamp(86_400) == "1970-01-02 00:00"
+    assert timestamp(date(2024, 2, 29)) == "2024-02-29 00:00"
+    assert timestamp(1e20) == "1e+20"
+
+
+def test_versions_count_updates_per_row() -> None:
+    """Only updated rows get a new version."""
+    store = ColumnStore([Column("v", "V")], [{"v": 1}, {"v": 2}])
+    assert store.versions is None
+    store.update_row(1, {"v": 3})
+    store.update_row(1, {"v": 3})
+    store.append_rows([{"v": 4}])
+    assert [store.version(row) for row in range(3)] == [0, 1, 0]
+
+
+@pytest.mark.asyncio
+async def test_rows_are_formatted_again_only_when_updated() -> None:
+    """Sorting reuses formatted cells and an update formats its row only."""
+    calls: list[CellValue] = []
+
+    def record(value: CellValue) -> str:
+        calls.append(value)
+        return str(value)
+
+    table = PepperTable(columns=[Column("v", "V", formatter=record)])
+    await table.load_data([{"v": i} for i in range(4)])
+    assert table._get_cells(table.columns) == [["0"], ["1"], ["2"], ["3"]]
+    await table.sort_by("-v")
+    assert table._get_cells(table.columns) == [["3"], ["2"], ["1"], ["0"]]
+    assert calls == [0, 1, 2, 3]
+
+    await table.update_rows([1], {"v": 10})
+    assert table._get_cells(table.columns)[0] == ["10"]
+    assert calls == [0, 1, 2, 3, 10]
@@ -0,0 +1,85 @@
+"""Tests for table change highlighting."""
+
+from __future__ import annotations
+
+import pytest
+from rich.console import Console
+from textual.app import App, ComposeResult
+from textual.geometry import Region
+
+from pepperpy.tui.widgets.table import Column, ColumnStore, PepperTable
+from pepperpy.tui.widgets.table.highlight import (
+    HIGHLIGHT_CHANGED,
+    HIGHLIGHT_DOWN,
+    HIGHLIGHT_UP,
+    ChangeHighlights,
+    change_color,
+)
+
+
+@pytest.mark.parametrize(
+    ("old", "new", "color"),
+    [
+        (1, 2, HIGHLIGHT_UP),
+        (2.5, 1, HIGHLIGHT_DOWN),
+        (None, 1, HIGHLIGHT_CHANGED),
+        ("a", "b", HIGHLIGHT_CHANGED),
+        (True, False, HIGHLIGHT_CHANGED),
+    ],
+)
+def test_change_color(old: object, new: object, color: str) -> None:
+    """Numbers that rise or fall get their own color."""
+    assert change_color(old, new) == color  # type: ignore[arg-type]
+
+
+def test_expire_returns_ended_cells() -> None:
+    """Highlights end in change order, cell by cell."""
+    store = ColumnStore(
+        [Column("a", "A"), Column("b", "B")], [{"a": 1, "b": 1}, {"a": 2, "b": 2}]
+    )
+    highlights = ChangeHighlights(duration=1.0)
+    highlights.changed(0, {"a": 0, "b": 0}, store, 0.0)
+    highlights.changed(1, {"a": 0}, store, 0.5)
+    assert highlights.expire(1.2) == [(0, "a"), (0, "b")]
+    assert highlights.rows == {1: 1}
+    assert highlights.expire(2.0) == [(1, "a")]
+    assert not highlights
+
+
+class TableApp(App[None]):
+    """App showing one virtual table."""
+
+    def compose(self) -> ComposeResult:
+        """Create the table."""
+        yield PepperTable(
+            columns=[Column("id", "ID"), Column("name", "Name"), Column("v", "V")],
+            virtual=True,
+            highlight_changes=1.0,
+        )
+
+
+@pytest.mark.asyncio
+async def test_update_repaints_only_the_changed_cell() -> None:
+    """An update refreshes the region of the changed cell, not its line."""
+    app = TableApp()
+    async with app.run_test(size=(60, 20)) as pilot:
+        table = app.query_one(PepperTable)
+        await table.load_data(
+            [{"id": i, "name": f"row {i}", "v": i * 10} for i in range(5)]
+        )
+        await pilot.pause()
+        spans = table._column_spans()
+        assert spans is not None
+
+        # The spans cover the cells Rich renders on a data line.
+        console = Console(width=table.content_size.width, color_system=None)
+        with console.capture() as capture:
+            console.print(table.render())
+        line = capture.get().splitlines()[3]
+        offset, width = spans["name"]
+        assert line[offset : offset + width].strip() == "row 0"
+
+        regions: list[Region] = []
+        table.refresh = lambda *r, **_: regions.extend(r)  # type: ignore[method-assign]
+        await table.update_rows([2], {"name": "renamed"})
+        assert regions == [Region(offset, 3 + 2 * 2, width, 1)]
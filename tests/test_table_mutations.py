@@ -0,0 +1,107 @@
+"""Tests for incremental PepperTable row mutations."""
+
+from __future__ import annotations
+
+import pytest
+
+from pepperpy.tui.widgets.table import Column, ColumnStore, PepperTable, Range
+
+
+def make_table() -> PepperTable:
+    """Create a table with a summed value column."""
+    return PepperTable(
+        columns=[
+            Column("id", "ID", primary_key=True),
+            Column("v", "Value", aggregate="sum"),
+        ],
+        virtual=True,
+    )
+
+
+ROWS = [{"id": f"r{i}", "v": i} for i in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_update_rows_applies_changes_and_bookkeeping() -> None:
+    """Updated values reach the store, sort order and aggregates."""
+    table = make_table()
+    await table.load_data(ROWS)
+    await table.sort_by("v")
+    await table.update_rows([0], {"v": 10})
+    assert table.store.value(0, "v") == 10
+    assert list(table._sort_index.order((("v", False),))) == [1, 2, 3, 4, 0]
+    assert table.aggregates.value("v") == 20
+
+
+@pytest.mark.asyncio
+async def test_update_rows_with_bad_key_changes_nothing() -> None:
+    """A batch with a missing row key is rejected before any change."""
+    table = make_table()
+    await table.load_data(ROWS)
+    with pytest.raises(IndexError):
+        await table.update_rows([0, 99], [{"v": 100}, {"v": 1}])
+    assert table.store.value(0, "v") == 0
+    assert table.store.version(0) == 0
+    assert table.aggregates.value("v") == 10
+
+
+@pytest.mark.asyncio
+async def test_update_rows_with_duplicate_primary_key_changes_nothing() -> None:
+    """A batch that would duplicate a primary key is rejected up front."""
+    table = make_table()
+    await table.load_data(ROWS)
+    with pytest.raises(ValueError, match="primary key"):
+        await table.update_rows([0, 1], [{"v": 7}, {"id": "r2"}])
+    assert table.store.value(0, "v") == 0
+    assert table.find_row("r1") == 1
+
+
+def test_check_updates_allows_moving_a_key_within_a_batch() -> None:
+    """A key released earlier in a batch may be taken by a later row."""
+    store = ColumnStore([Column("id", "ID", primary_key=True)], ROWS)
+    store.check_updates([(0, {"id": "new"}), (1, {"id": "r0"})])
+    with pytest.raises(ValueError, match="primary key"):
+        store.check_updates([(1, {"id": "r0"}), (0, {"id": "new"})])
+
+
+@pytest.mark.asyncio
+async def test_delete_rows_updates_filter_aggregates_and_selection() -> None:
+    """Deleted rows leave the view, the footer and the selection."""
+    table = make_table()
+    await table.load_data(ROWS)
+    await table.filter_by(Range("v", 1, 3))
+    await table.select_rows([1, 2])
+    await table.delete_rows([1])
+    assert table.view_count == 2
+    assert table.aggregates.value("v") == 9
+    assert list(table.selected_rows()) == [2]
+    assert table.find_row("r1") is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("keys", [[1, 1], [1, 99]])
+async def test_delete_rows_with_bad_batch_changes_nothing(keys: list[int]) -> None:
+    """Duplicate or missing keys are rejected before any row is deleted."""
+    table = make_table()
+    await table.load_data(ROWS)
+    with pytest.raises((IndexError, ValueError)):
+        await table.delete_rows(keys)
+    assert not table.store.is_deleted(1)
+    assert table.view_count == 5
+    assert table.aggregates.value("v") == 10
+
+
+@pytest.mark.parametrize("ratio", [1, 64])
+def test_live_rows_follow_appends_and_deletes(
+    monkeypatch: pytest.MonkeyPatch,
+    ratio: int,
+) -> None:
+    """The live row array is patched in place rather than rebuilt."""
+    monkeypatch.setattr("pepperpy.tui.widgets.table.store.LIVE_PATCH_RATIO", ratio)
+    store = ColumnStore([Column("v", "Value")], [{"v": i} for i in range(6)])
+    store.delete_rows([1])
+    live = store.live_rows()
+    store.append_rows([{"v": 6}, {"v": 7}])
+    store.delete_rows([0, 7])
+    assert store.live_rows() is live
+    assert list(live) == [2, 3, 4, 5, 6]
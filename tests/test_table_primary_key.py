@@ -0,0 +1,73 @@
+"""Tests for primary key lookups and upserts."""
+
+from __future__ import annotations
+
+import pytest
+
+from pepperpy.tui.widgets.table import Column, ColumnStore, PepperTable
+
+
+def make_table() -> PepperTable:
+    """Create a table keyed by host name."""
+    return PepperTable(
+        columns=[
+            Column("host", "Host", primary_key=True),
+            Column("status", "Status"),
+            Column("load", "Load"),
+        ],
+        virtual=True,
+    )
+
+
+def test_load_rejects_missing_and_duplicate_keys() -> None:
+    """Every row needs its own primary key."""
+    columns = [Column("id", "ID", primary_key=True)]
+    with pytest.raises(ValueError, match="Missing primary key"):
+        ColumnStore(columns, [{"id": 1}, {}])
+    with pytest.raises(ValueError, match="Duplicate primary key"):
+        ColumnStore(columns, [{"id": 1}, {"id": 1}])
+
+
+def test_store_without_primary_key_has_no_index() -> None:
+    """Stores without a primary key do not index rows."""
+    store = ColumnStore([Column("v", "V")], [{"v": 1}, {"v": 1}])
+    assert store.key_index == {}
+    assert store.find(1) is None
+
+
+@pytest.mark.asyncio
+async def test_upsert_updates_and_appends_by_key() -> None:
+    """Known keys are updated in place and new keys appended once."""
+    table = make_table()
+    await table.load_data([{"host": "a", "status": "up", "load": 1}])
+    keys = await table.upsert_rows(
+        [
+            {"host": "a", "status": "down"},
+            {"host": "b", "status": "up"},
+            {"host": "b", "load": 5},
+        ]
+    )
+    assert keys == [0, 1, 1]
+    assert table.store.row(0) == {"host": "a", "status": "down", "load": 1}
+    assert table.store.row(1) == {"host": "b", "status": "up", "load": 5}
+
+
+@pytest.mark.asyncio
+async def test_upsert_rejects_rows_without_key() -> None:
+    """Rows without a primary key cannot be matched."""
+    table = make_table()
+    with pytest.raises(ValueError, match="without primary key"):
+        await table.upsert_rows([{"status": "up"}])
+
+
+@pytest.mark.asyncio
+async def test_key_index_follows_updates_and_deletes() -> None:
+    """Changing or deleting a key updates the lookup."""
+    table = make_table()
+    await table.load_data([{"host": "a"}, {"host": "b"}])
+    await table.update_rows([0], {"host": "c"})
+    assert table.find_row("a") is None
+    assert table.find_row("c") == 0
+    await table.delete_rows([1])
+    assert table.find_row("b") is None
+    assert await table.upsert_rows([{"host": "b"}]) == [2]
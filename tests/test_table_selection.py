@@ -0,0 +1,73 @@
+"""Tests for bitmap row selection."""
+
+from __future__ import annotations
+
+import pytest
+
+from pepperpy.tui.widgets.table import Column, PepperTable, Range, RowSelection
+
+
+def test_selection_iterates_in_order_across_words() -> None:
+    """Rows are yielded in ascending order, whichever word holds them."""
+    selection = RowSelection()
+    rows = [200, 0, 63, 64, 7, 129]
+    assert selection.update(rows) == rows
+    assert selection.update([7, 8]) == [8]
+    assert list(selection) == sorted([*rows, 8])
+    assert len(selection) == 7
+    assert selection.difference_update([63, 1]) == [63]
+    assert 63 not in selection
+    assert -1 not in selection
+    assert "0" not in selection
+
+
+def test_select_all_flips_instead_of_setting_bits() -> None:
+    """A select-all takes no bitmap, and left out rows take their bit."""
+    selection = RowSelection()
+    selection.add(3)
+    selection.select_all(100, 100)
+    assert selection.nbytes == 0
+    assert selection.discard(50)
+    assert not selection.discard(50)
+    assert len(selection) == 99
+    assert 50 not in selection
+    assert 99 in selection
+    assert 100 not in selection
+    selection.add(150)
+    assert list(selection)[-3:] == [98, 99, 150]
+    selection.clear()
+    assert not selection
+    assert list(selection) == []
+
+
+def make_table() -> PepperTable:
+    """Create a table with one value column."""
+    return PepperTable(columns=[Column("v", "Value")], virtual=True)
+
+
+@pytest.mark.asyncio
+async def test_select_all_follows_the_filter() -> None:
+    """Select-all takes every row, or only the rows the filter shows."""
+    table = make_table()
+    await table.load_data([{"v": i} for i in range(6)])
+    await table.select_all()
+    assert list(table.selected_rows()) == list(range(6))
+
+    await table.filter_by(Range("v", 2, 3))
+    await table.select_all()
+    assert list(table.selected_rows()) == [2, 3]
+
+
+@pytest.mark.asyncio
+async def test_selection_keeps_row_keys_across_sorts() -> None:
+    """Rows stay selected by key when the view is sorted."""
+    table = make_table()
+    await table.load_data([{"v": i} for i in range(5)])
+    await table.sort_by("-v")
+    await table.select_range(0, 2)
+    assert list(table.selected_rows()) == [3, 4]
+    await table.toggle_row(4)
+    await table.sort_by("v")
+    assert list(table.selected_rows()) == [3]
+    with pytest.raises(IndexError):
+        await table.select_rows([9])
@@ -0,0 +1,162 @@
+"""Tests for cached multi-column table sorting."""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from pepperpy.tui.widgets.table import Column, ColumnStore, PepperTable
+from pepperpy.tui.widgets.table.sort import SortIndex, parse_sort_keys
+from pepperpy.tui.widgets.table.store import INT_MIN, sorted_in_blocks
+
+ROWS = [
+    {"region": "eu", "latency": 30, "tag": 1},
+    {"region": "us", "latency": 40, "tag": "b"},
+    {"region": "eu", "latency": 10, "tag": None},
+    {"region": None, "latency": 20, "tag": "a"},
+    {"region": "us", "latency": 10, "tag": 2.5},
+]
+
+
+def make_index() -> SortIndex:
+    """Create a sort index over rows with nulls and mixed types."""
+    columns = [Column(key, key.title()) for key in ("region", "latency", "tag")]
+    return SortIndex(ColumnStore(columns, ROWS))
+
+
+def test_parse_sort_keys() -> None:
+    """A leading minus sorts a column in descending order."""
+    assert parse_sort_keys(["region", "-latency"]) == (
+        ("region", False),
+        ("latency", True),
+    )
+
+
+def test_multi_column_sort_puts_nulls_last() -> None:
+    """Ties on the first key are broken by the next, null keys last."""
+    index = make_index()
+    order = index.order(parse_sort_keys(["region", "-latency"]))
+    assert list(order) == [0, 2, 1, 4, 3]
+
+
+def test_mixed_column_sorts_numbers_before_text() -> None:
+    """Object columns order numbers, then text, then nulls."""
+    assert list(make_index().order((("tag", False),))) == [0, 4, 3, 1, 2]
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+def test_descending_sorts_put_nulls_last(
+    monkeypatch: pytest.MonkeyPatch,
+    numpy: bool,
+) -> None:
+    """Nulls stay last in descending and reversed sorts alike."""
+    if not numpy:
+        monkeypatch.setattr("pepperpy.tui.widgets.table.sort.np", None)
+    index = make_index()
+    # Reversed views also reverse ties, but not the null rows.
+    assert list(index.order((("region", True),))) == [4, 1, 2, 0, 3]
+    assert list(index.order((("region", False),), reverse=True)) == [4, 1, 2, 0, 3]
+    spec = parse_sort_keys(["-tag", "region"])
+    assert list(index.order(spec)) == [1, 3, 4, 0, 2]
+    assert list(index.sort_rows(spec, [0, 2, 3])) == [3, 0, 2]
+    rows = index.sort_rows((("region", False),), [2, 3, 4], reverse=True)
+    assert list(rows) == [4, 2, 3]
+
+
+def test_descending_sort_of_smallest_integer() -> None:
+    """The smallest 64-bit integer sorts last in descending order."""
+    store = ColumnStore([Column("n", "N")], [{"n": INT_MIN}, {"n": 0}, {"n": None}])
+    assert list(SortIndex(store).order((("n", True), ("n", False)))) == [1, 0, 2]
+
+
+@pytest.mark.asyncio
+async def test_sorting_again_flips_every_key() -> None:
+    """A repeated sort flips each column and keeps the nulls last."""
+    columns = [Column(key, key.title()) for key in ("region", "latency", "tag")]
+    table = PepperTable(columns=columns, virtual=True)
+    await table.load_data(ROWS)
+    await table.sort_by(["region", "-latency"])
+    await table.sort_by(["region", "-latency"])
+    assert table.sort_reverse
+    assert list(table._get_sorted_rows()) == [4, 1, 2, 0, 3]
+
+
+def test_reversed_order_is_cached_view() -> None:
+    """Reversing reuses the cached permutation."""
+    index = make_index()
+    spec = (("latency", False),)
+    forward = list(index.order(spec))
+    assert list(index.order(spec, reverse=True)) == forward[::-1]
+    assert index.is_cached(spec)
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+def test_appended_rows_are_merged_into_cached_orders(
+    monkeypatch: pytest.MonkeyPatch,
+    numpy: bool,
+) -> None:
+    """Merging appended rows gives the order of a new sort."""
+    if not numpy:
+        monkeypatch.setattr("pepperpy.tui.widgets.table.sort.np", None)
+    monkeypatch.setattr("pepperpy.tui.widgets.table.sort.MERGE_RATIO", 1)
+    index = make_index()
+    specs = [parse_sort_keys(["region", "-latency"]), (("tag", False),)]
+    for spec in specs:
+        index.order(spec)
+    index.store.append_rows(
+        [
+            {"region": "eu", "latency": 30, "tag": "a"},
+            {"region": None, "latency": None, "tag": 0},
+        ]
+    )
+    index.rows_appended(range(5, 7))
+    for spec in specs:
+        assert index.is_cached(spec)
+        assert list(index.order(spec)) == list(SortIndex(index.store).order(spec))
+
+
+def test_sorted_in_blocks_matches_sorted(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Merging sorted blocks gives the same stable order as one sort."""
+    monkeypatch.setattr("pepperpy.tui.widgets.table.store.SORT_BLOCK", 7)
+    rng = random.Random(1)
+    values = [f"{rng.randrange(10)}-{index}" for index in range(100)]
+
+    def first_digit(value: object) -> str:
+        # Leaves ties, which must keep their input order.
+        return str(value)[0]
+
+    assert sorted_in_blocks(values, first_digit) == sorted(values, key=first_digit)
+
+
+@pytest.mark.asyncio
+async def test_prepare_caches_the_order() -> None:
+    """A sort prepared on a worker thread matches a direct sort."""
+    index = make_index()
+    spec = parse_sort_keys(["region", "-latency"])
+    await index.prepare(spec)
+    assert index.is_cached(spec)
+    assert list(index.order(spec)) == list(make_index().order(spec))
+
+
+@pytest.mark.asyncio
+async def test_prepare_sorts_again_after_a_change() -> None:
+    """A change while sorting drops the stale result."""
+    index = make_index()
+    spec = (("latency", False),)
+    await index.prepare(spec)
+    index.store.update_row(0, {"latency": 5})
+    index.invalidate(["latency"])
+    assert not index.is_cached(spec)
+    await index.prepare(spec)
+    assert list(index.order(spec))[0] == 0
+
+
+def test_invalidate_drops_only_the_given_columns() -> None:
+    """Sorts by columns that did not change keep their permutation."""
+    index = make_index()
+    latency = index.order((("latency", False),))
+    region = index.order((("region", False),))
+    index.invalidate(["region"])
+    assert index.order((("latency", False),)) is latency
+    assert index.order((("region", False),)) is not region
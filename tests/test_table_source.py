@@ -0,0 +1,183 @@
+"""Tests for paged table data sources."""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import sqlite3
+from typing import TYPE_CHECKING
+
+import pytest
+
+from pepperpy.tui.widgets.table import (
+    And,
+    Contains,
+    Eq,
+    Or,
+    PagedRows,
+    Range,
+    Regex,
+    SQLiteSource,
+    TableDataSource,
+)
+from pepperpy.tui.widgets.table.source import predicate_to_sql
+
+if TYPE_CHECKING:
+    from pepperpy.tui.widgets.table.filter import Predicate
+    from pepperpy.tui.widgets.table.sort import SortSpec
+    from pepperpy.tui.widgets.table.store import Row
+
+
+class ListSource:
+    """Source over a list of rows, recording the fetched offsets."""
+
+    def __init__(self, size: int) -> None:
+        """Create rows numbered from zero."""
+        self.rows: list[Row] = [{"n": i} for i in range(size)]
+        self.fetched: list[int] = []
+        self.gate: asyncio.Event | None = None
+
+    async def count(self, predicate: Predicate | None = None) -> int:
+        """Count every row."""
+        return len(self.rows)
+
+    async def fetch(
+        self,
+        offset: int,
+        limit: int,
+        sort: SortSpec = (),
+        predicate: Predicate | None = None,
+    ) -> list[Row]:
+        """Fetch rows, waiting for the gate when one is set."""
+        if self.gate is not None:
+            await self.gate.wait()
+        self.fetched.append(offset)
+        return self.rows[offset : offset + limit]
+
+
+async def settle() -> None:
+    """Let pending page fetches finish."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_sources_match_protocol() -> None:
+    """Sources are recognized by their methods."""
+    assert isinstance(ListSource(0), TableDataSource)
+
+
+@pytest.mark.asyncio
+async def test_request_fetches_window_and_prefetches_ahead() -> None:
+    """The pages of the window and the next one are fetched."""
+    source = ListSource(100)
+    arrived: list[int] = []
+    pages = PagedRows(source, page_size=10, max_pages=4, on_page=arrived.append)
+    assert await pages.reset() == 100
+    assert pages.row(0) is None
+    pages.request(5, 15)
+    await settle()
+    assert sorted(arrived) == [0, 1, 2]
+    assert pages.row(12) == {"n": 12}
+
+    pages.request(40, 50, direction=-1)
+    await settle()
+    assert sorted(source.fetched) == [0, 10, 20, 30, 40]
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_pages_are_dropped() -> None:
+    """Only ``max_pages`` pages stay cached, least recently read first."""
+    source = ListSource(100)
+    pages = PagedRows(source, page_size=10, max_pages=3)
+    await pages.reset()
+    # Scrolling up prefetches the page before: 0, then 3 and 2.
+    for start in (0, 30):
+        pages.request(start, start + 1, direction=-1)
+        await settle()
+    assert pages.row(0) == {"n": 0}
+    pages.request(60, 61, direction=-1)
+    await settle()
+    assert pages.row(0) == {"n": 0}
+    assert pages.row(30) is None
+    assert pages.row(20) is None
+    assert pages.row(50) == {"n": 50}
+
+
+@pytest.mark.asyncio
+async def test_pages_scrolled_away_or_stale_are_not_kept() -> None:
+    """Fetches leaving the window are cancelled, older results dropped."""
+    source = ListSource(100)
+    source.gate = asyncio.Event()
+    pages = PagedRows(source, page_size=10)
+    await pages.reset()
+    pages.request(0, 10)
+    await asyncio.sleep(0)
+    pages.request(50, 60)
+    await pages.reset(sort=(("n", True),))
+    source.gate.set()
+    await settle()
+    assert source.fetched == []
+    assert pages.row(0) is None
+
+
+def test_predicates_translate_to_sql() -> None:
+    """Filters become conditions with parameters, in term order."""
+    where, params = predicate_to_sql(
+        And(Range("a", 1, None), Or(Eq("b", None), Contains("c", "X")))
+    )
+    assert where == (
+        '("a" IS NOT NULL AND "a" >= ?) AND (("b" IS NULL) OR '
+        '(instr(casefold("c"), ?) > 0))'
+    )
+    assert params == [1, "x"]
+    assert predicate_to_sql(Regex("a", "x", re.IGNORECASE)) == (
+        '"a" REGEXP ?',
+        ["(?i)x"],
+    )
+    assert predicate_to_sql(Regex("a", "x", re.VERBOSE | re.UNICODE))[1] == ["(?x)x"]
+    assert predicate_to_sql(Or()) == ("0", [])
+
+
+def test_unsupported_regex_flags_are_rejected() -> None:
+    """Flags that cannot be written into the pattern are an error."""
+    with pytest.raises(ValueError, match="flags"):
+        predicate_to_sql(Regex("a", "x", re.DEBUG))
+
+
+@pytest.mark.asyncio
+async def test_sqlite_source_sorts_filters_and_pages() -> None:
+    """Rows come back sorted with nulls last both ways, filtered and paged."""
+    connection = sqlite3.connect(":memory:", check_same_thread=False)
+    connection.execute("CREATE TABLE t (name TEXT, v INTEGER)")
+    connection.executemany(
+        "INSERT INTO t VALUES (?, ?)",
+        [("a", 3), ("b", None), ("c", 1), ("ab", 2)],
+    )
+    source = SQLiteSource(connection, "t")
+    try:
+        rows = await source.fetch(0, 3, (("v", False),))
+        assert [row["name"] for row in rows] == ["c", "ab", "a"]
+        rows = await source.fetch(1, 10, (("v", True),))
+        assert [row["name"] for row in rows] == ["ab", "c", "b"]
+        assert await source.count(Regex("name", "^a")) == 2
+    finally:
+        source.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_contains_folds_case_like_the_table() -> None:
+    """Case-insensitive matches fold non-ASCII text as in memory."""
+    connection = sqlite3.connect(":memory:", check_same_thread=False)
+    connection.execute("CREATE TABLE t (name TEXT)")
+    names = ["Straße", "ÉCOLE", "école", None]
+    connection.executemany("INSERT INTO t VALUES (?)", [(name,) for name in names])
+    source = SQLiteSource(connection, "t")
+    try:
+        for predicate, count in (
+            (Contains("name", "STRASSE"), 1),
+            (Contains("name", "écol"), 2),
+        ):
+            assert sum(predicate.test(name) for name in names) == count
+            assert await source.count(predicate) == count
+    finally:
+        source.close()
@@ -0,0 +1,77 @@
+"""Tests for SQLite-backed tables with query pushdown."""
+
+from __future__ import annotations
+
+import pytest
+
+from pepperpy.tui.widgets.table import Column, Eq, Range, SQLiteTable
+from pepperpy.tui.widgets.table.aggregate import Accumulator
+
+COLUMNS = [
+    Column("host", "Host"),
+    Column("region", "Region"),
+    Column("latency", "Latency", dtype="float"),
+    Column("up", "Up", dtype="bool"),
+]
+
+ROWS = [
+    {"host": f"h{i}", "region": "eu" if i % 3 else "us", "latency": i * 1.5}
+    for i in range(40)
+] + [{"host": "idle", "region": "eu", "latency": None, "up": True}]
+
+
+@pytest.mark.asyncio
+async def test_insert_and_fetch_keep_types() -> None:
+    """Rows come back with booleans restored and missing keys as null."""
+    source = SQLiteTable(COLUMNS)
+    assert await source.insert_rows(ROWS, batch_size=7) == len(ROWS)
+    rows = await source.fetch(0, 2, (("latency", True),), Eq("region", "eu"))
+    assert [row["host"] for row in rows] == ["h38", "h37"]
+    assert rows[0]["up"] is None
+    rows = await source.fetch(0, 1, (("up", True),))
+    assert rows[0]["host"] == "idle"
+    assert rows[0]["up"] is True
+    source.close()
+
+
+@pytest.mark.asyncio
+async def test_sorts_and_filters_create_indexes_once() -> None:
+    """Each direction of a sort and each filtered column get one index."""
+    source = SQLiteTable(COLUMNS)
+    await source.insert_rows(ROWS)
+    await source.fetch(0, 10, (("latency", False),), Range("latency", 3, None))
+    await source.fetch(0, 10, (("latency", True),))
+    await source.fetch(10, 10, (("latency", True),), Range("latency", 5, None))
+    assert source.indexes == {
+        "rows_sort_latency",
+        "rows_sort_latency_desc",
+        "rows_latency",
+    }
+    source.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("kind", ["count", "sum", "mean", "min", "max", "p95"])
+async def test_aggregates_match_in_memory_results(kind: str) -> None:
+    """SQL aggregates agree with the in-memory accumulators, per group too."""
+    source = SQLiteTable(COLUMNS)
+    await source.insert_rows(ROWS)
+    total, groups = await source.aggregate(
+        {"latency": kind},  # type: ignore[dict-item]
+        Range("latency", 2, None),
+        group_key="region",
+    )
+    expected: dict[str, Accumulator] = {}
+    overall = Accumulator(ordered=True)
+    for row in ROWS:
+        value = row["latency"]
+        if value is None or value < 2:
+            continue
+        overall.add(value)
+        expected.setdefault(row["region"], Accumulator(ordered=True)).add(value)
+    assert total["latency"] == pytest.approx(overall.result(kind))  # type: ignore[arg-type]
+    assert {region: group["latency"] for region, group in groups.items()} == {
+        region: pytest.approx(accumulator.result(kind))  # type: ignore[arg-type]
+        for region, accumulator in expected.items()
+    }
+    source.close()
@@ -0,0 +1,92 @@
+"""Tests for the columnar table store."""
+
+from __future__ import annotations
+
+import pytest
+
+from pepperpy.tui.widgets.table import Column, ColumnStore
+from pepperpy.tui.widgets.table.store import (
+    INT_MAX,
+    ColumnArray,
+    DictColumn,
+    FloatColumn,
+    IntColumn,
+    infer_type,
+    value_type,
+)
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        (None, "auto"),
+        (True, "bool"),
+        (1, "int"),
+        (INT_MAX + 1, "object"),
+        (1.5, "float"),
+        ("a", "str"),
+    ],
+)
+def test_value_type(value: object, expected: str) -> None:
+    """Values map to the narrowest storage type."""
+    assert value_type(value) == expected  # type: ignore[arg-type]
+
+
+def test_infer_type_widens_mixed_values() -> None:
+    """Ints and floats share float storage, other mixes are objects."""
+    assert infer_type([1, None, 2.5]) == "float"
+    assert infer_type([1, "a"]) == "object"
+    assert infer_type([None]) == "auto"
+
+
+def test_column_array_is_abstract() -> None:
+    """Incomplete column types cannot be created."""
+    with pytest.raises(TypeError):
+        ColumnArray()  # type: ignore[abstract]
+
+
+def test_columns_are_typed_and_widen_on_update() -> None:
+    """Columns start typed and widen when an update does not fit."""
+    rows = [{"n": i, "s": "ab"[i % 2]} for i in range(10)]
+    store = ColumnStore([Column("n", "N"), Column("s", "S")], rows)
+    assert isinstance(store.column("n"), IntColumn)
+    assert isinstance(store.column("s"), DictColumn)
+
+    store.update_row(3, {"n": 2.5})
+    assert isinstance(store.column("n"), FloatColumn)
+    store.update_row(4, {"n": None})
+    assert list(store.column("n"))[2:6] == [2, 2.5, None, 5]
+
+    store.update_row(0, {"s": 7})
+    assert store.column("s").dtype == "object"
+    assert [store.value(i, "s") for i in range(3)] == [7, "b", "a"]
+
+
+def test_snapshot_is_independent() -> None:
+    """Changes after a snapshot do not reach the copy."""
+    column = DictColumn(["a", "b", None])
+    copy = column.snapshot()
+    column.set(0, "c")
+    column.extend(["d"])
+    assert list(copy) == ["a", "b", None]
+    assert list(column) == ["c", "b", None, "d"]
+
+
+def test_column_of_nulls_is_typed_by_first_value() -> None:
+    """Appending nulls keeps the column as is, the first value types it."""
+    store = ColumnStore([Column("n", "N")], [{"n": None}])
+    column = store.column("n")
+    store.append_columns({"n": [None, None]}, 2)
+    assert store.column("n") is column
+    store.append_columns({"n": [None, 4]}, 2)
+    assert isinstance(store.column("n"), IntColumn)
+    assert list(store.column("n")) == [None, None, None, None, 4]
+
+
+def test_bad_column_batch_changes_nothing() -> None:
+    """A batch with a short column is rejected before any column grows."""
+    store = ColumnStore([Column("a", "A"), Column("b", "B")], [{"a": 1, "b": 2}])
+    with pytest.raises(ValueError, match="'b'"):
+        store.append_columns({"a": [3, 4], "b": [5]}, 2)
+    assert len(store.column("a")) == len(store.column("b")) == 1
+    assert store.row_count == 1
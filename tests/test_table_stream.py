@@ -0,0 +1,89 @@
+"""Tests for streaming rows into tables."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import pytest
+
+from pepperpy.tui.widgets.table import Column, PepperTable
+from pepperpy.tui.widgets.table.stream import batch_rows
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+    from pepperpy.tui.widgets.table.store import Row
+
+
+async def produce(count: int, pause_after: int | None = None) -> AsyncIterator[Row]:
+    """Yield numbered rows, pausing once after some of them."""
+    for i in range(count):
+        if i == pause_after:
+            await asyncio.sleep(0.05)
+        yield {"n": i}
+
+
+async def collect(batches: AsyncIterator[list[Row]]) -> list[list[int]]:
+    """Get the row numbers of each batch."""
+    return [[row["n"] for row in batch] async for batch in batches]  # type: ignore[misc]
+
+
+@pytest.mark.asyncio
+async def test_rows_are_grouped_by_size() -> None:
+    """Full batches are yielded, then the rest."""
+    batches = await collect(batch_rows(produce(7), batch_size=3))
+    assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+@pytest.mark.asyncio
+async def test_waiting_rows_are_flushed_after_the_latency() -> None:
+    """A slow producer does not hold back the rows already read."""
+    batches = await collect(
+        batch_rows(produce(4, pause_after=2), batch_size=10, max_latency=0.01)
+    )
+    assert batches == [[0, 1], [2, 3]]
+
+
+@pytest.mark.asyncio
+async def test_producer_is_not_pulled_past_the_buffer() -> None:
+    """Rows are read ahead only up to ``max_pending``."""
+    pulled = 0
+
+    async def source() -> AsyncIterator[Row]:
+        nonlocal pulled
+        for i in range(100):
+            pulled += 1
+            yield {"n": i}
+
+    batches = batch_rows(source(), batch_size=2, max_pending=4)
+    assert len(await batches.__anext__()) == 2
+    for _ in range(5):
+        await asyncio.sleep(0)
+    assert pulled <= 2 + 4 + 1
+    await batches.aclose()  # type: ignore[attr-defined]
+
+
+@pytest.mark.asyncio
+async def test_producer_errors_reach_the_consumer() -> None:
+    """Rows before a failure are yielded, then the error is raised."""
+
+    async def failing() -> AsyncIterator[Row]:
+        yield {"n": 0}
+        error_msg = "Connection lost"
+        raise ConnectionError(error_msg)
+
+    batches = batch_rows(failing(), batch_size=5)
+    assert [row["n"] for row in await batches.__anext__()] == [0]
+    with pytest.raises(ConnectionError, match="lost"):
+        await batches.__anext__()
+
+
+@pytest.mark.asyncio
+async def test_consume_appends_each_batch_once() -> None:
+    """Every row is appended, with one event per batch."""
+    table = PepperTable(columns=[Column("n", "N")], virtual=True)
+    assert await table.consume(produce(5), batch_size=2) == 5
+    assert [table.store.value(row, "n") for row in range(5)] == list(range(5))
+    counts = [data["count"] for kind, data in table.events if kind == "rows_appended"]
+    assert counts == [2, 2, 1]
@@ -0,0 +1,62 @@
+"""Tests for viewport-virtualized table rendering."""
+
+from __future__ import annotations
+
+import pytest
+from textual.app import App, ComposeResult
+
+from pepperpy.tui.widgets.table import Column, PepperTable
+
+formatted: list[object] = []
+
+
+def record(value: object) -> str:
+    """Format a value, recording that it was formatted."""
+    formatted.append(value)
+    return str(value)
+
+
+class TableApp(App[None]):
+    """App showing one virtual table."""
+
+    def compose(self) -> ComposeResult:
+        """Create the table."""
+        yield PepperTable(
+            columns=[Column("n", "N", formatter=record)],
+            virtual=True,
+            overscan=2,
+        )
+
+
+@pytest.mark.asyncio
+async def test_only_the_window_and_overscan_are_formatted() -> None:
+    """Rendering a large table formats the rows on screen and a few more."""
+    app = TableApp()
+    async with app.run_test(size=(40, 20)) as pilot:
+        table = app.query_one(PepperTable)
+        formatted.clear()
+        await table.load_data([{"n": i} for i in range(100_000)])
+        await pilot.pause()
+        size = table.page_size
+        assert size == (table.content_size.height - 3) // 2
+        assert list(table._window_rows) == list(range(size))
+        assert sorted(formatted) == list(range(size + 2))  # type: ignore[type-var]
+
+
+@pytest.mark.asyncio
+async def test_scrolling_is_clamped_to_the_last_page() -> None:
+    """The window never starts past the last full page."""
+    app = TableApp()
+    async with app.run_test(size=(40, 20)) as pilot:
+        table = app.query_one(PepperTable)
+        await table.load_data([{"n": i} for i in range(50)])
+        await pilot.pause()
+        table.action_scroll_end()
+        assert table.scroll_row == 50 - table.page_size
+        table.action_scroll_page(-1)
+        assert table.scroll_row == 50 - 2 * table.page_size
+        table.action_scroll_rows(-100)
+        assert table.scroll_row == 0
+        table.scroll_to_row(45)
+        table.render()
+        assert list(table._window_rows)[-1] == 49
@@ -0,0 +1,57 @@
+"""Tests for sampled column width measurement."""
+
+from __future__ import annotations
+
+from pepperpy.tui.widgets.table import Column
+from pepperpy.tui.widgets.table.width import ColumnWidths
+
+
+def test_sample_is_bounded_and_independent_of_batching() -> None:
+    """The reservoir keeps its size, whatever batches the rows come in."""
+    whole = ColumnWidths(sample_size=16, seed=3)
+    whole.add_rows(range(10_000))
+    batched = ColumnWidths(sample_size=16, seed=3)
+    for start in range(0, 10_000, 7):
+        batched.add_rows(range(start, min(start + 7, 10_000)))
+    assert len(whole.sample) == 16
+    assert batched.sample == whole.sample
+    assert len(set(whole.sample)) == 16
+
+
+def test_sample_covers_the_rows_uniformly() -> None:
+    """Rows late in the data are sampled as often as early ones."""
+    late = 0
+    for seed in range(200):
+        widths = ColumnWidths(sample_size=10, seed=seed)
+        widths.add_rows(range(1_000))
+        late += sum(row >= 500 for row in widths.sample)
+    assert 850 < late < 1_150
+
+
+def test_widths_grow_to_fit_labels_cells_and_sample() -> None:
+    """Widths fit wide characters and never shrink."""
+    columns = [Column("name", "Name"), Column("v", "Value")]
+    rows = {0: ["a", "1"], 1: ["日本語", "12"]}
+    widths = ColumnWidths(sample_size=4, seed=0)
+    widths.add_rows([0, 1])
+    assert widths.measure(columns, [], rows.get) == {"name": 6, "v": 5}
+    assert widths.measure(columns, [["b", "1234567"]]) == {"name": 6, "v": 7}
+    assert widths.measure(columns, [["c", "1"]]) == {"name": 6, "v": 7}
+
+
+def test_sampled_rows_are_formatted_once() -> None:
+    """Rows are formatted when sampled, and again for a new column."""
+    formatted: list[int] = []
+
+    def format_row(row: int) -> list[str]:
+        formatted.append(row)
+        return [str(row), "x"]
+
+    widths = ColumnWidths(sample_size=4, seed=0)
+    widths.add_rows(range(4))
+    columns = [Column("a", "A")]
+    widths.measure(columns, [], format_row)
+    widths.measure(columns, [], format_row)
+    assert formatted == [0, 1, 2, 3]
+    widths.measure([*columns, Column("b", "B")], [], format_row)
+    assert formatted == [0, 1, 2, 3, 0, 1, 2, 3]
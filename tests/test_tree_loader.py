@@ -0,0 +1,132 @@
+"""Tests for deferred tree children and their async loader."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import pytest
+
+from pepperpy.tui.widgets.tree_loader import ChildLoader, TreeDataProvider
+from pepperpy.tui.widgets.tree_model import DEFERRED, LOADING, FlatTree, TreeRow
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from pepperpy.tui.widgets.tree_view import NodeData
+
+
+class SlowProvider:
+    """Provider whose loads wait until released, counting those running."""
+
+    def __init__(self) -> None:
+        """Initialize without loads."""
+        self.release = asyncio.Event()
+        self.running = 0
+        self.peak = 0
+        self.calls: list[tuple[str, ...]] = []
+
+    async def load_children(
+        self,
+        path: Sequence[str],
+    ) -> dict[str, NodeData] | list[NodeData]:
+        """Return two children once released."""
+        self.calls.append(tuple(path))
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await self.release.wait()
+        finally:
+            self.running -= 1
+        if path[-1] == "bad":
+            raise RuntimeError
+        return {"x": 1, "y": DEFERRED}
+
+
+def test_deferred_row_shows_a_loading_placeholder() -> None:
+    """Expanding a deferred row shows one placeholder until children arrive."""
+    tree = FlatTree({"a": DEFERRED})
+    row = tree[0]
+    assert row.has_children
+    assert tree.expand(row) == 1
+    assert row.loading
+    assert tree[1].data is LOADING
+
+    children = [TreeRow(label, None, 1, row) for label in "xyz"]
+    assert tree.set_children(row, children) == 2
+    assert not row.loading
+    assert [r.label for r in tree.window(0, 5)] == ["a", "x", "y", "z"]
+
+
+def test_release_children_requires_a_collapsed_row() -> None:
+    """Only collapsed rows give their children back."""
+    tree = FlatTree({"a": {"b": 1}})
+    row = tree[0]
+    tree.expand(row)
+    with pytest.raises(ValueError, match="expanded"):
+        tree.release_children(row)
+    tree.collapse(row)
+    released = tree.release_children(row)
+    assert [child.label for child in released or ()] == ["b"]
+
+
+def test_provider_matches_protocol() -> None:
+    """Providers are recognized by their method."""
+    assert isinstance(SlowProvider(), TreeDataProvider)
+
+
+@pytest.mark.asyncio
+async def test_loads_are_limited_and_reported() -> None:
+    """At most ``max_loads`` loads run, and each result is reported."""
+    provider = SlowProvider()
+    loaded: dict[str, list[str] | None] = {}
+
+    def on_load(row: TreeRow, children: list[TreeRow] | None) -> None:
+        loaded[row.label] = None if children is None else [c.label for c in children]
+
+    loader = ChildLoader(provider, max_loads=2, on_load=on_load)
+    rows = [TreeRow(label, DEFERRED) for label in ("a", "b", "bad")]
+    for row in rows:
+        loader.request(row)
+    loader.request(rows[0])
+    await asyncio.sleep(0)
+    assert provider.running == 2
+    provider.release.set()
+    while any(loader.is_loading(row) for row in rows):
+        await asyncio.sleep(0)
+    assert provider.peak == 2
+    assert len(provider.calls) == 3
+    assert loaded == {"a": ["x", "y"], "b": ["x", "y"], "bad": None}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_load_is_not_reported() -> None:
+    """Cancelling a load drops its result."""
+    provider = SlowProvider()
+    reported: list[TreeRow] = []
+    loader = ChildLoader(provider, on_load=lambda row, _: reported.append(row))
+    row = TreeRow("a", DEFERRED)
+    loader.request(row)
+    await asyncio.sleep(0)
+    loader.cancel(row)
+    provider.release.set()
+    await asyncio.sleep(0)
+    assert not loader.is_loading(row)
+    assert reported == []
+    assert provider.running == 0
+
+
+def test_collapsed_subtrees_are_kept_least_recently_used() -> None:
+    """The oldest subtree is dropped when the cache is full."""
+    loader = ChildLoader(SlowProvider(), cache_size=2)
+    rows = [TreeRow(label, DEFERRED) for label in "abc"]
+    for row in rows:
+        loader.store(row, [TreeRow("child", None, 1, row)])
+    assert loader.take(rows[0]) is None
+
+    # A new row with the same path takes over the cached children.
+    again = TreeRow("b", DEFERRED)
+    children = loader.take(again)
+    assert children is not None
+    assert children[0].parent is again
+    assert loader.take(again) is None
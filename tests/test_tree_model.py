@@ -0,0 +1,78 @@
+"""Tests for the flattened virtual tree model."""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from pepperpy.tui.widgets.tree_model import FlatTree, TreeRow, VisibleCounts
+
+
+def make_data(depth: int = 3, width: int = 4) -> dict:
+    """Create a full tree of dicts with integer leaves."""
+    if not depth:
+        return dict.fromkeys(map(str, range(width)), 0)
+    return {str(i): make_data(depth - 1, width) for i in range(width)}
+
+
+def expected_rows(rows: list[TreeRow]) -> list[TreeRow]:
+    """Walk the visible rows the slow way."""
+    visible = []
+    for row in rows:
+        visible.append(row)
+        if row.is_expanded:
+            visible.extend(expected_rows(row.children))
+    return visible
+
+
+def test_visible_counts_prefix_and_search() -> None:
+    """Prefix sums and searches agree with a plain list."""
+    counts = [3, 1, 4, 1, 5, 9, 2, 6]
+    tree = VisibleCounts(counts)
+    tree.add(2, -2)
+    counts[2] -= 2
+    assert tree.total == sum(counts)
+    for index in range(len(counts) + 1):
+        assert tree.prefix(index) == sum(counts[:index])
+    for offset in range(tree.total):
+        index, inner = tree.search(offset)
+        assert tree.prefix(index) + inner == offset
+        assert inner < counts[index]
+
+
+def test_positions_round_trip_through_expand_and_collapse() -> None:
+    """Position to row and row to position agree after random toggles."""
+    tree = FlatTree(make_data())
+    rng = random.Random(7)
+    for _ in range(60):
+        row = tree[rng.randrange(len(tree))]
+        tree.toggle(row)
+        visible = expected_rows(tree.roots)
+        assert len(tree) == len(visible)
+        for position, expected in enumerate(visible):
+            assert tree[position] is expected
+            assert tree.index(expected) == position
+        assert tree.window(3, 8) == visible[3:8]
+
+
+def test_collapsed_descendants_keep_their_state() -> None:
+    """Expanded rows below a collapsed one show again when it expands."""
+    tree = FlatTree({"a": {"b": {"c": 1}}, "d": 2})
+    a = tree[0]
+    assert tree.expand(a) == 1
+    assert tree.expand(tree[1]) == 1
+    assert tree.collapse(a) == 2
+    assert len(tree) == 2
+    assert tree.expand(a) == 2
+    assert [row.label for row in tree.window(0, 10)] == ["a", "b", "c", "d"]
+
+
+def test_hidden_row_has_no_position() -> None:
+    """Rows under a collapsed row are not visible."""
+    tree = FlatTree({"a": {"b": 1}})
+    child = tree[0].children[0]
+    with pytest.raises(ValueError, match="not visible"):
+        tree.index(child)
+    with pytest.raises(IndexError):
+        tree[1]
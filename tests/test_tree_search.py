@@ -0,0 +1,85 @@
+"""Tests for the tree search index."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from pepperpy.tui.widgets.tree_search import TreeIndex
+from pepperpy.tui.widgets.tree_view import TreeView
+
+DATA = {
+    "config": {"server": {"port": 80}, "client": {"server": "x"}},
+    "server": ["a", "b"],
+    "logs": {},
+}
+
+
+def test_build_indexes_nodes_in_display_order() -> None:
+    """Nodes are numbered depth first, with paths and sibling routes."""
+    index = TreeIndex.build(DATA)
+    assert index.labels == [
+        "config",
+        "server",
+        "port",
+        "client",
+        "server",
+        "server",
+        "0",
+        "1",
+        "logs",
+    ]
+    assert index.path(2) == ["config", "server", "port"]
+    assert index.route(4) == [0, 1, 0]
+    assert index.route(7) == [1, 1]
+
+
+@pytest.mark.parametrize(
+    ("query", "mode", "nodes"),
+    [
+        ("SERV", "prefix", [1, 4, 5]),
+        ("er", "substring", [1, 4, 5]),
+        ("er", "prefix", []),
+        ("cnt", "fuzzy", [3]),
+        ("config/serv", "prefix", [1]),
+        ("/serv", "prefix", [5]),
+        ("client/", "prefix", []),
+    ],
+)
+def test_search_modes_and_paths(query: str, mode: str, nodes: list[int]) -> None:
+    """Labels and path queries find the expected nodes."""
+    result = TreeIndex.build(DATA).search(query, mode)  # type: ignore[arg-type]
+    assert result.nodes == nodes
+    assert result.count == len(nodes)
+
+
+def test_search_counts_beyond_limit() -> None:
+    """Every match is counted, only the first few are returned."""
+    index = TreeIndex.build({str(i): f"leaf {i}" for i in range(50)})
+    result = index.search("1", limit=3)
+    assert result.nodes == [1, 10, 11]
+    assert result.count == 14
+
+
+def test_next_match_wraps_both_ways() -> None:
+    """Stepping through matches wraps at either end."""
+    index = TreeIndex.build(DATA)
+    assert index.next_match("server", after=1) == 4
+    assert index.next_match("server", after=5) == 1
+    assert index.next_match("server", after=4, reverse=True) == 1
+    assert index.next_match("server", after=1, reverse=True) == 5
+    assert index.next_match("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_get_index_waits_for_replaced_data() -> None:
+    """A caller waiting while the data changes gets the new index."""
+    tree = TreeView(data={"old": 1}, virtual=True)
+    waiter = asyncio.create_task(tree.get_index())
+    await asyncio.sleep(0)
+    tree.data = {"new": 1}
+    tree._start_index()
+    index = await waiter
+    assert index.labels == ["new"]
+    assert tree.index is index
@@ -0,0 +1,113 @@
+"""Tests for the tree view widget."""
+
+from __future__ import annotations
+
+import pytest
+from textual.app import App, ComposeResult
+
+from pepperpy.tui.widgets.tree_view import TreeNode, TreeView
+
+DATA = {"a": {"b": {"c": 1}, "d": [1, 2]}, "e": 3}
+
+
+class TreeApp(App[None]):
+    """App showing one tree view."""
+
+    def __init__(self, *, virtual: bool = False) -> None:
+        """Initialize the app."""
+        super().__init__()
+        self.virtual = virtual
+
+    def get_css_variables(self) -> dict[str, str]:
+        """Define the theme colors the node styles use."""
+        return {**super().get_css_variables(), "selection": "#44475a"}
+
+    def compose(self) -> ComposeResult:
+        """Create the tree view."""
+        yield TreeView(data=DATA, virtual=self.virtual)
+
+
+def test_nodes_are_created_one_level_at_a_time() -> None:
+    """Only root nodes exist until children are asked for."""
+    tree = TreeView(data=DATA)
+    a, e = tree.nodes
+    assert not a.materialized
+    assert a.has_children
+    assert not e.has_children
+    assert [child.label for child in a.children] == ["b", "d"]
+    assert a.children[0].level == 1
+    assert not a.children[0].materialized
+
+
+@pytest.mark.asyncio
+async def test_children_are_mounted_on_first_expansion() -> None:
+    """Expanding mounts the children once; collapsing hides them."""
+    app = TreeApp()
+    async with app.run_test() as pilot:
+        tree = app.query_one(TreeView)
+        a = tree.nodes[0]
+        assert len(app.query(TreeNode)) == 2
+
+        a.toggle()
+        await tree._update_children(a)
+        await pilot.pause()
+        assert [node.label for node in tree.query(TreeNode)] == ["a", "b", "d", "e"]
+
+        a.toggle()
+        await tree._update_children(a)
+        assert [child.display for child in a.children] == [False, False]
+        a.toggle()
+        await tree._update_children(a)
+        assert len(app.query(TreeNode)) == 4
+        assert all(child.display for child in a.children)
+
+
+@pytest.mark.asyncio
+async def test_virtual_view_renders_rows_without_widgets() -> None:
+    """Rows are lines of one widget, expanded and collapsed at the cursor."""
+    app = TreeApp(virtual=True)
+    async with app.run_test() as pilot:
+        tree = app.query_one(TreeView)
+        await pilot.pause()
+        assert not app.query(TreeNode)
+        assert tree.render().plain.splitlines() == ["▶ a", "  e"]
+
+        await tree.action_toggle()
+        tree.action_move_cursor(2)
+        tree.action_expand()
+        assert tree.render().plain.splitlines() == [
+            "▼ a",
+            "  ▶ b",
+            "  ▼ d",
+            "      0",
+            "      1",
+            "  e",
+        ]
+        tree.action_cursor_end()
+        assert tree.cursor_node is not None
+        assert tree.cursor_node.label == "e"
+        tree.action_move_cursor(-1)
+        tree.action_collapse()
+        assert tree.cursor_row == 2
+        tree.action_cursor_home()
+        await tree.action_toggle()
+        assert tree.render().plain.splitlines() == ["▶ a", "  e"]
+
+
+@pytest.mark.asyncio
+async def test_cursor_scrolls_into_view() -> None:
+    """Moving the cursor past the last line scrolls the view."""
+    app = TreeApp(virtual=True)
+    async with app.run_test(size=(40, 4)) as pilot:
+        tree = app.query_one(TreeView)
+        await tree.set_data({str(i): i for i in range(20)})
+        await pilot.pause()
+        size = tree.page_size
+        tree.action_move_page(1)
+        assert tree.cursor_row == size
+        assert tree.scroll_row == 1
+        tree.action_cursor_end()
+        assert tree.scroll_row == 20 - size
+        assert tree.render().plain.splitlines()[-1] == "  19"
+        tree.scroll_to_row(100)
+        assert tree.scroll_row == 20 - size
@@ -0,0 +1,37 @@
+"""Tests for the base PepperPy widget."""
+
+from __future__ import annotations
+
+import pytest
+from textual.app import App, ComposeResult
+
+from pepperpy.tui.widgets.base import EventData, PepperWidget
+
+
+class EventApp(App[None]):
+    """App recording the events its widget posts."""
+
+    def __init__(self) -> None:
+        """Initialize without events."""
+        super().__init__()
+        self.received: list[tuple[str, dict[str, EventData]]] = []
+
+    def compose(self) -> ComposeResult:
+        """Create the widget."""
+        yield PepperWidget()
+
+    def on_pepper_widget_pepper_event(self, message: PepperWidget.PepperEvent) -> None:
+        """Record a posted event."""
+        self.received.append((message.event_type, dict(message.event_data)))
+
+
+@pytest.mark.asyncio
+async def test_events_are_recorded_and_posted() -> None:
+    """Emitted events reach the history and the app, after the mount."""
+    app = EventApp()
+    async with app.run_test() as pilot:
+        widget = app.query_one(PepperWidget)
+        await widget.emit_event("ping", {"n": 1})
+        await pilot.pause()
+        assert widget.get_events() == [("ping", {"n": 1})]
+        assert app.received == [("mounted", {}), ("ping", {"n": 1})]